@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Save benchmark
+Per-save latency of the CSV journal and the SQLite backend against a full CSV rewrite
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cohort_store import CohortStore  # noqa: E402
+from review_db import ReviewDatabase  # noqa: E402
+from review_fields import REVIEW_COLUMNS  # noqa: E402
+from review_journal import ReviewJournal  # noqa: E402
+from synthetic import write_cohort  # noqa: E402
+
+
+REVIEW = {'Manual_PE_Present': 1, 'Manual_PE_Location': 'Segmental', 'Manual_PE_Acuity': 'Acute',
+          'Manual_PE_Laterality': 'Right', 'Manual_PE_Clot_Burden': 'Low',
+          'Reviewer_Confidence': 'high', 'Comments': ''}
+
+
+def per_save(fn, saves):
+    """Mean seconds per call of fn(i)"""
+    started = time.perf_counter()
+    for i in range(saves):
+        fn(i)
+    return (time.perf_counter() - started) / saves
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--report-chars', type=int, default=3000)
+    parser.add_argument('--saves', type=int, default=200)
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cohort.csv')
+            write_cohort(path, rows, args.report_chars)
+            store = CohortStore.from_csv(path, ensure_columns=REVIEW_COLUMNS)
+
+            journal = ReviewJournal(path)
+            journal_s = per_save(lambda i: journal.append(i % rows, f'E{i % rows:08d}', REVIEW),
+                                 args.saves)
+            journal.close()
+
+            db = ReviewDatabase(os.path.join(tmp, 'cohort.sqlite'))
+            db.import_csv(path)
+            sqlite_s = per_save(lambda i: db.append(i % rows, f'E{i % rows:08d}', REVIEW),
+                                args.saves)
+            db.close()
+
+            # What every save cost before the journal: rewriting the whole file
+            rewrite_s = per_save(lambda i: store.to_csv(path + '.tmp'), 3)
+
+        result = {
+            'benchmark': 'save',
+            'rows': rows,
+            'journal_append_us': journal_s * 1e6,
+            'sqlite_upsert_us': sqlite_s * 1e6,
+            'csv_rewrite_ms': rewrite_s * 1e3,
+        }
+        results.append(result)
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
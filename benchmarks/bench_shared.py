@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Shared-mode benchmark
+Simulated reviewers in separate processes working one SQLite database through row leases
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_save import REVIEW  # noqa: E402
+from review_db import ReviewDatabase  # noqa: E402
+from review_index import PendingIndex  # noqa: E402
+from synthetic import write_cohort  # noqa: E402
+
+
+def reviewer(db_path, name, review_seconds, results):
+    """Claim, "read" and save reviews the way the app's Skip button does"""
+    db = ReviewDatabase(db_path, reviewer=name, lease_seconds=60)
+    store = db.load()
+    pending = PendingIndex.from_column(store['Manual_PE_Present'])
+    revision = db.latest_revision()
+    saved = []
+
+    current = -1
+    while True:
+        # Pull everyone else's saves, then lease the next free row
+        revision, records = db.changes_since(revision)
+        for index, _, _ in records:
+            pending.discard(index)
+
+        taken = db.leased_rows()
+        claimed = None
+        candidate = current
+        for _ in range(len(pending)):
+            candidate = pending.next_after(candidate)
+            if candidate is None or candidate == current:
+                break
+            if candidate not in taken and db.lease(candidate):
+                claimed = candidate
+                break
+        if claimed is None:
+            break
+
+        time.sleep(review_seconds)
+        db.append(claimed, store.at[claimed, 'Report_Number'], REVIEW)
+        pending.discard(claimed)
+        saved.append(claimed)
+        current = claimed
+
+    db.close()
+    results.put((name, saved))
+
+
+def run(db_path, reviewers, review_seconds):
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=reviewer,
+                                         args=(db_path, f'reviewer{i}', review_seconds, results))
+                 for i in range(reviewers)]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    saved = dict(results.get() for _ in processes)
+    for process in processes:
+        process.join()
+    return saved, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--rows', type=int, default=400)
+    parser.add_argument('--reviewers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--review-ms', type=float, default=20,
+                        help="Simulated reading time per report")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'cohort.csv')
+        write_cohort(csv_path, args.rows, report_chars=500)
+
+        for count in args.reviewers:
+            db_path = os.path.join(tmp, f'shared{count}.sqlite')
+            db = ReviewDatabase(db_path)
+            db.import_csv(csv_path)
+            db.close()
+
+            saved, seconds = run(db_path, count, args.review_ms / 1000)
+            rows = [row for rows in saved.values() for row in rows]
+
+            db = ReviewDatabase(db_path)
+            store = db.load()
+            db.close()
+            unreviewed = int(store['Manual_PE_Present'].isna().sum())
+
+            result = {
+                'benchmark': 'shared',
+                'rows': args.rows,
+                'reviewers': count,
+                'seconds': seconds,
+                'reviews_per_second': len(rows) / seconds,
+                'reviewed_twice': len(rows) - len(set(rows)),
+                'unreviewed': unreviewed,
+            }
+            results.append(result)
+            print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Startup benchmark
+Cold CSV parse versus warm restart from the cohort cache
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from cohort_cache import CohortCache, load_cohort  # noqa: E402
+from review_fields import REVIEW_COLUMNS  # noqa: E402
+from synthetic import write_cohort  # noqa: E402
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--report-chars', type=int, default=3000)
+    parser.add_argument('--mode', choices=['eager', 'lazy', 'sidecar'], default='eager')
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    args = parser.parse_args()
+
+    options = {'lazy': args.mode == 'lazy', 'sidecar': args.mode == 'sidecar',
+               'ensure_columns': REVIEW_COLUMNS}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cohort.csv')
+        write_cohort(path, args.rows, args.report_chars)
+
+        _, cold = timed(lambda: load_cohort(path, use_cache=False, **options))
+        _, first = timed(lambda: load_cohort(path, **options))
+        _, warm = timed(lambda: load_cohort(path, **options))
+
+        results = {
+            'benchmark': 'startup',
+            'rows': args.rows,
+            'report_chars': args.report_chars,
+            'mode': args.mode,
+            'csv_mb': os.path.getsize(path) / 1e6,
+            'cache_mb': os.path.getsize(CohortCache(path).path) / 1e6,
+            'cold_csv_s': cold,
+            'first_load_with_cache_write_s': first,
+            'warm_cache_s': warm,
+            'speedup': cold / warm if warm else None,
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
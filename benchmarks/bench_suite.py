@@ -0,0 +1,444 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite
+Load, save, skip, stats, highlight and keyword-hit timings on synthetic cohorts of several sizes
+
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --rows 1000 10000 --data-dir bench_data --output results.json
+    xvfb-run -a python benchmarks/bench_suite.py --tk --output results.json
+    python benchmarks/bench_suite.py --compare baseline.json results.json
+
+The data-layer benchmarks run headless. --tk adds timings of the real
+window (startup, Next with save, sidebar scrolling), which need a display;
+on a server run them under a virtual one such as xvfb-run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from cohort_store import CohortStore  # noqa: E402
+from report_hits import KeywordHits  # noqa: E402
+from report_text import (DEFAULT_KEYWORDS, KeywordHighlighter, format_report_text,  # noqa: E402
+                         layout_sections, split_sections)
+from review_batch import summarize  # noqa: E402
+from review_fields import collect_review  # noqa: E402
+from review_index import (PendingIndex, ReviewQueue, ReviewStats,  # noqa: E402
+                          manual_label)
+from review_storage import CsvStorage, SqliteStorage  # noqa: E402
+from review_views import FilterView  # noqa: E402
+from synthetic import write_cohort  # noqa: E402
+
+
+DEFAULT_ROWS = [1000, 10000, 100000, 1000000]
+
+FIELDS = {'Manual_PE_Present': '1', 'Manual_PE_Location': 'Segmental',
+          'Manual_PE_Acuity': 'Acute', 'Manual_PE_Laterality': 'Right',
+          'Manual_PE_Clot_Burden': 'Low', 'Reviewer_Confidence': 'high', 'Comments': ''}
+
+QUEUE_WEIGHTS = {'model_disagreement': 4.0, 'svm_uncertainty': 2.0, 'llm_low_confidence': 1.0}
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def latencies(fn, args):
+    """Seconds per call of fn(arg), sorted"""
+    times = []
+    for arg in args:
+        started = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - started)
+    return sorted(times)
+
+
+def percentiles(times, scale, unit):
+    """p50/p95/mean of sorted timings, scaled (1e3 for ms, 1e6 for us)"""
+    if not times:
+        return {}
+    return {
+        f'p50_{unit}': times[len(times) // 2] * scale,
+        f'p95_{unit}': times[min(len(times) - 1, int(len(times) * 0.95))] * scale,
+        f'mean_{unit}': sum(times) / len(times) * scale,
+    }
+
+
+def cohort_path(data_dir, rows, report_chars, reviewed, seed):
+    """Generate the cohort once per data directory and reuse it"""
+    path = os.path.join(data_dir, f'cohort_{rows}_{report_chars}_{int(reviewed * 100)}_{seed}.csv')
+    if not os.path.exists(path):
+        started = time.perf_counter()
+        write_cohort(path + '.tmp', rows, report_chars, seed=seed, reviewed=reviewed)
+        os.replace(path + '.tmp', path)
+        print(f"Generated {rows} reports in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    return path
+
+
+def clear_side_files(path):
+    """Remove journals, caches and indexes the benchmarks leave next to a cohort"""
+    for suffix in ('.journal', '.cache.npz', '.reports', '.search.npz', '.sqlite',
+                   '.sqlite-wal', '.sqlite-shm'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+
+def bench_load(path, rows):
+    clear_side_files(path)
+    store, cold = timed(lambda: CsvStorage(path, use_cache=False).load())
+    timed(lambda: CsvStorage(path).load())  # writes the cache
+    _, warm = timed(lambda: CsvStorage(path).load())
+    _, lazy = timed(lambda: CsvStorage(path, lazy=True, use_cache=False).load())
+
+    db = SqliteStorage(path + '.sqlite', path)
+    _, sqlite_import = timed(db.load)
+    _, sqlite_load = timed(db.load)
+    db.close()
+    clear_side_files(path)
+
+    return store, {
+        'benchmark': 'load',
+        'rows': rows,
+        'csv_mb': os.path.getsize(path) / 1e6,
+        'memory_mb': sum(store.memory_usage().values()) / 1e6,
+        'csv_cold_s': cold,
+        'cache_warm_s': warm,
+        'lazy_index_s': lazy,
+        'sqlite_first_import_s': sqlite_import,
+        'sqlite_load_s': sqlite_load,
+    }
+
+
+def bench_save(path, store, rows, saves):
+    """What save_current does off the widgets: validate/serialize, update indexes, write"""
+    rng = random.Random(1)
+    targets = [rng.randrange(rows) for _ in range(saves)]
+    stats = ReviewStats(store)
+    pending = PendingIndex.from_column(store['Manual_PE_Present'])
+
+    def apply(index):
+        values = collect_review(FIELDS)
+        stats.remove_row(store, index)
+        for column, value in values.items():
+            store.at[index, column] = value
+        stats.add_row(store, index)
+        if manual_label(store.at[index, 'Manual_PE_Present']) is None:
+            pending.add(index)
+        else:
+            pending.discard(index)
+        return values
+
+    result = {'benchmark': 'save', 'rows': rows}
+    result.update({f'apply_{k}': v for k, v in
+                   percentiles(latencies(apply, targets), 1e6, 'us').items()})
+
+    values = collect_review(FIELDS)
+    journal = CsvStorage(path)
+    db = SqliteStorage(path + '.sqlite', path)
+    db.load()
+    for name, storage in (('journal', journal), ('sqlite', db)):
+        times = latencies(
+            lambda index: storage.append_many([(index, store.at[index, 'Report_Number'], values)]),
+            targets)
+        result.update({f'{name}_write_{k}': v for k, v in percentiles(times, 1e6, 'us').items()})
+    journal.close()
+    db.close()
+
+    # The full-file rewrite compaction does now and then (and every save did originally)
+    _, rewrite = timed(lambda: store.to_csv(path + '.rewrite'))
+    os.remove(path + '.rewrite')
+    result['csv_rewrite_s'] = rewrite
+    clear_side_files(path)
+    return result
+
+
+def bench_skip(store, rows, steps):
+    """find_first_unreviewed at startup, then Skip to Unreviewed from random rows"""
+    rng = random.Random(2)
+    pending, build = timed(lambda: PendingIndex.from_column(store['Manual_PE_Present']))
+    starts = [rng.randrange(rows) for _ in range(steps)]
+    queue, queue_build = timed(lambda: ReviewQueue.from_pending(store, pending, QUEUE_WEIGHTS))
+
+    result = {
+        'benchmark': 'skip',
+        'rows': rows,
+        'unreviewed': len(pending),
+        'first_unreviewed_s': build,
+        'priority_queue_build_s': queue_build,
+    }
+    result.update({f'next_unreviewed_{k}': v for k, v in
+                   percentiles(latencies(pending.next_after, starts), 1e6, 'us').items()})
+    result.update({f'priority_next_{k}': v for k, v in
+                   percentiles(latencies(lambda index: queue.next(exclude={index}), starts),
+                               1e6, 'us').items()})
+    return result
+
+
+def bench_stats(store, rows, updates):
+    rng = random.Random(3)
+    stats, build = timed(lambda: ReviewStats(store))
+    targets = [rng.randrange(rows) for _ in range(updates)]
+
+    def delta(index):
+        stats.remove_row(store, index)
+        stats.add_row(store, index)
+
+    _, batch_summary = timed(lambda: summarize(store))
+    result = {'benchmark': 'stats', 'rows': rows, 'build_s': build, 'batch_summary_s': batch_summary}
+    result.update({f'delta_{k}': v for k, v in
+                   percentiles(latencies(delta, targets), 1e6, 'us').items()})
+    return result
+
+
+def bench_highlight(store, rows, samples):
+    """format_report_text and keyword matching per report, as load_report does on a miss"""
+    rng = random.Random(4)
+    texts = [store.at[rng.randrange(rows), 'Report_Text'] for _ in range(samples)]
+    formatted = [format_report_text(text) for text in texts]
+    highlighter = KeywordHighlighter()
+    spans = [highlighter.spans(text) for text in formatted]
+    sections = [split_sections(text) for text in formatted]
+    layouts = [layout_sections(*args, {'IMPRESSION'}) for args in zip(formatted, spans, sections)]
+    # Share of the text the section view inserts before the report is on screen
+    shown = sum(len(s.title) + len(s.separator) + (len(s.body) if s.open else 0)
+                for layout in layouts for s in layout)
+
+    result = {
+        'benchmark': 'highlight',
+        'rows': rows,
+        'report_chars_mean': sum(map(len, texts)) / len(texts),
+        'keyword_hits_mean': sum(map(len, spans)) / len(spans),
+        'sections_mean': sum(map(len, sections)) / len(sections),
+        'section_view_first_insert_fraction': shown / sum(map(len, formatted)),
+    }
+    for name, fn, args in (
+            ('format', format_report_text, texts),
+            ('spans', highlighter.spans, formatted),
+            ('sections', split_sections, formatted),
+            ('layout', lambda args: layout_sections(*args, {'IMPRESSION'}),
+             list(zip(formatted, spans, sections))),
+            ('tk_indices', lambda pair: highlighter.to_indices(*pair), list(zip(formatted, spans)))):
+        result.update({f'{name}_{k}': v for k, v in percentiles(latencies(fn, args), 1e6, 'us').items()})
+    return result
+
+
+def bench_hits(store, rows):
+    """Keyword and negation hit matrix: the cohort scan, then filters over the matrix"""
+    hits, scan = timed(lambda: KeywordHits.build(store.column('Report_Text'), rows,
+                                                 DEFAULT_KEYWORDS))
+    negated, negated_filter = timed(lambda: FilterView('negated', 'pe_negated', store, hits))
+    conflicts, conflict_filter = timed(lambda: FilterView('conflicts', 'regex_conflict',
+                                                          store, hits))
+    return {
+        'benchmark': 'hits',
+        'rows': rows,
+        'scan_s': scan,
+        'scan_per_report_us': scan / rows * 1e6,
+        'matrix_bytes': hits.hits.nbytes + hits.negated.nbytes,
+        'pe_negated_rows': len(negated),
+        'pe_negated_filter_s': negated_filter,
+        'regex_conflict_rows': len(conflicts),
+        'regex_conflict_filter_s': conflict_filter,
+    }
+
+
+def bench_tk(path, rows, steps):
+    """The real window: startup to first pixel and first report, Next with save, sidebar scrolling"""
+    import configparser
+    import tkinter as tk
+
+    try:
+        tk.Tk().destroy()
+    except tk.TclError as e:
+        return {'benchmark': 'tk', 'rows': rows,
+                'skipped': f"no display ({e}); run under xvfb-run"}
+
+    import reviewcode
+
+    config = configparser.ConfigParser()
+    config.read(os.path.join(ROOT, 'config.ini'))
+    config['DATA']['csv_file'] = path
+    config['REVIEW']['auto_save_interval'] = '0'
+    config['REVIEW']['journal_compact_interval'] = '0'
+    if not config.has_section('PROFILE'):
+        config.add_section('PROFILE')
+    config['PROFILE']['enabled'] = 'true'
+    config['PROFILE']['trace_file'] = ''
+
+    class BenchReviewer(reviewcode.MedicalReportReviewer):
+        def load_config(self):
+            return config
+
+    clear_side_files(path)
+    # The constructor returns once the splash is painted; the cohort loads
+    # on a worker thread and the first report appears when it is done
+    started = time.perf_counter()
+    app = BenchReviewer()
+    first_pixel = time.perf_counter() - started
+    while not app.ready:
+        app.update()
+        time.sleep(0.005)
+    first_report = time.perf_counter() - started
+
+    def next_with_save(_):
+        app.form_vars['Manual_PE_Present'].set('0')
+        app.form_vars['Reviewer_Confidence'].set('high')
+        app.next_report()
+        app.update()
+
+    def scroll_list(_):
+        if app.report_list is not None:
+            app.report_list.scroll(app.report_list.visible)
+        app.update()
+
+    result = {'benchmark': 'tk', 'rows': rows, 'startup_to_first_pixel_s': first_pixel,
+              'startup_to_first_report_s': first_report}
+    result.update({f'next_with_save_{k}': v for k, v in
+                   percentiles(latencies(next_with_save, range(steps)), 1e3, 'ms').items()})
+    result.update({f'sidebar_scroll_{k}': v for k, v in
+                   percentiles(latencies(scroll_list, range(steps)), 1e3, 'ms').items()})
+
+    # Per-step breakdown of those loads and saves from the built-in spans
+    for name, histogram in app.profiler.histograms.items():
+        result[f'span.{name}_p50_ms'] = histogram.percentile(0.5) * 1e3
+        result[f'span.{name}_p95_ms'] = histogram.percentile(0.95) * 1e3
+
+    app.save_worker.stop()
+    app.storage.close()
+    app.destroy()
+    clear_side_files(path)
+    return result
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {
+        'commit': commit or None,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(baseline_path, current_path, threshold=0.1):
+    """Print timing changes between two result files; returns the number of regressions"""
+    def load(path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return {(r['benchmark'], r['rows']): r for r in data['results']}, data.get('meta', {})
+
+    baseline, old_meta = load(baseline_path)
+    current, new_meta = load(current_path)
+    print(f"baseline {old_meta.get('commit')}  ->  current {new_meta.get('commit')}")
+
+    regressions = 0
+    for key in sorted(current, key=lambda k: (k[0], k[1])):
+        if key not in baseline:
+            continue
+        for metric, new in current[key].items():
+            old = baseline[key].get(metric)
+            if not metric.endswith(('_s', '_ms', '_us')) or not isinstance(old, (int, float)):
+                continue
+            change = (new - old) / old if old else 0.0
+            flag = ''
+            if change > threshold:
+                flag = '  SLOWER'
+                regressions += 1
+            elif change < -threshold:
+                flag = '  faster'
+            print(f"{key[0]:>9} {key[1]:>8}  {metric:<34} {old:>12.3f} {new:>12.3f} "
+                  f"{change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite on synthetic cohorts")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS)
+    parser.add_argument('--report-chars', type=int, default=2000,
+                        help="Typical report length; lengths vary log-normally around it")
+    parser.add_argument('--reviewed', type=float, default=0.3,
+                        help="Fraction of rows already reviewed in the generated cohorts")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--samples', type=int, default=500,
+                        help="Saves, skips, updates and reports timed per benchmark")
+    parser.add_argument('--only', nargs='+',
+                        choices=['load', 'save', 'skip', 'stats', 'highlight', 'hits', 'tk'],
+                        help="Run only these benchmarks")
+    parser.add_argument('--tk', action='store_true',
+                        help="Also time the real window (needs a display, e.g. xvfb-run)")
+    parser.add_argument('--data-dir', help="Keep generated cohorts here and reuse them")
+    parser.add_argument('--output', help="Write results as JSON to this file")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Compare two result files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Relative change reported as slower/faster by --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, threshold=args.threshold) else 0)
+
+    selected = set(args.only or ['load', 'save', 'skip', 'stats', 'highlight', 'hits'])
+    if args.tk:
+        selected.add('tk')
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='review_bench_')
+    os.makedirs(data_dir, exist_ok=True)
+    results = []
+
+    def report(result):
+        results.append(result)
+        print(json.dumps(result))
+
+    try:
+        for rows in args.rows:
+            path = cohort_path(data_dir, rows, args.report_chars, args.reviewed, args.seed)
+
+            if 'load' in selected:
+                store, result = bench_load(path, rows)
+                report(result)
+            else:
+                store = CohortStore.from_csv(path)
+
+            if 'skip' in selected:
+                report(bench_skip(store, rows, args.samples))
+            if 'stats' in selected:
+                report(bench_stats(store, rows, args.samples))
+            if 'highlight' in selected:
+                report(bench_highlight(store, rows, args.samples))
+            if 'hits' in selected:
+                report(bench_hits(store, rows))
+            # Saves change the store, so they run after the read-only benchmarks
+            if 'save' in selected:
+                report(bench_save(path, store, rows, args.samples))
+            del store
+
+            if 'tk' in selected:
+                report(bench_tk(path, rows, min(args.samples, 200)))
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
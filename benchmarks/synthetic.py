@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Synthetic cohorts
+CSV files in the data/README_CSV_FORMAT.md layout with CT-report-like text, for the benchmarks
+
+    python benchmarks/synthetic.py 100000 cohort.csv [--report-chars 2000] [--reviewed 0.3]
+"""
+
+import argparse
+import csv
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from review_fields import REVIEW_COLUMNS  # noqa: E402
+
+
+COLUMNS = [
+    'Report_Number', 'EMPI', 'Report_Description', 'Report_Type_Group', 'Report_Text',
+    'SVM_PE_Prediction', 'SVM_Probability', 'Regex_PE_Prediction', 'LLM_PE_Binary',
+    'LLM_Confidence', 'LLM_Reasoning', 'PE_Location', 'PE_Acuity', 'PE_Laterality',
+    'PE_Clot_Burden', 'Agreement_Pattern',
+] + REVIEW_COLUMNS
+
+DESCRIPTIONS = ['CT CHEST W CONTRAST', 'CTA CHEST PE PROTOCOL', 'CT ANGIOGRAM CHEST',
+                'CT CHEST ABDOMEN PELVIS W CONTRAST']
+TYPE_GROUPS = ['CT PE Protocol', 'CT Chest', 'CT Chest/Abdomen/Pelvis']
+
+HISTORY = [
+    "Shortness of breath and tachycardia, evaluate for pulmonary embolism.",
+    "Pleuritic chest pain. Elevated D-dimer.",
+    "Hypoxia after surgery. Rule out PE.",
+    "Cough and fever, history of malignancy.",
+]
+
+# Paragraphs of an unremarkable study; reports are padded from these to their length
+FILLER = [
+    "Lungs and airways: Mild dependent atelectasis in both lower lobes. No consolidation. "
+    "The central airways are patent.",
+    "Pleura: No pleural effusion or pneumothorax.",
+    "Heart and mediastinum: Heart size is normal. No pericardial effusion. "
+    "No mediastinal or hilar lymphadenopathy by size criteria.",
+    "Thyroid: Unremarkable.",
+    "Upper abdomen: The visualized portions of the liver, spleen and adrenal glands "
+    "are unremarkable. Small hiatal hernia.",
+    "Bones and soft tissues: Degenerative changes of the thoracic spine. "
+    "No suspicious osseous lesion.",
+    "Vessels: Scattered atherosclerotic calcification of the thoracic aorta "
+    "without aneurysmal dilatation.",
+    "Lines and tubes: None.",
+    "There is a 4 mm nodule in the right upper lobe, likely benign; "
+    "follow-up per Fleischner guidelines if the patient is high risk.",
+]
+
+NEGATIVE_FINDINGS = [
+    "Pulmonary arteries: The pulmonary arteries are well opacified. "
+    "There is no filling defect to suggest pulmonary embolism.",
+    "Pulmonary arteries: Adequate contrast bolus. No evidence of pulmonary embolism "
+    "to the subsegmental level.",
+    "Pulmonary arteries: Suboptimal opacification of the subsegmental branches limits "
+    "evaluation; no central or segmental embolus is seen.",
+]
+NEGATIVE_IMPRESSION = ["No pulmonary embolism.", "No evidence of pulmonary embolism.",
+                       "Negative for PE."]
+
+LOCATIONS = ['Central', 'Segmental', 'Subsegmental']
+ACUITIES = ['Acute', 'Chronic']
+LATERALITIES = ['Right', 'Left', 'Bilateral']
+BURDENS = ['Low', 'High']
+
+
+def positive_findings(rng, location, acuity, laterality):
+    side = {'Right': 'right', 'Left': 'left', 'Bilateral': 'bilateral'}[laterality]
+    return (f"Pulmonary arteries: There are {acuity.lower()} filling defects within the "
+            f"{location.lower()} branches of the {side} pulmonary arteries, consistent with "
+            f"pulmonary emboli. " +
+            rng.choice(["The RV/LV ratio is 0.9, without evidence of right heart strain.",
+                        "There is straightening of the interventricular septum, suggesting "
+                        "right heart strain.",
+                        "No thrombus is seen in the main pulmonary artery."]))
+
+
+def report_text(rng, pe, location, acuity, laterality, length):
+    """CT angiogram report of roughly length characters"""
+    findings = (positive_findings(rng, location, acuity, laterality) if pe
+                else rng.choice(NEGATIVE_FINDINGS))
+    impression = (f"{acuity} {location.lower()} pulmonary embolism, {laterality.lower()}."
+                  if pe else rng.choice(NEGATIVE_IMPRESSION))
+
+    parts = ["EXAM: CT angiography of the chest with contrast.",
+             f"CLINICAL HISTORY: {rng.choice(HISTORY)}",
+             "TECHNIQUE: Axial images were acquired through the chest after intravenous "
+             "contrast per pulmonary embolism protocol. Multiplanar reformats were reviewed.",
+             "COMPARISON: None.",
+             f"FINDINGS: {findings}"]
+    size = sum(len(p) for p in parts) + len(impression) + 40
+    while size < length:
+        paragraph = rng.choice(FILLER)
+        parts.append(paragraph)
+        size += len(paragraph) + 1
+    parts.append(f"IMPRESSION: 1. {impression} 2. No acute airspace disease.")
+    return "\n".join(parts)
+
+
+def noisy(rng, label, error_rate):
+    return 1 - label if rng.random() < error_rate else label
+
+
+def write_cohort(path, rows, report_chars=3000, seed=0, pe_rate=0.2, reviewed=0.0):
+    """Synthetic cohort in the data/README_CSV_FORMAT.md layout
+
+    Report lengths are log-normal around report_chars. Model predictions
+    follow the true label with a few percent error each, so some rows have
+    models that disagree. A fraction `reviewed` of rows already carries a
+    manual review.
+    """
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COLUMNS)
+        for i in range(rows):
+            pe = int(rng.random() < pe_rate)
+            location, acuity = rng.choice(LOCATIONS), rng.choice(ACUITIES)
+            laterality, burden = rng.choice(LATERALITIES), rng.choice(BURDENS)
+            length = int(report_chars * math.exp(rng.gauss(0, 0.35)))
+            text = report_text(rng, pe, location, acuity, laterality, length)
+
+            svm = noisy(rng, pe, 0.08)
+            probability = min(max(rng.gauss(0.8 if svm else 0.2, 0.15), 0.0), 1.0)
+            regex = noisy(rng, pe, 0.12)
+            llm = noisy(rng, pe, 0.05)
+            llm_says_pe = llm == 1
+
+            review = [''] * len(REVIEW_COLUMNS)
+            if rng.random() < reviewed:
+                review = [pe,
+                          location if pe else '', acuity if pe else '',
+                          laterality if pe else '', burden if pe else '',
+                          rng.choice(['high', 'high', 'medium', 'low']), '']
+
+            writer.writerow([
+                f'E{i:08d}', 100000 + i, rng.choice(DESCRIPTIONS), rng.choice(TYPE_GROUPS), text,
+                svm, round(probability, 3), regex, llm,
+                rng.choice(['high', 'high', 'medium', 'low']),
+                "Filling defect described." if llm_says_pe else "No filling defect described.",
+                location if llm_says_pe else '', acuity if llm_says_pe else '',
+                laterality if llm_says_pe else '', burden if llm_says_pe else '',
+                f'{svm}{regex}{llm}',
+            ] + review)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic review cohort CSV")
+    parser.add_argument('rows', type=int)
+    parser.add_argument('path')
+    parser.add_argument('--report-chars', type=int, default=3000)
+    parser.add_argument('--reviewed', type=float, default=0.0,
+                        help="Fraction of rows that already have a manual review")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_cohort(args.path, args.rows, args.report_chars, seed=args.seed, reviewed=args.reviewed)
+    print(f"Wrote {args.rows} reports to {args.path} ({os.path.getsize(args.path) / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
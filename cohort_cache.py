@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Cohort restart cache
+Pickle-free columnar snapshot of the cohort store, used when the CSV is unchanged
+"""
+
+import json
+import os
+
+import numpy as np
+
+from cohort_store import (CohortStore, CategoryColumn, NullableIntColumn, PlainColumn,
+                          TextColumn)
+from report_sidecar import fingerprint
+
+
+CACHE_VERSION = 1
+
+
+def _encode_strings(values):
+    """Object values as (buffer, offsets, missing) arrays, like TextColumn"""
+    text = TextColumn([v if isinstance(v, str) else
+                       (None if v is None or v != v else str(v)) for v in values])
+    return np.frombuffer(text.buffer, dtype=np.uint8), text.offsets, text.missing
+
+
+def _decode_strings(buffer, offsets, missing):
+    raw = buffer.tobytes()
+    values = np.empty(len(missing), dtype=object)
+    for i in range(len(missing)):
+        values[i] = np.nan if missing[i] else raw[offsets[i]:offsets[i + 1]].decode('utf-8')
+    return values
+
+
+class CohortCache:
+    """<csv>.cache.npz: typed columns plus the CSV fingerprint they were read from"""
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.path = csv_path + '.cache.npz'
+
+    @staticmethod
+    def mode(store):
+        if store.sidecar is not None:
+            return 'sidecar'
+        if store.source is not None:
+            return 'lazy'
+        return 'eager'
+
+    def save(self, store):
+        """Write a snapshot of the store, stamped with the CSV's current fingerprint"""
+        arrays = {}
+        columns = []
+        for i, name in enumerate(store.columns):
+            column = store.column(name)
+            key = f'c{i}'
+            if isinstance(column, CategoryColumn):
+                kind = 'category'
+                arrays[key + '.codes'] = column.codes
+                arrays[key + '.categories'] = np.array(column.categories, dtype=str)
+            elif isinstance(column, NullableIntColumn):
+                kind = 'int'
+                arrays[key + '.data'] = column.data
+                arrays[key + '.mask'] = column.mask
+            elif isinstance(column, TextColumn):
+                kind = 'text'
+                arrays[key + '.buffer'] = np.frombuffer(column.buffer, dtype=np.uint8)
+                arrays[key + '.offsets'] = column.offsets
+                arrays[key + '.missing'] = column.missing
+            elif isinstance(column, PlainColumn) and column.values.dtype == object:
+                kind = 'strings'
+                (arrays[key + '.buffer'], arrays[key + '.offsets'],
+                 arrays[key + '.missing']) = _encode_strings(column.values)
+            elif isinstance(column, PlainColumn):
+                kind = 'plain'
+                arrays[key + '.values'] = column.values
+            else:
+                # Read on demand from the CSV or sidecar; re-attached on load
+                continue
+            columns.append({'name': name, 'key': key, 'kind': kind})
+
+        meta = {
+            'version': CACHE_VERSION,
+            'source': fingerprint(self.csv_path),
+            'mode': self.mode(store),
+            'header': list(store.columns),
+            'rows': len(store),
+            'columns': columns,
+        }
+        arrays['meta'] = np.array(json.dumps(meta))
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, self.path)
+
+    def load(self, mode='eager', cache_rows=256):
+        """The cached store, or None if missing, stale or built for another mode"""
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                meta = json.loads(str(data['meta']))
+                if (meta['version'] != CACHE_VERSION or meta['mode'] != mode
+                        or meta['source'] != fingerprint(self.csv_path)):
+                    return None
+
+                columns = {}
+                for spec in meta['columns']:
+                    key, kind = spec['key'], spec['kind']
+                    if kind == 'category':
+                        column = CategoryColumn.__new__(CategoryColumn)
+                        column.codes = data[key + '.codes']
+                        column.categories = data[key + '.categories'].tolist()
+                        column._lookup = {c: i for i, c in enumerate(column.categories)}
+                    elif kind == 'int':
+                        column = NullableIntColumn.__new__(NullableIntColumn)
+                        column.data = data[key + '.data']
+                        column.mask = data[key + '.mask']
+                    elif kind == 'text':
+                        column = TextColumn.__new__(TextColumn)
+                        column.buffer = data[key + '.buffer'].tobytes()
+                        column.offsets = data[key + '.offsets']
+                        column.missing = data[key + '.missing']
+                    elif kind == 'strings':
+                        column = PlainColumn(_decode_strings(data[key + '.buffer'],
+                                                             data[key + '.offsets'],
+                                                             data[key + '.missing']))
+                    else:
+                        column = PlainColumn(data[key + '.values'])
+                    columns[spec['name']] = column
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable cohort cache {self.path}: {e}")
+            return None
+
+        store = CohortStore(columns, meta['rows'])
+        if mode != 'eager':
+            store = store.attach_text(self.csv_path, meta['header'],
+                                      sidecar=(mode == 'sidecar'), cache_rows=cache_rows)
+        return store
+
+
+def load_cohort(csv_path, lazy=False, sidecar=False, ensure_columns=(), cache_rows=256,
+                use_cache=True):
+    """Load the cohort from its restart cache when valid, else parse the CSV and cache it"""
+    cache = CohortCache(csv_path) if use_cache else None
+    mode = 'sidecar' if sidecar else ('lazy' if lazy else 'eager')
+
+    store = cache.load(mode, cache_rows) if cache is not None else None
+    if store is None:
+        store = CohortStore.from_csv(csv_path, lazy=lazy, sidecar=sidecar,
+                                     ensure_columns=ensure_columns, cache_rows=cache_rows)
+        if cache is not None:
+            cache.save(store)
+    else:
+        print(f"Loaded cohort from cache {cache.path}")
+
+    store.cache = cache
+    return store
@@ -0,0 +1,505 @@
+# -*- coding: utf-8 -*-
+"""
+Columnar cohort store
+Typed, compact in-memory columns with cheap per-row reads
+"""
+
+import csv
+import hashlib
+import io
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from review_fields import option_values
+from report_sidecar import ReportSidecar, MappedTextColumn, text_digest
+
+
+# Enumerated fields stored as categorical codes (None = derive categories from the data)
+CATEGORICAL_COLUMNS = {
+    'Manual_PE_Location': option_values('Manual_PE_Location'),
+    'Manual_PE_Acuity': option_values('Manual_PE_Acuity'),
+    'Manual_PE_Laterality': option_values('Manual_PE_Laterality'),
+    'Manual_PE_Clot_Burden': option_values('Manual_PE_Clot_Burden'),
+    'Reviewer_Confidence': option_values('Reviewer_Confidence'),
+    'LLM_Confidence': None,
+    'PE_Location': None,
+    'PE_Acuity': None,
+    'PE_Laterality': None,
+    'PE_Clot_Burden': None,
+    'Report_Description': None,
+    'Report_Type_Group': None,
+    'Agreement_Pattern': None,
+}
+
+# 0/1 predictions and labels stored as nullable int8
+BINARY_COLUMNS = [
+    'Manual_PE_Present',
+    'SVM_PE_Prediction',
+    'Regex_PE_Prediction',
+    'LLM_PE_Binary',
+]
+
+# Long free text stored in a single UTF-8 blob
+TEXT_COLUMNS = [
+    'Report_Text',
+    'LLM_Reasoning',
+]
+
+
+def is_missing(value):
+    """True for None, NaN, pd.NA and empty strings"""
+    if value is None or value is pd.NA:
+        return True
+    if isinstance(value, float) and value != value:
+        return True
+    return isinstance(value, str) and value.strip() == ''
+
+
+def missing_mask(values):
+    """Vectorized is_missing over a Series"""
+    return (values.isna() | values.astype(str).str.strip().eq('')).to_numpy()
+
+
+class CategoryColumn:
+    """Small-integer codes into a list of categories; code -1 means missing"""
+
+    def __init__(self, values, categories=None):
+        values = pd.Series(values, dtype=object)
+        missing = missing_mask(values)
+        present = values[~missing].astype(str)
+
+        # Keep the expected categories first, then anything else found in the data
+        found = [v for v in pd.unique(present) if categories is None or v not in categories]
+        self.categories = list(categories or []) + sorted(found)
+        self._lookup = {c: i for i, c in enumerate(self.categories)}
+
+        self.codes = np.full(len(values), -1, dtype=self._code_dtype())
+        self.codes[~missing] = pd.Categorical(present, categories=self.categories).codes
+
+    def _code_dtype(self):
+        return np.int8 if len(self.categories) < 127 else np.int32
+
+    def _code(self, value):
+        code = self._lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(value)
+            self._lookup[value] = code
+            if self.codes.dtype != self._code_dtype():
+                self.codes = self.codes.astype(self._code_dtype())
+        return code
+
+    def get(self, index):
+        code = self.codes[index]
+        return np.nan if code < 0 else self.categories[code]
+
+    def set(self, index, value):
+        self.codes[index] = -1 if is_missing(value) else self._code(str(value))
+
+    def series(self, start, stop):
+        return pd.Series(pd.Categorical.from_codes(self.codes[start:stop], self.categories))
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes
+
+
+class NullableIntColumn:
+    """int8 values with a separate missing mask"""
+
+    @staticmethod
+    def fits(values):
+        """True if every present value is a small integer"""
+        numbers = pd.to_numeric(pd.Series(values), errors='coerce')
+        present = numbers[~missing_mask(pd.Series(values, dtype=object))]
+        return bool(present.notna().all() and (present % 1 == 0).all()
+                    and present.between(-128, 127).all())
+
+    def __init__(self, values):
+        numbers = pd.to_numeric(pd.Series(values), errors='coerce')
+        self.mask = numbers.isna().to_numpy().copy()
+        self.data = numbers.fillna(0).to_numpy().astype(np.int8)
+
+    def get(self, index):
+        return np.nan if self.mask[index] else int(self.data[index])
+
+    def set(self, index, value):
+        if is_missing(value):
+            self.mask[index] = True
+            self.data[index] = 0
+        else:
+            self.mask[index] = False
+            self.data[index] = int(float(value))
+
+    def series(self, start, stop):
+        return pd.Series(pd.arrays.IntegerArray(self.data[start:stop], self.mask[start:stop]))
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes + self.mask.nbytes
+
+
+class PlainColumn:
+    """A numpy array as loaded (numbers, identifiers, comments)"""
+
+    def __init__(self, values):
+        self.values = np.array(values)
+        if self.values.dtype.kind in 'USO':
+            self.values = self.values.astype(object)
+
+    def get(self, index):
+        return self.values[index]
+
+    def set(self, index, value):
+        if self.values.dtype != object:
+            try:
+                self.values[index] = value
+                return
+            except (TypeError, ValueError):
+                self.values = self.values.astype(object)
+        self.values[index] = value
+
+    def series(self, start, stop):
+        return pd.Series(self.values[start:stop])
+
+    @property
+    def nbytes(self):
+        if self.values.dtype == object:
+            return int(sum(64 + len(v) if isinstance(v, str) else 24 for v in self.values))
+        return self.values.nbytes
+
+
+class TextColumn:
+    """Read-only strings concatenated into one UTF-8 buffer plus an offsets array"""
+
+    def __init__(self, values):
+        encoded = [v.encode('utf-8') if isinstance(v, str) else b'' for v in values]
+        self.missing = np.array([not isinstance(v, str) for v in values], dtype=bool)
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=self.offsets[1:])
+        self.buffer = b''.join(encoded)
+
+    def get(self, index):
+        if self.missing[index]:
+            return np.nan
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.buffer[start:end].decode('utf-8')
+
+    def set(self, index, value):
+        raise TypeError("Text columns are read-only")
+
+    def series(self, start, stop):
+        return pd.Series([self.get(i) for i in range(start, stop)], dtype=object)
+
+    def digest(self):
+        """Hash of the column's text (see report_sidecar.text_digest)"""
+        content = hashlib.blake2b(self.buffer, digest_size=16)
+        return text_digest(content, self.offsets)
+
+    @property
+    def nbytes(self):
+        return len(self.buffer) + self.offsets.nbytes + self.missing.nbytes
+
+
+def read_header(path):
+    """Column names from the first CSV record"""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return next(csv.reader(f))
+
+
+def scan_record_offsets(path, chunk_bytes=64 * 1024 * 1024):
+    """Byte offset of every CSV record after the header
+
+    Newlines inside quoted fields (multi-line Report_Text) are skipped by
+    tracking quote parity, which also handles "" escapes. Blank lines are
+    dropped, matching pandas.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return np.zeros(0, dtype=np.int64), 0
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        starts = _scan_record_starts(mm, size, chunk_bytes)
+
+    return starts, size
+
+
+def _scan_record_starts(mm, size, chunk_bytes):
+    # Kept separate so every numpy view of the mmap is released on return
+    data = np.frombuffer(mm, dtype=np.uint8)
+    starts = []
+    in_quotes = 0
+    for base in range(0, size, chunk_bytes):
+        chunk = data[base:base + chunk_bytes]
+        quotes = chunk == ord('"')
+        parity = (np.cumsum(quotes) + in_quotes) % 2
+        ends = np.flatnonzero((chunk == ord('\n')) & (parity == 0))
+        starts.append(ends + base + 1)
+        in_quotes = int(parity[-1])
+
+    starts = np.concatenate(starts)
+    starts = starts[starts < size]
+    blank = np.isin(data[starts], (ord('\n'), ord('\r')))
+    return starts[~blank].astype(np.int64)
+
+
+class CsvRecordSource:
+    """Random access to individual CSV records through a byte-offset index"""
+
+    def __init__(self, path, cache_rows=256):
+        self.path = path
+        self.cache_rows = cache_rows
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._load_index(path)
+
+    def _load_index(self, path):
+        offsets, size = scan_record_offsets(path)
+        header = read_header(path)
+        self.offsets = np.append(offsets, size)
+        self.positions = {name: i for i, name in enumerate(header)}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _read(self, start, stop):
+        """Parse records [start, stop) straight from the file"""
+        with open(self.path, 'rb') as f:
+            f.seek(self.offsets[start])
+            raw = f.read(self.offsets[stop] - self.offsets[start])
+        # Blank lines between records parse as empty lists; pandas skips them too
+        return [r for r in csv.reader(io.StringIO(raw.decode('utf-8'), newline='')) if r]
+
+    def record(self, index):
+        """One record's fields, through a small LRU of recently viewed rows"""
+        with self._lock:
+            fields = self._cache.get(index)
+            if fields is not None:
+                self._cache.move_to_end(index)
+                return fields
+
+            fields = self._read(index, index + 1)[0]
+            self._cache[index] = fields
+            if len(self._cache) > self.cache_rows:
+                self._cache.popitem(last=False)
+            return fields
+
+    def field(self, index, name):
+        value = self.record(index)[self.positions[name]]
+        return np.nan if value == '' else value
+
+    def field_range(self, start, stop, name):
+        position = self.positions[name]
+        with self._lock:
+            records = self._read(start, stop)
+        return [np.nan if r[position] == '' else r[position] for r in records]
+
+    def replace_file(self, tmp_path, path):
+        """Move a rewritten CSV into place and re-index it"""
+        offsets, size = scan_record_offsets(tmp_path)
+        header = read_header(tmp_path)
+        with self._lock:
+            os.replace(tmp_path, path)
+            self.path = path
+            self.offsets = np.append(offsets, size)
+            self.positions = {name: i for i, name in enumerate(header)}
+
+
+class LazyTextColumn:
+    """Text column read on demand from the source CSV"""
+
+    def __init__(self, source, name):
+        self.source = source
+        self.name = name
+        self._digest = None
+
+    def get(self, index):
+        return self.source.field(index, self.name)
+
+    def set(self, index, value):
+        raise TypeError("Text columns are read-only")
+
+    def series(self, start, stop):
+        return pd.Series(self.source.field_range(start, stop, self.name), dtype=object)
+
+    def digest(self, chunk_rows=10000):
+        """Hash of the column's text; one pass over the CSV, then remembered"""
+        if self._digest is None:
+            content = hashlib.blake2b(digest_size=16)
+            lengths = [0]
+            for start in range(0, len(self.source), chunk_rows):
+                stop = min(start + chunk_rows, len(self.source))
+                for value in self.source.field_range(start, stop, self.name):
+                    encoded = value.encode('utf-8') if isinstance(value, str) else b''
+                    content.update(encoded)
+                    lengths.append(len(encoded))
+            self._digest = text_digest(content, np.cumsum(lengths))
+        return self._digest
+
+    @property
+    def nbytes(self):
+        return 0
+
+
+class _AtIndexer:
+    """df.at-style [row, column] access"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, key):
+        index, column = key
+        return self.store.column(column).get(index)
+
+    def __setitem__(self, key, value):
+        index, column = key
+        self.store.column(column).set(index, value)
+
+
+class CohortStore:
+    """Typed columnar cohort with the subset of the DataFrame API the reviewer uses
+
+    Supports len(), .columns, store[column] (a Series), store.at[row, column]
+    reads and writes, and to_csv(). Rows are read with row(index), which
+    decodes one value per column instead of materializing a mixed Series.
+    """
+
+    def __init__(self, columns, length, source=None, sidecar=None):
+        self._columns = columns
+        self.columns = list(columns)
+        self.length = length
+        self.source = source
+        self.sidecar = sidecar
+        self.cache = None
+        self.at = _AtIndexer(self)
+
+    @classmethod
+    def from_csv(cls, path, lazy=False, sidecar=False, ensure_columns=(), cache_rows=256):
+        """Load a cohort CSV
+
+        With lazy=True only the light columns are parsed; report bodies are
+        located through a byte-offset index and read when a row is shown.
+        With sidecar=True report bodies come from a memory-mapped sidecar
+        file built from the CSV on first use.
+        """
+        if not (lazy or sidecar):
+            frame = pd.read_csv(path)
+            for name in ensure_columns:
+                if name not in frame.columns:
+                    frame[name] = None
+            return cls.from_frame(frame)
+
+        header = read_header(path)
+        light = [name for name in header if name not in TEXT_COLUMNS]
+        frame = pd.read_csv(path, usecols=light)
+        for name in ensure_columns:
+            if name not in frame.columns:
+                frame[name] = None
+
+        store = cls.from_frame(frame).attach_text(path, header, sidecar, cache_rows)
+        if store is None:
+            return cls.from_csv(path, ensure_columns=ensure_columns)
+        return store
+
+    def attach_text(self, path, header, sidecar=False, cache_rows=256):
+        """Add the text columns of header as on-demand columns
+
+        Returns a new store, or None if the text source does not line up
+        with the rows already loaded.
+        """
+        text_columns = [name for name in header if name in TEXT_COLUMNS]
+        source = mapped = None
+        if sidecar:
+            mapped = ReportSidecar(path)
+            if not mapped.is_valid(text_columns, self.length):
+                print(f"Building report sidecar {mapped.path}")
+                mapped.build(text_columns)
+            mapped.open()
+            rows = mapped.meta['rows']
+        else:
+            source = CsvRecordSource(path, cache_rows=cache_rows)
+            rows = len(source)
+
+        if rows != self.length:
+            # Quoting the offset scan cannot follow; caller loads everything instead
+            print(f"Lazy loading unavailable ({rows} records indexed, "
+                  f"{self.length} parsed); loading the full CSV")
+            if mapped is not None:
+                mapped.close()
+            return None
+
+        columns = {}
+        for name in header + [n for n in self.columns if n not in header]:
+            if name in TEXT_COLUMNS and mapped is not None:
+                columns[name] = MappedTextColumn(mapped, name)
+            elif name in TEXT_COLUMNS:
+                columns[name] = LazyTextColumn(source, name)
+            else:
+                columns[name] = self.column(name)
+        return CohortStore(columns, self.length, source=source, sidecar=mapped)
+
+    @classmethod
+    def from_frame(cls, df):
+        """Convert a freshly parsed DataFrame into typed columns"""
+        columns = {}
+        for name in df.columns:
+            values = df[name].to_numpy(dtype=object)
+            if name in TEXT_COLUMNS:
+                columns[name] = TextColumn(values)
+            elif name in BINARY_COLUMNS and NullableIntColumn.fits(values):
+                columns[name] = NullableIntColumn(values)
+            elif name in CATEGORICAL_COLUMNS:
+                columns[name] = CategoryColumn(values, CATEGORICAL_COLUMNS[name])
+            else:
+                columns[name] = PlainColumn(df[name].to_numpy())
+        return cls(columns, len(df))
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, name):
+        return self.column(name).series(0, self.length)
+
+    def column(self, name):
+        return self._columns[name]
+
+    def row(self, index):
+        """One row as a plain dict"""
+        return {name: column.get(index) for name, column in self._columns.items()}
+
+    def to_frame(self, start=0, stop=None):
+        """Materialize rows [start, stop) as a DataFrame"""
+        stop = self.length if stop is None else stop
+        return pd.DataFrame({name: column.series(start, stop).reset_index(drop=True)
+                             for name, column in self._columns.items()})
+
+    def to_csv(self, path, index=False, chunksize=10000):
+        """Write the cohort as CSV, decoding text in chunks to bound memory"""
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            for start in range(0, max(self.length, 1), chunksize):
+                chunk = self.to_frame(start, min(start + chunksize, self.length))
+                chunk.to_csv(f, index=index, header=(start == 0))
+
+    def replace_csv(self, tmp_path, path):
+        """Atomically move a CSV written by to_csv over the source file"""
+        if self.source is not None:
+            self.source.replace_file(tmp_path, path)
+        else:
+            os.replace(tmp_path, path)
+
+        # Report text is unchanged by compaction, so the sidecar stays valid
+        if self.sidecar is not None:
+            self.sidecar.source_rewritten()
+
+        # The CSV now matches this store exactly; refresh the restart snapshot
+        if self.cache is not None:
+            self.cache.save(self)
+
+    def memory_usage(self):
+        """Approximate bytes held per column"""
+        return {name: column.nbytes for name, column in self._columns.items()}
@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Keyword hit matrix
+Per-report counts of each highlight keyword, and of those in a negated context, for triage
+"""
+
+import os
+import re
+
+import numpy as np
+
+from report_text import HEADER_PATTERN
+
+
+HITS_VERSION = 1
+
+# Phrases that negate (or only ask about) a finding later in the same sentence.
+# "Rule out" and "evaluate for" come from the clinical history and assert nothing.
+NEGATION_CUES = [
+    r'no', r'not', r'without', r'negative for', r'free of', r'absence of', r'absent',
+    r'resolved', r'rule out', r'ruled out', r'r/o', r'evaluate for', r'evaluation for',
+    r'to exclude',
+]
+
+# A cue negates keywords starting at most this many characters after it
+NEGATION_WINDOW = 60
+
+# Sentence ends, clause breaks and the separator between reports stop a negation
+BOUNDARY_CHARACTERS = b'.;:\n\x00'
+BOUNDARY_WORDS = ['but', 'however']
+
+# Byte lookup tables: word characters (UTF-8 continuation bytes count as letters), boundaries
+WORD_BYTES = np.zeros(256, dtype=bool)
+WORD_BYTES[list(b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_')] = True
+WORD_BYTES[128:] = True
+BOUNDARY_BYTES = np.zeros(256, dtype=bool)
+BOUNDARY_BYTES[list(BOUNDARY_CHARACTERS)] = True
+
+# Negations after the keyword ("embolism is not seen"), and keywords naming the
+# kind of study ("PE protocol"), which assert nothing either. The rest of the word
+# is skipped first, as keywords like "emboli" match inside "embolism".
+AFTER_PATTERN = re.compile(rb'[a-z]*(?:\s*(?:protocol|study)\b|(?:\s+(?:is|was|are|were))?\s+'
+                           rb'(?:not seen|not identified|not present|not demonstrated|'
+                           rb'ruled out|excluded)\b)')
+
+# Sections that describe why and how the study was done rather than what it showed;
+# mentions there count as not asserted, like negated ones
+CONTEXT_HEADERS = {'EXAM', 'EXAMINATION', 'PROCEDURE', 'CLINICAL HISTORY', 'HISTORY',
+                   'INDICATION', 'INDICATIONS', 'REASON FOR EXAM', 'TECHNIQUE', 'COMPARISON'}
+SECTION_PATTERN = re.compile(HEADER_PATTERN.pattern.encode())
+
+# Highest count stored per cell; the matrices are uint16
+MAX_COUNT = np.iinfo(np.uint16).max
+
+
+def lowercase_pattern(keyword):
+    """Keyword regex for lowercased text, so matching needs no IGNORECASE
+
+    Letters are lowercased except right after a backslash (\\B, \\S, \\W keep
+    their meaning). IGNORECASE stops the regex engine from searching for a
+    literal prefix, which makes it several times slower. Patterns that do
+    not survive the conversion fall back to IGNORECASE.
+    """
+    converted = re.sub(r'\\.|[A-Z]', lambda m: m.group().lower() if len(m.group()) == 1
+                       else m.group(), keyword)
+    try:
+        return re.compile(converted.encode('utf-8'))
+    except re.error:
+        return re.compile(keyword.encode('utf-8'), re.IGNORECASE)
+
+
+def word_starts(buffer, array, word):
+    """Offsets of a lowercase word in the buffer, whole words only
+
+    Searching for the bare literal lets the regex engine skip ahead to its
+    first character; the word boundary before it is checked afterwards on
+    the byte array, for all matches at once.
+    """
+    starts = np.array([m.start() for m in re.finditer(re.escape(word.encode()) + rb'\b', buffer)],
+                      dtype=np.int64)
+    return starts[(starts == 0) | ~WORD_BYTES[array[np.maximum(starts - 1, 0)]]]
+
+
+def scan_texts(texts, patterns):
+    """Hit and negated-hit counts, each a (len(texts), len(patterns)) uint16 matrix
+
+    The texts are scanned as one lowercased buffer, once per keyword, and
+    every match is assigned to its report with a binary search over the
+    report offsets. Keywords are counted independently, so "pulmonary
+    embolism" also counts as "embolism". A hit counts as negated after a
+    negation cue in the same sentence, before a negation such as "is not
+    seen" or before "protocol", and in one of the CONTEXT_HEADERS sections.
+    """
+    encoded = [t.encode('utf-8') if isinstance(t, str) else b'' for t in texts]
+    starts = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) + 1 for e in encoded], out=starts[1:])
+    original = b'\x00'.join(encoded)
+    buffer = original.lower()
+
+    # Headers are ALL CAPS, so they are found before lowercasing
+    headers = [(m.start(), m.group(1).strip().decode('utf-8', 'replace') in CONTEXT_HEADERS)
+               for m in SECTION_PATTERN.finditer(original)]
+    header_starts = np.array([start for start, _ in headers], dtype=np.int64)
+    header_is_context = np.array([context for _, context in headers], dtype=bool)
+
+    array = np.frombuffer(buffer, dtype=np.uint8)
+    cue_ends = np.sort(np.concatenate([word_starts(buffer, array, cue) + len(cue)
+                                       for cue in NEGATION_CUES]))
+    boundaries = np.sort(np.concatenate([np.flatnonzero(BOUNDARY_BYTES[array])] +
+                                        [word_starts(buffer, array, word)
+                                         for word in BOUNDARY_WORDS]))
+
+    hits = np.zeros((len(encoded), len(patterns)), dtype=np.uint16)
+    negated = np.zeros_like(hits)
+    for k, pattern in enumerate(patterns):
+        matches = [m.span() for m in pattern.finditer(buffer)]
+        if not matches:
+            continue
+        positions = np.array([start for start, _ in matches], dtype=np.int64)
+        rows = np.searchsorted(starts, positions, side='right') - 1
+
+        # Negated: the closest cue before the hit is within the window and
+        # no sentence or clause boundary lies between them
+        cue = np.searchsorted(cue_ends, positions, side='right') - 1
+        cue_end = np.where(cue >= 0, cue_ends[np.maximum(cue, 0)], -1)
+        boundary = np.searchsorted(boundaries, positions, side='right') - 1
+        boundary_at = np.where(boundary >= 0, boundaries[np.maximum(boundary, 0)], -1)
+        is_negated = ((cue >= 0) & (cue_end > boundary_at)
+                      & (positions - cue_end <= NEGATION_WINDOW))
+
+        if len(header_starts):
+            # In a context section: the last header before the hit is one, in the same report
+            header = np.maximum(np.searchsorted(header_starts, positions, side='right') - 1, 0)
+            at = header_starts[header]
+            is_negated |= (at <= positions) & (at >= starts[rows]) & header_is_context[header]
+
+        is_negated |= np.array([AFTER_PATTERN.match(buffer, end) is not None
+                                for _, end in matches], dtype=bool)
+
+        hits[:, k] = np.minimum(np.bincount(rows, minlength=len(encoded)), MAX_COUNT)
+        negated[:, k] = np.minimum(np.bincount(rows[is_negated], minlength=len(encoded)),
+                                   MAX_COUNT)
+    return hits, negated
+
+
+class KeywordHits:
+    """Row -> keyword hit counts, with the counts in a negated context alongside
+
+    hits[row, k] counts keyword k in the report text, negated[row, k] the
+    subset preceded by a negation cue in the same sentence. Kept next to the
+    CSV as <csv>.hits.npz; report text never changes, so the matrix only
+    needs rebuilding for other reports or another keyword list.
+    """
+
+    def __init__(self, keywords, hits, negated, signature=None):
+        self.keywords = list(keywords)
+        self.hits = hits
+        self.negated = negated
+        self.signature = signature
+
+    def __len__(self):
+        return len(self.hits)
+
+    @classmethod
+    def build(cls, column, row_count, keywords, signature=None, chunk_size=2000, progress=None):
+        """Scan a store column; progress(done, total) is called after each chunk"""
+        patterns = [lowercase_pattern(k) for k in keywords]
+        hits, negated = [], []
+        for start in range(0, row_count, chunk_size):
+            stop = min(start + chunk_size, row_count)
+            chunk_hits, chunk_negated = scan_texts(column.series(start, stop).tolist(), patterns)
+            hits.append(chunk_hits)
+            negated.append(chunk_negated)
+            if progress is not None:
+                progress(stop, row_count)
+        if not hits:
+            hits = negated = [np.zeros((0, len(patterns)), dtype=np.uint16)]
+        return cls(keywords, np.concatenate(hits), np.concatenate(negated), signature)
+
+    @staticmethod
+    def path_for(csv_path):
+        return csv_path + '.hits.npz'
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     version=np.array(HITS_VERSION),
+                     signature=np.array(self.signature),
+                     keywords=np.array(self.keywords, dtype=str),
+                     hits=self.hits,
+                     negated=self.negated)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, signature, keywords):
+        """The saved matrix, or None if missing or built for other reports or keywords"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if (int(data['version']) != HITS_VERSION or str(data['signature']) != signature
+                        or data['keywords'].tolist() != list(keywords)):
+                    return None
+                return cls(keywords, data['hits'], data['negated'], signature)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable keyword hits {path}: {e}")
+            return None
+
+    # Per-row summaries used by filters and the review queue
+
+    def total(self, rows=slice(None)):
+        """Keyword hits per report"""
+        return self.hits[rows].sum(axis=1, dtype=np.int64)
+
+    def negated_total(self, rows=slice(None)):
+        """Keyword hits in a negated context per report"""
+        return self.negated[rows].sum(axis=1, dtype=np.int64)
+
+    def affirmed(self, rows=slice(None)):
+        """True where some keyword hit is not negated"""
+        return (self.hits[rows] > self.negated[rows]).any(axis=1)
+
+    def conflicts(self, predictions, rows=slice(None)):
+        """True where a 0/1 prediction disagrees with the text
+
+        A prediction of 1 conflicts with text that has no affirmed keyword
+        hit, a 0 with text that has one. Missing predictions never conflict.
+        """
+        predictions = np.asarray(predictions, dtype=float)
+        affirmed = self.affirmed(rows)
+        return ((predictions == 1) & ~affirmed) | ((predictions == 0) & affirmed)
+
+
+def saved_keyword_hits(csv_path, store, keywords, preprocessed=None):
+    """The hit matrix from report_preprocess.py results or the saved matrix, without scanning"""
+    from report_search import cohort_signature
+
+    if preprocessed is not None:
+        return KeywordHits(keywords, preprocessed.hits, preprocessed.negated)
+    return KeywordHits.load(KeywordHits.path_for(csv_path), cohort_signature(store), keywords)
+
+
+def load_keyword_hits(csv_path, store, keywords, preprocessed=None, progress=None):
+    """The hit matrix from report_preprocess.py results, the saved matrix, or a new scan"""
+    from report_search import cohort_signature
+
+    hits = saved_keyword_hits(csv_path, store, keywords, preprocessed)
+    if hits is None:
+        path = KeywordHits.path_for(csv_path)
+        hits = KeywordHits.build(store.column('Report_Text'), len(store), keywords,
+                                 cohort_signature(store), progress=progress)
+        try:
+            hits.save(path)
+        except OSError as e:
+            print(f"Could not save keyword hits {path}: {e}")
+    return hits
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Report list sidebar
+Every report with its review status, drawn on one canvas that only holds the visible lines
+"""
+
+import tkinter as tk
+
+import numpy as np
+import pandas as pd
+
+from review_index import model_agreement
+
+
+ROW_HEIGHT = 22
+
+# x offset of each column on the canvas
+COLUMN_X = {'number': 10, 'status': 120, 'label': 145, 'models': 205}
+
+AGREEMENT_TEXT = {1: 'agree', 0: 'split', -1: '—'}
+
+
+class ReportList:
+    """Virtualized list of the cohort
+
+    The canvas keeps a fixed pool of text items, one line per visible row,
+    and refills them from the columnar store whenever the list scrolls or
+    a visible row changes. Redraws are coalesced with after_idle, so fast
+    scrolling and bursts of saves cost one redraw per frame.
+    """
+
+    def __init__(self, parent, df, colors, on_select, is_dirty=lambda index: False):
+        self.df = df
+        self.colors = colors
+        self.on_select = on_select
+        self.is_dirty = is_dirty
+
+        # Model predictions never change while reviewing; compute agreement once
+        self.agreement = model_agreement(df)
+
+        self.top = 0
+        self.visible = 0
+        self.current = None
+        self.lines = []
+        self._redraw_job = None
+
+        # Column titles, drawn at the same x offsets as the lines below
+        header = tk.Canvas(parent,
+                           height=ROW_HEIGHT,
+                           bg=colors['bg_light'],
+                           highlightthickness=0,
+                           borderwidth=0)
+        header.pack(fill=tk.X)
+        for key, title in (('number', "Report"), ('status', ""), ('label', "Label"),
+                           ('models', "Models")):
+            header.create_text(COLUMN_X[key], ROW_HEIGHT // 2, text=title, anchor=tk.W,
+                               font=('Segoe UI', 8, 'bold'), fill=colors['text_secondary'])
+
+        frame = tk.Frame(parent, bg=colors['bg_medium'])
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        self.scrollbar = tk.Scrollbar(frame, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.canvas = tk.Canvas(frame,
+                                width=270,
+                                bg=colors['bg_medium'],
+                                highlightthickness=0,
+                                borderwidth=0)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.canvas.bind('<Configure>', self.on_resize)
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<MouseWheel>', self.on_mousewheel)
+        self.canvas.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.canvas.bind('<Button-5>', lambda e: self.scroll(3))
+
+    def on_resize(self, event):
+        """Grow the pool of line items to fill the canvas height"""
+        self.visible = max(1, event.height // ROW_HEIGHT + 1)
+        width = event.width
+        while len(self.lines) < self.visible:
+            y = len(self.lines) * ROW_HEIGHT
+            font = ('Segoe UI', 9)
+            self.lines.append({
+                'background': self.canvas.create_rectangle(0, y, width, y + ROW_HEIGHT,
+                                                           width=0, fill=''),
+                'number': self.canvas.create_text(COLUMN_X['number'], y + ROW_HEIGHT // 2,
+                                                  anchor=tk.W, font=font),
+                'status': self.canvas.create_text(COLUMN_X['status'], y + ROW_HEIGHT // 2,
+                                                  anchor=tk.W, font=font),
+                'label': self.canvas.create_text(COLUMN_X['label'], y + ROW_HEIGHT // 2,
+                                                 anchor=tk.W, font=font),
+                'models': self.canvas.create_text(COLUMN_X['models'], y + ROW_HEIGHT // 2,
+                                                  anchor=tk.W, font=font),
+            })
+        for line in self.lines:
+            x0, y0, _, y1 = self.canvas.coords(line['background'])
+            self.canvas.coords(line['background'], x0, y0, width, y1)
+        if self.current is not None:
+            self.show(self.current)
+        self.redraw()
+
+    def schedule_redraw(self):
+        if self._redraw_job is None:
+            self._redraw_job = self.canvas.after_idle(self.redraw)
+
+    def redraw(self):
+        """Fill the visible lines from rows [top, top + visible)"""
+        self._redraw_job = None
+        total = len(self.df)
+        self.top = max(0, min(self.top, total - self.visible + 1))
+        stop = min(self.top + self.visible, total)
+
+        numbers = self.df.column('Report_Number').series(self.top, stop).to_numpy()
+        labels = pd.to_numeric(self.df.column('Manual_PE_Present').series(self.top, stop),
+                               errors='coerce').to_numpy(dtype=float)
+
+        for offset, line in enumerate(self.lines):
+            index = self.top + offset
+            if index >= stop:
+                for key in ('number', 'status', 'label', 'models'):
+                    self.canvas.itemconfigure(line[key], text='')
+                self.canvas.itemconfigure(line['background'], fill='')
+                continue
+
+            label = labels[offset]
+            if self.is_dirty(index):
+                status, status_color = '✎', self.colors['warning']
+            elif np.isnan(label):
+                status, status_color = '○', self.colors['text_secondary']
+            else:
+                status, status_color = '✓', self.colors['success']
+
+            if np.isnan(label):
+                label_text, label_color = '', self.colors['text_secondary']
+            elif label == 1:
+                label_text, label_color = 'PE', self.colors['danger']
+            else:
+                label_text, label_color = 'No PE', self.colors['text_primary']
+
+            agreement = int(self.agreement[index])
+            selected = index == self.current
+            text_color = '#ffffff' if selected else self.colors['text_primary']
+
+            self.canvas.itemconfigure(line['background'],
+                                      fill=self.colors['accent'] if selected else
+                                      (self.colors['bg_light'] if index % 2 else ''))
+            self.canvas.itemconfigure(line['number'], text=str(numbers[offset]), fill=text_color)
+            self.canvas.itemconfigure(line['status'], text=status,
+                                      fill=text_color if selected else status_color)
+            self.canvas.itemconfigure(line['label'], text=label_text,
+                                      fill=text_color if selected else label_color)
+            self.canvas.itemconfigure(line['models'], text=AGREEMENT_TEXT[agreement],
+                                      fill=text_color if selected or agreement != 0
+                                      else self.colors['warning'])
+
+        if total:
+            self.scrollbar.set(self.top / total, stop / total)
+
+    def scroll(self, rows):
+        self.top += rows
+        self.schedule_redraw()
+
+    def on_scrollbar(self, action, amount, unit=None):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'/'pages')"""
+        if action == 'moveto':
+            self.top = int(float(amount) * len(self.df))
+        elif unit == 'pages':
+            self.top += int(amount) * max(1, self.visible - 1)
+        else:
+            self.top += int(amount)
+        self.schedule_redraw()
+
+    def on_mousewheel(self, event):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        step = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-3 * step)
+
+    def on_click(self, event):
+        index = self.top + event.y // ROW_HEIGHT
+        if index < len(self.df):
+            self.on_select(index)
+
+    def show(self, index):
+        """Select the report on screen, scrolling it into view if needed"""
+        self.current = index
+        # The last line is usually cut off by the canvas edge
+        if not self.top <= index < self.top + self.visible - 1:
+            self.top = index - self.visible // 2
+        self.schedule_redraw()
+
+    def refresh_row(self, index):
+        """A row's review changed; redraw if it is on screen"""
+        if self.top <= index < self.top + self.visible:
+            self.schedule_redraw()
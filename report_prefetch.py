@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Report read-ahead
+Prepares the next reports off the Tk thread so navigation is a pure widget update
+"""
+
+import threading
+from collections import deque
+
+from report_text import format_reference_text
+from review_fields import parse_review
+from review_profile import Profiler
+
+
+class ReportPrefetcher(threading.Thread):
+    """Background stage keeping the next N rows ready while the reviewer reads row i
+
+    The next rows are i+1..i+N unless the app says otherwise (priority
+    order or a filtered view, where Next does not go to i+1).
+    """
+
+    def __init__(self, get_row, row_count, render_cache, ahead=10, behind=2, profiler=None):
+        super().__init__(name='ReportPrefetcher', daemon=True)
+        self.profiler = profiler or Profiler()
+        self.get_row = get_row
+        self.row_count = row_count
+        self.render_cache = render_cache
+        self.ahead = ahead
+        self.behind = behind
+
+        self.hits = 0
+        self.misses = 0
+        self.render_times = deque(maxlen=200)
+
+        self._cond = threading.Condition()
+        self._ready = {}
+        self._position = None
+        self._upcoming = []
+        self._generation = 0
+
+    def prepare(self, index):
+        """Everything load_report needs for one row
+
+        On a read-ahead miss this runs inside load_report, and its spans
+        show up in that frame's breakdown.
+        """
+        with self.profiler.span('prepare.row_fetch'):
+            row = self.get_row(index)
+        with self.profiler.span('prepare.format_report_text'):
+            # Formatting, keyword spans and sections, from the render cache when possible
+            text, spans, sections = self.render_cache.get(index, row['Report_Text'])
+        return {
+            'row': row,
+            'text': text,
+            'spans': spans,
+            'sections': sections,
+            'reference': format_reference_text(row),
+            'review': parse_review(row),
+        }
+
+    def take(self, index):
+        """Prepared row from the read-ahead window, preparing it now on a miss"""
+        with self._cond:
+            prepared = self._ready.get(index)
+        if prepared is not None:
+            self.hits += 1
+            return prepared
+
+        self.misses += 1
+        return self.prepare(index)
+
+    def request(self, index, upcoming=None):
+        """Move the read-ahead window to follow the reviewer
+
+        upcoming lists the rows Next will open, in order; by default the
+        rows after index.
+        """
+        if upcoming is None:
+            upcoming = range(index + 1, min(index + 1 + self.ahead, self.row_count))
+        upcoming = list(upcoming)[:self.ahead]
+        with self._cond:
+            keep = set(upcoming).union(range(index - self.behind, index + 1))
+            for stale in [i for i in self._ready if i not in keep]:
+                del self._ready[stale]
+            self._position = index
+            self._upcoming = upcoming
+            self._cond.notify()
+
+    def invalidate(self, index):
+        """Drop a prepared row whose review has changed"""
+        with self._cond:
+            self._ready.pop(index, None)
+            self._generation += 1
+
+    def record_render(self, seconds):
+        """Note how long load_report took"""
+        self.render_times.append(seconds)
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self):
+        """One-line hit rate and render latency report"""
+        if self.render_times:
+            mean_ms = sum(self.render_times) / len(self.render_times) * 1000
+            last_ms = self.render_times[-1] * 1000
+        else:
+            mean_ms = last_ms = 0.0
+        return (f"Prefetch hit rate {self.hit_rate:.0%} ({self.hits}/{self.hits + self.misses}) • "
+                f"render last {last_ms:.1f} ms, mean {mean_ms:.1f} ms")
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._position is not None)
+                self._position = None
+                upcoming = self._upcoming
+
+            for index in upcoming:
+                with self._cond:
+                    # Follow the reviewer if they moved on while we were working
+                    if self._position is not None:
+                        break
+                    if index in self._ready:
+                        continue
+                    generation = self._generation
+
+                prepared = self.prepare(index)
+
+                with self._cond:
+                    # A save during prepare may have made this copy stale
+                    if generation == self._generation:
+                        self._ready[index] = prepared
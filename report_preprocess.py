@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+"""
+Report preprocessing
+Keyword spans, keyword hit counts (plain and negated) and section offsets for
+every report, computed ahead of a review session on all cores
+
+    python report_preprocess.py [--workers 8] [--chunk-size 2000] [--restart]
+
+Results go to <csv>.preprocessed/, one file per chunk of rows, so an
+interrupted run picks up where it stopped. The cohort comes from config.ini,
+as in the app.
+"""
+
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from report_hits import lowercase_pattern, scan_texts
+from report_text import KeywordHighlighter, format_report_text, load_keywords, split_sections
+
+
+PREPROCESS_VERSION = 3
+
+
+def chunk_path(directory, start):
+    return os.path.join(directory, f'chunk_{start:09d}.npz')
+
+
+def pack_strings(strings):
+    """Strings as one UTF-8 buffer plus an offsets array, as in cohort_store.TextColumn
+
+    Section headers can span lines ("CTA CHEST WITH CONTRAST\nFINDINGS"),
+    so no separator character is safe.
+    """
+    encoded = [string.encode('utf-8') for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def unpack_strings(buffer, offsets):
+    raw = buffer.tobytes()
+    return [raw[start:end].decode('utf-8') for start, end in zip(offsets[:-1], offsets[1:])]
+
+
+# Set in each worker process by _init_worker, so the keyword regexes are compiled once per process
+_highlighter = None
+_hit_patterns = None
+
+
+def _init_worker(keywords):
+    global _highlighter, _hit_patterns
+    _highlighter = KeywordHighlighter(keywords)
+    _hit_patterns = [lowercase_pattern(k) for k in keywords]
+
+
+def process_chunk(directory, start, texts):
+    """Worker: scan one chunk of report texts and write its arrays; returns the row count"""
+    rows = len(texts)
+    lengths = np.zeros(rows, dtype=np.int32)
+    hits, negated = scan_texts(texts, _hit_patterns)
+    span_offsets = np.zeros(rows + 1, dtype=np.int64)
+    section_offsets = np.zeros(rows + 1, dtype=np.int64)
+    spans = []
+    section_starts = []
+    section_names = []
+    vocabulary = {}
+
+    for i, text in enumerate(texts):
+        # Same formatting as the display, so offsets index the text on screen
+        formatted = format_report_text(text if isinstance(text, str) else str(text))
+        lengths[i] = len(formatted)
+        spans.extend(_highlighter.spans(formatted))
+        span_offsets[i + 1] = len(spans)
+        for offset, header in split_sections(formatted):
+            section_starts.append(offset)
+            section_names.append(vocabulary.setdefault(header, len(vocabulary)))
+        section_offsets[i + 1] = len(section_starts)
+
+    headers, header_offsets = pack_strings(vocabulary)
+    path = chunk_path(directory, start)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f,
+                 lengths=lengths,
+                 hits=hits,
+                 negated=negated,
+                 span_offsets=span_offsets,
+                 spans=np.array(spans, dtype=np.int32).reshape(-1, 2),
+                 section_offsets=section_offsets,
+                 section_starts=np.array(section_starts, dtype=np.int32),
+                 section_names=np.array(section_names, dtype=np.int32),
+                 headers=headers,
+                 header_offsets=header_offsets)
+    # The rename marks the chunk done; a killed run leaves only .tmp files behind
+    os.replace(tmp_path, path)
+    return rows
+
+
+class Preprocessed:
+    """Columnar preprocessing results for a whole cohort
+
+    Per-row values are concatenated across chunks: lengths and the hit
+    matrices (see report_hits.py) are indexed by row, spans and sections are ragged arrays with an offsets
+    array of length rows + 1 (as in the search index). Spans and section
+    starts are character offsets into format_report_text(text).
+    """
+
+    def __init__(self, keywords, lengths, hits, negated, span_offsets, spans, section_offsets,
+                 section_starts, section_names, headers):
+        self.keywords = keywords
+        self.lengths = lengths
+        self.hits = hits
+        self.negated = negated
+        self.span_offsets = span_offsets
+        self.spans_array = spans
+        self.section_offsets = section_offsets
+        self.section_starts = section_starts
+        self.section_names = section_names
+        self.headers = headers
+
+    def __len__(self):
+        return len(self.lengths)
+
+    @staticmethod
+    def directory_for(csv_path):
+        return csv_path + '.preprocessed'
+
+    @classmethod
+    def load(cls, csv_path, signature, keywords):
+        """Results of a finished run for these reports and keywords, or None"""
+        directory = cls.directory_for(csv_path)
+        manifest = read_manifest(directory)
+        if manifest is None or manifest != make_manifest(signature, keywords,
+                                                         manifest.get('rows'),
+                                                         manifest.get('chunk_size')):
+            return None
+        paths = [chunk_path(directory, start)
+                 for start in range(0, manifest['rows'], manifest['chunk_size'])]
+        if not paths or not all(os.path.exists(path) for path in paths):
+            # An unfinished run; the next one resumes it
+            return None
+
+        parts = {key: [] for key in ('lengths', 'hits', 'negated', 'span_offsets', 'spans',
+                                     'section_offsets', 'section_starts', 'section_names')}
+        headers = {}
+        span_base = section_base = 0
+        try:
+            for path in paths:
+                with np.load(path, allow_pickle=False) as data:
+                    # Section names are numbered per chunk; renumber them cohort-wide
+                    names = unpack_strings(data['headers'], data['header_offsets'])
+                    remap = np.array([headers.setdefault(h, len(headers)) for h in names],
+                                     dtype=np.int32)
+                    if len(data['section_names']) and data['section_names'].max() >= len(remap):
+                        raise ValueError(f"section names out of range in {path}")
+                    parts['lengths'].append(data['lengths'])
+                    parts['hits'].append(data['hits'])
+                    parts['negated'].append(data['negated'])
+                    parts['spans'].append(data['spans'])
+                    parts['section_starts'].append(data['section_starts'])
+                    parts['section_names'].append(remap[data['section_names']])
+                    # Shift each chunk's offsets past the entries of the chunks before it
+                    parts['span_offsets'].append(data['span_offsets'][1:] + span_base)
+                    parts['section_offsets'].append(data['section_offsets'][1:] + section_base)
+                    span_base += len(data['spans'])
+                    section_base += len(data['section_starts'])
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable preprocessing results in {directory}: {e}")
+            return None
+
+        zero = [np.zeros(1, dtype=np.int64)]
+        return cls(list(keywords),
+                   np.concatenate(parts['lengths']),
+                   np.concatenate(parts['hits']),
+                   np.concatenate(parts['negated']),
+                   np.concatenate(zero + parts['span_offsets']),
+                   np.concatenate(parts['spans']),
+                   np.concatenate(zero + parts['section_offsets']),
+                   np.concatenate(parts['section_starts']),
+                   np.concatenate(parts['section_names']),
+                   sorted(headers, key=headers.get))
+
+    def spans(self, index):
+        """Keyword spans of a row, as KeywordHighlighter.spans() returns them"""
+        return [tuple(span) for span in
+                self.spans_array[self.span_offsets[index]:self.span_offsets[index + 1]].tolist()]
+
+    def sections(self, index):
+        """(start offset, header) of each section of a row, as split_sections() returns them"""
+        low, high = self.section_offsets[index], self.section_offsets[index + 1]
+        return [(int(start), self.headers[name]) for start, name in
+                zip(self.section_starts[low:high], self.section_names[low:high])]
+
+
+def make_manifest(signature, keywords, rows, chunk_size):
+    return {
+        'version': PREPROCESS_VERSION,
+        'signature': signature,
+        'keywords': list(keywords),
+        'rows': rows,
+        'chunk_size': chunk_size,
+    }
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, 'manifest.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def prepare_directory(directory, manifest, restart=False):
+    """Chunk starts already done; clears results computed for other reports or settings"""
+    if not restart and read_manifest(directory) == manifest:
+        done = set()
+        for path in glob.glob(os.path.join(directory, 'chunk_*.npz')):
+            done.add(int(os.path.basename(path)[len('chunk_'):-len('.npz')]))
+        return done
+
+    if os.path.isdir(directory):
+        shutil.rmtree(directory)
+    os.makedirs(directory)
+    tmp_path = os.path.join(directory, 'manifest.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(directory, 'manifest.json'))
+    return set()
+
+
+def preprocess(store, csv_path, keywords, workers=None, chunk_size=2000, restart=False,
+               progress=None):
+    """Fan the cohort's reports out over worker processes, chunk by chunk
+
+    The parent only slices report text out of the store and hands it over;
+    formatting and scanning happen in the workers, which write their own
+    chunk files. At most two chunks per worker are in flight, which bounds
+    memory and keeps every worker busy. Returns the number of rows processed
+    by this run (chunks done by an earlier run are skipped).
+    """
+    from report_search import cohort_signature
+
+    workers = workers or os.cpu_count() or 1
+    rows = len(store)
+    directory = Preprocessed.directory_for(csv_path)
+    manifest = make_manifest(cohort_signature(store), keywords, rows, chunk_size)
+    done = prepare_directory(directory, manifest, restart)
+    todo = [start for start in range(0, rows, chunk_size) if start not in done]
+    total = sum(min(chunk_size, rows - start) for start in todo)
+
+    text = store.column('Report_Text')
+    processed = 0
+    pending = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(list(keywords),)) as pool:
+        for start in todo:
+            if len(pending) >= 2 * workers:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    processed += future.result()
+                if progress is not None:
+                    progress(processed, total)
+            texts = text.series(start, min(start + chunk_size, rows)).tolist()
+            pending.add(pool.submit(process_chunk, directory, start, texts))
+        for future in pending:
+            processed += future.result()
+    return processed
+
+
+def load_preprocessed(config, csv_path, store):
+    """Preprocessing results matching the cohort and the [HIGHLIGHT] keywords, if any"""
+    from report_search import cohort_signature
+
+    if not os.path.isdir(Preprocessed.directory_for(csv_path)):
+        return None
+    return Preprocessed.load(csv_path, cohort_signature(store), load_keywords(config))
+
+
+def main(argv=None):
+    from review_batch import load_config, resolve_csv_path
+    from review_storage import open_storage
+
+    parser = argparse.ArgumentParser(description="Precompute keyword highlights, hit counts "
+                                                 "and sections for every report")
+    parser.add_argument('--config', help="config.ini to use (default: next to this script)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: one per core)")
+    parser.add_argument('--chunk-size', type=int, default=2000, help="Reports per chunk file")
+    parser.add_argument('--restart', action='store_true',
+                        help="Discard earlier partial results and start over")
+    args = parser.parse_args(argv)
+
+    config = load_config(args.config)
+    csv_path = resolve_csv_path(config, args.config)
+    storage = open_storage(config, csv_path)
+
+    def show_progress(done, total):
+        print(f"\r{done}/{total} reports", end='', flush=True)
+
+    try:
+        store = storage.load()
+        print(f"Loaded {len(store)} reports")
+
+        started = time.perf_counter()
+        processed = preprocess(store, csv_path, load_keywords(config), workers=args.workers,
+                               chunk_size=args.chunk_size, restart=args.restart,
+                               progress=show_progress)
+        elapsed = time.perf_counter() - started
+    finally:
+        storage.close()
+
+    rate = f" ({processed / elapsed:.0f} reports/s)" if processed and elapsed > 0 else ""
+    print(f"\rPreprocessed {processed} reports with {args.workers} worker(s) "
+          f"in {elapsed:.1f}s{rate}")
+    if processed < len(store):
+        print(f"{len(store) - processed} reports were already done by an earlier run")
+    print(f"Results in {Preprocessed.directory_for(csv_path)}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Report search
+Inverted index over the report text, built in the background and kept next to the CSV
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+from array import array
+
+import numpy as np
+
+
+INDEX_VERSION = 1
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+
+# Longer "words" are usually encoded data; they are not worth a vocabulary entry
+MAX_TOKEN_LENGTH = 40
+
+# Columns a query can match exactly (identifiers rather than text)
+ID_COLUMNS = ['Report_Number', 'EMPI']
+
+
+def tokenize(text):
+    """Lowercase alphanumeric words"""
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if len(t) <= MAX_TOKEN_LENGTH]
+
+
+def parse_query(query):
+    """Split a query into phrases (quoted) and single terms, each a list of tokens"""
+    parts = []
+    for phrase, term in QUERY_PATTERN.findall(query):
+        tokens = tokenize(phrase or term)
+        if tokens:
+            parts.append(tokens)
+    return parts
+
+
+def match_pattern(query):
+    """Regex finding the query's terms and phrases in displayed report text"""
+    alternatives = ['\\b' + r'\W+'.join(re.escape(t) for t in tokens) + '\\b'
+                    for tokens in sorted(parse_query(query), key=len, reverse=True)]
+    if not alternatives:
+        return None
+    return re.compile('|'.join(alternatives), re.IGNORECASE)
+
+
+def phrase_pattern(tokens):
+    """Regex for a phrase in lowercased text
+
+    Without IGNORECASE or a leading word boundary the regex engine can jump
+    straight to the first word; contains_phrase() checks the boundary instead.
+    """
+    return re.compile(r'\W+'.join(re.escape(t) for t in tokens) + r'\b')
+
+
+def contains_phrase(lowered, pattern):
+    for match in pattern.finditer(lowered):
+        start = match.start()
+        if start == 0 or not lowered[start - 1].isalnum():
+            return True
+    return False
+
+
+def cohort_signature(df):
+    """Identifies the set of reports: their Report_Numbers and their text
+
+    The text is part of it so that a re-exported CSV with corrected reports
+    does not reuse search, keyword hit and preprocessing files built from
+    the old text.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    digest.update('\x1f'.join(map(str, df['Report_Number'])).encode('utf-8'))
+    if 'Report_Text' in df.columns:
+        digest.update(df.column('Report_Text').digest().encode())
+    return digest.hexdigest()
+
+
+class SearchIndex:
+    """Term -> sorted row list, stored as one postings array plus per-term offsets
+
+    Postings are per report rather than per position; phrases are checked
+    against the text of candidate rows only, stopping once enough results
+    are found, so query time does not grow with the cohort.
+    """
+
+    def __init__(self, vocabulary, offsets, postings, signature):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.postings = postings
+        self.signature = signature
+
+    @classmethod
+    def build(cls, get_text, row_count, signature, progress=None):
+        """Tokenize every report; progress(done, total) is called now and then"""
+        vocabulary = {}
+        term_ids = array('i')
+        rows = array('i')
+
+        for index in range(row_count):
+            text = get_text(index)
+            if isinstance(text, str):
+                # Deduplicate words before looking them up
+                ids = [vocabulary.setdefault(t, len(vocabulary))
+                       for t in set(TOKEN_PATTERN.findall(text.lower()))
+                       if len(t) <= MAX_TOKEN_LENGTH]
+                term_ids.extend(ids)
+                rows.extend([index] * len(ids))
+            if progress is not None and index % 2000 == 0:
+                progress(index, row_count)
+
+        term_ids = np.frombuffer(term_ids, dtype=np.int32)
+        rows = np.frombuffer(rows, dtype=np.int32)
+        # Stable sort keeps rows ascending within each term
+        order = np.argsort(term_ids, kind='stable')
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(vocabulary)), out=offsets[1:])
+        return cls(vocabulary, offsets, rows[order], signature)
+
+    @staticmethod
+    def path_for(csv_path):
+        return csv_path + '.search.npz'
+
+    def save(self, path):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f,
+                     version=np.array(INDEX_VERSION),
+                     signature=np.array(self.signature),
+                     terms=np.frombuffer('\n'.join(terms).encode('utf-8'), dtype=np.uint8),
+                     offsets=self.offsets,
+                     postings=self.postings)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, signature):
+        """The saved index, or None if missing or built for other reports"""
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if int(data['version']) != INDEX_VERSION or str(data['signature']) != signature:
+                    return None
+                raw = data['terms'].tobytes().decode('utf-8')
+                terms = raw.split('\n') if raw else []
+                return cls({t: i for i, t in enumerate(terms)}, data['offsets'],
+                           data['postings'], signature)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable search index {path}: {e}")
+            return None
+
+    def rows_with(self, token):
+        term = self.vocabulary.get(token)
+        if term is None:
+            return self.postings[:0]
+        return self.postings[self.offsets[term]:self.offsets[term + 1]]
+
+    def candidates(self, parts):
+        """Rows containing every token of the query, ascending"""
+        tokens = {t for tokens in parts for t in tokens}
+        lists = sorted((self.rows_with(t) for t in tokens), key=len)
+        if not lists:
+            return self.postings[:0]
+        rows = lists[0]
+        for other in lists[1:]:
+            if not len(rows):
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+        return rows
+
+
+class ReportSearch:
+    """Search over a cohort: exact Report_Number/EMPI matches, then text matches
+
+    The index is built (or loaded) on a background thread; until it is
+    ready only identifier lookups return results.
+    """
+
+    def __init__(self, df, csv_path, get_text):
+        self.df = df
+        self.csv_path = csv_path
+        self.get_text = get_text
+        self.index = None
+        self.ids = None
+        self.progress = 0.0
+        self.build_seconds = None
+        self._thread = threading.Thread(target=self._prepare, name='SearchIndexer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    @property
+    def ready(self):
+        return self.index is not None
+
+    def _prepare(self):
+        started = time.perf_counter()
+
+        ids = {}
+        for column in ID_COLUMNS:
+            if column in self.df.columns:
+                for index, value in enumerate(self.df[column].astype(str).str.lower()):
+                    ids.setdefault(value, []).append(index)
+        self.ids = ids
+
+        signature = cohort_signature(self.df)
+        path = SearchIndex.path_for(self.csv_path)
+        index = SearchIndex.load(path, signature)
+        if index is None:
+            index = SearchIndex.build(self.get_text, len(self.df), signature,
+                                      progress=self._report_progress)
+            try:
+                index.save(path)
+            except OSError as e:
+                print(f"Could not save search index {path}: {e}")
+        self.index = index
+        self.build_seconds = time.perf_counter() - started
+
+    def _report_progress(self, done, total):
+        self.progress = done / total if total else 1.0
+
+    def search(self, query, limit=200):
+        """Matching rows (at most limit) and whether more were left out"""
+        query = query.strip()
+        if not query:
+            return [], False
+
+        rows = list((self.ids or {}).get(query.lower(), []))
+        parts = parse_query(query)
+        if not parts or self.index is None:
+            return rows[:limit], len(rows) > limit
+
+        candidates = self.index.candidates(parts)
+        phrases = [phrase_pattern(tokens) for tokens in parts if len(tokens) > 1]
+
+        seen = set(rows)
+        for index in candidates:
+            if len(rows) > limit:
+                break
+            index = int(index)
+            if index in seen:
+                continue
+            if phrases:
+                # Every phrase must appear as written, not just its words
+                text = self.get_text(index)
+                if not isinstance(text, str):
+                    continue
+                lowered = text.lower()
+                if not all(contains_phrase(lowered, p) for p in phrases):
+                    continue
+            rows.append(index)
+        return rows[:limit], len(rows) > limit
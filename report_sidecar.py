@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+Memory-mapped report sidecar
+Report bodies as one UTF-8 blob next to the CSV, decoded only when displayed
+"""
+
+import hashlib
+import json
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+
+
+SIDECAR_VERSION = 2
+
+
+def fingerprint(path, sample_bytes=1024 * 1024):
+    """Size, mtime and a hash of the first and last MiB of a file"""
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        digest.update(f.read(sample_bytes))
+        if stat.st_size > sample_bytes:
+            f.seek(max(stat.st_size - sample_bytes, sample_bytes))
+            digest.update(f.read(sample_bytes))
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+
+def text_digest(content, offsets):
+    """Finish a text column's hash
+
+    content is a blake2b already fed the column's UTF-8 bytes in row order;
+    offsets are the value boundaries starting from 0. Missing values count as
+    empty strings, so in-memory, lazy and sidecar columns can be compared.
+    """
+    content.update(np.asarray(offsets, dtype=np.int64).tobytes())
+    return content.hexdigest()
+
+
+class ReportSidecar:
+    """<csv>.reports holds the text; <csv>.reports.json describes and validates it
+
+    The blob is every text column's values concatenated, followed by an
+    int64 offsets array of shape (columns, rows + 1). Empty strings stand
+    for missing values, as they do in the CSV.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.path = csv_path + '.reports'
+        self.meta_path = csv_path + '.reports.json'
+        self.meta = None
+        self.offsets = None
+        self._file = None
+        self._map = None
+
+    def is_valid(self, columns, rows):
+        """True if the sidecar exists and matches the current CSV"""
+        if not (os.path.exists(self.path) and os.path.exists(self.meta_path)):
+            return False
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except ValueError:
+            return False
+        return (meta.get('version') == SIDECAR_VERSION
+                and meta.get('columns') == list(columns)
+                and meta.get('rows') == rows
+                and meta.get('source') == fingerprint(self.csv_path))
+
+    def build(self, columns, chunksize=20000):
+        """Stream the text columns of the CSV into the sidecar"""
+        lengths = [[] for _ in columns]
+        contents = [hashlib.blake2b(digest_size=16) for _ in columns]
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as blob:
+            # One pass per column keeps each column contiguous in the blob
+            for c, name in enumerate(columns):
+                for chunk in pd.read_csv(self.csv_path, usecols=[name], chunksize=chunksize):
+                    for value in chunk[name].to_numpy(dtype=object):
+                        encoded = value.encode('utf-8') if isinstance(value, str) else b''
+                        blob.write(encoded)
+                        contents[c].update(encoded)
+                        lengths[c].append(len(encoded))
+
+            rows = len(lengths[0]) if columns else 0
+            offsets = np.zeros((len(columns), rows + 1), dtype=np.int64)
+            base = 0
+            for c in range(len(columns)):
+                np.cumsum(lengths[c], out=offsets[c, 1:])
+                offsets[c] += base
+                base = offsets[c, -1]
+            digests = {name: text_digest(contents[c], offsets[c] - offsets[c, 0])
+                       for c, name in enumerate(columns)}
+            offsets_start = blob.tell()
+            blob.write(offsets.tobytes())
+            blob.flush()
+            os.fsync(blob.fileno())
+
+        self.close()
+        os.replace(tmp_path, self.path)
+        self._write_meta({
+            'version': SIDECAR_VERSION,
+            'columns': list(columns),
+            'rows': rows,
+            'offsets_start': offsets_start,
+            'digests': digests,
+            'source': fingerprint(self.csv_path),
+        })
+
+    def _write_meta(self, meta):
+        tmp_path = self.meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self.meta_path)
+        self.meta = meta
+
+    def open(self):
+        """Map the sidecar; nothing is read until a report is decoded"""
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        shape = (len(self.meta['columns']), self.meta['rows'] + 1)
+        self._file = open(self.path, 'rb')
+        if os.path.getsize(self.path) > 0:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.offsets = np.memmap(self.path, dtype=np.int64, mode='r',
+                                 offset=self.meta['offsets_start'], shape=shape)
+
+    def close(self):
+        self.offsets = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def text(self, column, index):
+        """Decode one value; empty means missing"""
+        c = self.meta['columns'].index(column)
+        start, end = int(self.offsets[c, index]), int(self.offsets[c, index + 1])
+        if start == end:
+            return np.nan
+        return self._map[start:end].decode('utf-8')
+
+    def source_rewritten(self):
+        """The CSV was rewritten by compaction with identical text; re-stamp it"""
+        meta = dict(self.meta)
+        meta['source'] = fingerprint(self.csv_path)
+        self._write_meta(meta)
+
+
+class MappedTextColumn:
+    """Text column backed by the memory-mapped sidecar"""
+
+    def __init__(self, sidecar, name):
+        self.sidecar = sidecar
+        self.name = name
+
+    def get(self, index):
+        return self.sidecar.text(self.name, index)
+
+    def set(self, index, value):
+        raise TypeError("Text columns are read-only")
+
+    def series(self, start, stop):
+        return pd.Series([self.get(i) for i in range(start, stop)], dtype=object)
+
+    def digest(self):
+        """Hash of the column's text, recorded when the sidecar was built"""
+        return self.sidecar.meta['digests'][self.name]
+
+    @property
+    def nbytes(self):
+        # Pages are mapped on demand and belong to the OS page cache
+        return 0
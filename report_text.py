@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Report text processing
+Formatting, section layout, keyword highlighting and a render cache for the report display
+"""
+
+import re
+import sys
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+
+# Keywords to highlight (case-insensitive regular expressions)
+DEFAULT_KEYWORDS = [
+    'pulmonary embolism',
+    'pulmonary emboli',
+    'embolism',
+    'emboli',
+    'embolus',
+    'thrombus',
+    'thrombi',
+    r'\bPE\b',  # Word boundary to avoid matching in other words
+]
+
+
+# ALL CAPS section headers followed by ":" (e.g. FINDINGS:, IMPRESSION:)
+HEADER_PATTERN = re.compile(r'\b([A-Z]{2,}[A-Z\s]*?):')
+EXCESS_BREAKS_PATTERN = re.compile(r'\n{3,}')
+
+
+def format_report_text(text):
+    """Format report text with paragraph breaks"""
+    # Add double line break before ALL CAPS words followed by ":"
+    formatted = HEADER_PATTERN.sub(r'\n\n\1:', text)
+
+    # Clean up multiple consecutive line breaks (max 2)
+    formatted = EXCESS_BREAKS_PATTERN.sub('\n\n', formatted)
+
+    # Remove leading/trailing whitespace
+    return formatted.strip()
+
+
+def split_sections(formatted):
+    """(start offset, header) of each section of formatted text
+
+    Text before the first header is a section with an empty header. The
+    same pattern decides the paragraph breaks in format_report_text.
+    """
+    sections = []
+    for match in HEADER_PATTERN.finditer(formatted):
+        if not sections and match.start() > 0:
+            sections.append((0, ''))
+        sections.append((match.start(), match.group(1).strip()))
+    return sections or [(0, '')]
+
+
+def load_open_sections(config):
+    """Section headers always shown expanded, from [DISPLAY] open_sections"""
+    raw = config.get('DISPLAY', 'open_sections', fallback='IMPRESSION')
+    return {name.strip().upper() for name in raw.split(',') if name.strip()}
+
+
+class ReportSection:
+    """One section of a formatted report, as the viewer lays it out
+
+    title is the header through its ":" ('' for text before the first
+    header), body the rest of the section and separator the blank lines
+    after it. spans are keyword offsets from the start of the title.
+    """
+
+    __slots__ = ('header', 'title', 'body', 'separator', 'spans', 'open')
+
+    def __init__(self, header, title, body, separator, spans, open):
+        self.header = header
+        self.title = title
+        self.body = body
+        self.separator = separator
+        self.spans = spans
+        self.open = open
+
+
+def layout_sections(formatted, spans, sections, open_headers=()):
+    """Cut formatted text into ReportSections at split_sections() offsets
+
+    A section starts open when its header is in open_headers, when it has
+    a keyword hit in its body, or when it has no header (text before the
+    first one); the viewer inserts the others only once they are needed.
+    """
+    layout = []
+    starts = [start for start, _ in spans]
+    bounds = [start for start, _ in sections] + [len(formatted)]
+    for (start, header), end in zip(sections, bounds[1:]):
+        text = formatted[start:end]
+        title_length = text.find(':') + 1 if header else 0
+        content = text.rstrip('\n')
+        local = [(s - start, e - start) for s, e in
+                 spans[bisect_left(starts, start):bisect_left(starts, end)]]
+        layout.append(ReportSection(
+            header,
+            text[:title_length],
+            content[title_length:],
+            text[len(content):],
+            local,
+            not header or header in open_headers
+            or any(e > title_length for _, e in local)))
+    return layout
+
+
+def format_reference_text(row):
+    """Summarize the AI predictions shown under the report"""
+    return (
+        f"SVM: {row['SVM_PE_Prediction']} ({row['SVM_Probability']:.2f}) | "
+        f"LLM: {row['LLM_PE_Binary']} ({row['LLM_Confidence']}) | "
+        f"Regex: {row['Regex_PE_Prediction']}\n"
+        f"LLM Location: {row['PE_Location']} | "
+        f"Acuity: {row['PE_Acuity']} | "
+        f"Laterality: {row['PE_Laterality']} | "
+        f"Burden: {row['PE_Clot_Burden']}"
+    )
+
+
+def load_keywords(config):
+    """Read the highlight keyword list from config.ini, one pattern per line"""
+    raw = config.get('HIGHLIGHT', 'keywords', fallback='')
+    keywords = [line.strip() for line in raw.splitlines() if line.strip()]
+    return keywords or list(DEFAULT_KEYWORDS)
+
+
+class KeywordHighlighter:
+    """Single-pass keyword matcher producing Tk text ranges"""
+
+    def __init__(self, keywords=None):
+        self.keywords = list(keywords or DEFAULT_KEYWORDS)
+
+        # Longest alternative first, so "pulmonary embolism" wins over "embolism"
+        ordered = sorted(self.keywords, key=len, reverse=True)
+        self.pattern = re.compile('|'.join(f'(?:{k})' for k in ordered), re.IGNORECASE)
+
+        # Identifies the keyword set, for caches of precomputed spans
+        self.version = hash(tuple(self.keywords))
+
+    def spans(self, text):
+        """Character offsets (start, end) of every keyword hit"""
+        return [match.span() for match in self.pattern.finditer(text)]
+
+    @staticmethod
+    def to_indices(text, spans, line=1, column=0):
+        """Convert character offsets to flat [start, end, ...] line.col indices
+
+        line and column give the widget index where text begins, for text
+        inserted after other text.
+        """
+        if not spans:
+            return []
+
+        # Offsets of each line start, computed once per text
+        line_starts = [0]
+        line_starts.extend(m.end() for m in re.finditer('\n', text))
+
+        indices = []
+        for start, end in spans:
+            for offset in (start, end):
+                number = bisect_right(line_starts, offset)
+                col = offset - line_starts[number - 1]
+                if number == 1:
+                    col += column
+                indices.append(f"{number + line - 1}.{col}")
+        return indices
+
+    def apply(self, widget, text, tag='highlight', spans=None):
+        """Tag all keyword hits in a Text widget holding exactly text"""
+        widget.tag_remove(tag, '1.0', 'end')
+        if spans is None:
+            spans = self.spans(text)
+        indices = self.to_indices(text, spans)
+        if indices:
+            # One batched call instead of one tag_add per hit
+            widget.tag_add(tag, *indices)
+        return spans
+
+
+class RenderCache:
+    """LRU cache of formatted text, highlight spans and section offsets per row, capped by memory
+
+    With precomputed results (report_preprocess.py) a miss only reformats
+    the text; the keyword spans and sections are looked up instead of
+    scanned for.
+    """
+
+    def __init__(self, highlighter, max_bytes=64 * 1024 * 1024, precomputed=None):
+        self.highlighter = highlighter
+        self.precomputed = precomputed
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, index):
+        return (index, self.highlighter.version) in self._entries
+
+    def get(self, index, text):
+        """Formatted text, spans and sections for a row, rendering and caching on a miss"""
+        key = (index, self.highlighter.version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry[0], entry[1], entry[2]
+
+        return self.put(index, text)
+
+    def put(self, index, text):
+        """Render a row and store it, evicting least recently used rows"""
+        formatted = format_report_text(str(text))
+        if self.precomputed is not None and index < len(self.precomputed):
+            spans = self.precomputed.spans(index)
+            sections = self.precomputed.sections(index)
+        else:
+            spans = self.highlighter.spans(formatted)
+            sections = split_sections(formatted)
+        size = sys.getsizeof(formatted) + 64 * (len(spans) + len(sections))
+
+        key = (index, self.highlighter.version)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[3]
+            self._entries[key] = (formatted, spans, sections, size)
+            self.size += size
+            while self.size > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, _, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+        return formatted, spans, sections
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+"""
+Headless batch adjudication
+Bulk operations on the cohort without the review window
+
+    python review_batch.py accept-agreed [--label 0|1] [--confidence low] [--dry-run]
+    python review_batch.py import other_reviews.csv [--overwrite] [--dry-run]
+    python review_batch.py stats [--json]
+    python review_batch.py export reviewed.csv
+
+The cohort and storage backend come from config.ini, as in the app.
+"""
+
+import argparse
+import configparser
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from review_fields import (REVIEW_COLUMNS, collect_review, option_values, parse_review,
+                           validate_review)
+from review_index import MODEL_COLUMNS, ReviewStats, model_predictions, unreviewed_mask
+from review_storage import CohortInUse, CohortLock, open_storage
+
+
+# LLM prediction columns used to fill in the characteristics of accepted PE-positive rows
+LLM_CHARACTERISTICS = {
+    'Manual_PE_Location': 'PE_Location',
+    'Manual_PE_Acuity': 'PE_Acuity',
+    'Manual_PE_Laterality': 'PE_Laterality',
+    'Manual_PE_Clot_Burden': 'PE_Clot_Burden',
+}
+
+
+def load_config(path=None):
+    """config.ini next to this script, or the given file"""
+    config = configparser.ConfigParser()
+    path = path or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.ini')
+    if not config.read(path):
+        raise SystemExit(f"config.ini file not found: {path}")
+    return config
+
+
+def resolve_csv_path(config, config_path=None):
+    """csv_file from config.ini, relative paths taken from the config's folder"""
+    csv_file = config.get('DATA', 'csv_file', fallback='')
+    if not csv_file:
+        raise SystemExit("No CSV file specified in config.ini")
+    if not os.path.isabs(csv_file):
+        base = os.path.dirname(os.path.abspath(config_path or __file__))
+        csv_file = os.path.join(base, csv_file)
+    if not os.path.exists(csv_file):
+        raise SystemExit(f"CSV file not found: {csv_file}")
+    return csv_file
+
+
+def agreed_rows(store, label=None):
+    """Unreviewed rows where every model gives the same prediction
+
+    Returns (rows, labels). label=0 or 1 keeps only that agreed label.
+    """
+    predictions = model_predictions(store)
+    first = predictions[:, 0]
+    agree = ~np.isnan(predictions).any(axis=1) & (predictions == first[:, None]).all(axis=1)
+    agree &= unreviewed_mask(store['Manual_PE_Present'])
+    if label is not None:
+        agree &= first == label
+    rows = np.flatnonzero(agree)
+    return rows, first[rows].astype(int)
+
+
+def accept_agreed(store, label=None, confidence='low'):
+    """Review records accepting the models' label wherever all of them agree
+
+    PE-positive rows take their characteristics from the LLM columns when
+    those hold a valid form option, and "Unknown" otherwise, so every
+    record passes the same validation as a review saved in the app.
+    Confidence defaults to low so that machine-accepted rows are not
+    counted as confident manual reviews.
+    """
+    rows, labels = agreed_rows(store, label)
+    if not len(rows):
+        return []
+
+    fields = pd.DataFrame({
+        'Manual_PE_Present': labels.astype(str),
+        'Reviewer_Confidence': confidence,
+        'Comments': f"Batch accepted: {', '.join(MODEL_COLUMNS)} agree",
+    })
+    for field, column in LLM_CHARACTERISTICS.items():
+        if column in store.columns:
+            predicted = store[column].iloc[rows].astype(str).str.strip().to_numpy()
+        else:
+            predicted = np.full(len(rows), '')
+        fields[field] = np.where(np.isin(predicted, option_values(field)), predicted, 'Unknown')
+
+    report_numbers = store['Report_Number'].iloc[rows].to_numpy()
+    records = []
+    for index, report_number, row_fields in zip(rows, report_numbers,
+                                                fields.to_dict('records')):
+        records.append((int(index), report_number, collect_review(row_fields)))
+    return records
+
+
+def import_reviews(store, path, overwrite=False):
+    """Review records copied from another CSV, matched on Report_Number
+
+    Returns (records, skipped) where skipped maps a reason to a count.
+    Already reviewed rows are left alone unless overwrite is set.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    if 'Report_Number' not in header or 'Manual_PE_Present' not in header:
+        raise ValueError(f"{path} needs Report_Number and Manual_PE_Present columns")
+    other = pd.read_csv(path, usecols=['Report_Number'] + [c for c in REVIEW_COLUMNS if c in header],
+                        dtype={'Report_Number': str})
+    for column in REVIEW_COLUMNS:
+        if column not in other.columns:
+            other[column] = None
+    other = other[~unreviewed_mask(other['Manual_PE_Present'])]
+
+    # Report_Number -> row position in this cohort (first occurrence wins)
+    numbers = store['Report_Number'].astype(str).to_numpy()
+    positions = pd.Series(np.arange(len(numbers)), index=numbers)
+    positions = positions[~positions.index.duplicated()]
+    matched = positions.reindex(other['Report_Number'].to_numpy()).to_numpy()
+
+    skipped = {'not in cohort': int(np.isnan(matched).sum()), 'already reviewed': 0, 'invalid': 0}
+    keep = ~np.isnan(matched)
+    other, matched = other[keep], matched[keep].astype(int)
+
+    if not overwrite:
+        unreviewed = unreviewed_mask(store['Manual_PE_Present'])[matched]
+        skipped['already reviewed'] = int((~unreviewed).sum())
+        other, matched = other[unreviewed], matched[unreviewed]
+
+    records = []
+    for index, row in zip(matched, other.to_dict('records')):
+        fields = parse_review(row)
+        if validate_review(fields):
+            skipped['invalid'] += 1
+            continue
+        records.append((int(index), row['Report_Number'], collect_review(fields)))
+    return records, skipped
+
+
+def write_reviews(storage, store, records):
+    """Apply records to the store and persist them in one batch
+
+    The caller holds the cohort lock (see main): compacting rewrites the
+    whole CSV and deletes the journal, which must not happen under the app.
+    """
+    for index, _, values in records:
+        for column, value in values.items():
+            store.at[index, column] = value
+    storage.append_many(records)
+    storage.compact(store)
+
+
+def summarize(store):
+    """Review progress and model agreement, as a dict"""
+    stats = ReviewStats(store)
+    predictions = model_predictions(store)
+    complete = ~np.isnan(predictions).any(axis=1)
+    agree = complete & (predictions == predictions[:, :1]).all(axis=1)
+    unreviewed = unreviewed_mask(store['Manual_PE_Present'])
+
+    return {
+        'total': stats.total,
+        'reviewed': stats.reviewed,
+        'remaining': stats.remaining,
+        'pe': stats.pe_counts.get(1, 0),
+        'no_pe': stats.pe_counts.get(0, 0),
+        'confidence': {str(k): int(v) for k, v in stats.confidence_counts.items()},
+        'agreement_with_manual': {model: round(stats.agreement_rate(model), 4)
+                                  for model in stats.agreement},
+        'unreviewed_models_agree': int((agree & unreviewed).sum()),
+        'unreviewed_models_disagree': int((complete & ~agree & unreviewed).sum()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk operations on the review cohort")
+    parser.add_argument('--config', help="config.ini to use (default: next to this script)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    accept_parser = commands.add_parser(
+        'accept-agreed', help="Review every unreviewed row where SVM, LLM and Regex agree")
+    accept_parser.add_argument('--label', type=int, choices=[0, 1],
+                               help="Only accept rows where the models agree on this label")
+    accept_parser.add_argument('--confidence', default='low',
+                               choices=option_values('Reviewer_Confidence'),
+                               help="Reviewer_Confidence recorded on accepted rows (default: low, "
+                                    "so they are not counted as confident manual reviews)")
+    accept_parser.add_argument('--dry-run', action='store_true')
+
+    import_parser = commands.add_parser('import', help="Copy reviews from another cohort CSV")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--overwrite', action='store_true',
+                               help="Replace reviews already present in this cohort")
+    import_parser.add_argument('--dry-run', action='store_true')
+
+    stats_parser = commands.add_parser('stats', help="Recompute review statistics")
+    stats_parser.add_argument('--json', action='store_true')
+
+    export_parser = commands.add_parser('export', help="Write the reviewed cohort as CSV")
+    export_parser.add_argument('path')
+
+    args = parser.parse_args(argv)
+    config = load_config(args.config)
+    csv_path = resolve_csv_path(config, args.config)
+    storage = open_storage(config, csv_path)
+
+    # Commands that write hold the cohort for their whole run, and refuse to
+    # start while the review window has it open
+    lock = None
+    if args.command in ('accept-agreed', 'import') and not args.dry_run and not storage.shared:
+        lock = CohortLock(csv_path, "review_batch.py")
+        try:
+            lock.acquire()
+        except CohortInUse as e:
+            raise SystemExit(str(e))
+
+    try:
+        started = time.perf_counter()
+        store = storage.load()
+        print(f"Loaded {len(store)} reports in {time.perf_counter() - started:.1f}s")
+
+        if args.command in ('accept-agreed', 'import'):
+            started = time.perf_counter()
+            if args.command == 'accept-agreed':
+                records = accept_agreed(store, args.label, args.confidence)
+            else:
+                records, skipped = import_reviews(store, args.path, args.overwrite)
+                for reason, count in skipped.items():
+                    if count:
+                        print(f"Skipped {count} review(s) ({reason})")
+
+            if args.dry_run:
+                print(f"Would write {len(records)} reviews")
+            elif records:
+                write_reviews(storage, store, records)
+                print(f"Wrote {len(records)} reviews to the {storage.name} "
+                      f"in {time.perf_counter() - started:.1f}s")
+            else:
+                print("Nothing to write")
+
+        elif args.command == 'stats':
+            summary = summarize(store)
+            if args.json:
+                print(json.dumps(summary, indent=2))
+            else:
+                for key, value in summary.items():
+                    print(f"{key.replace('_', ' ').capitalize()}: {value}")
+
+        elif args.command == 'export':
+            tmp_path = args.path + '.tmp'
+            store.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, args.path)
+            print(f"Exported {len(store)} reports to {args.path}")
+    finally:
+        storage.close()
+        if lock is not None:
+            lock.release()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite review database
+Reports and reviews in one WAL-mode SQLite file; each save is a single-row UPSERT
+
+Command line:
+    python review_db.py import cohort.csv cohort.sqlite
+    python review_db.py export cohort.sqlite reviewed.csv
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from cohort_store import CohortStore, is_missing
+from review_fields import REVIEW_COLUMNS
+from review_journal import ReviewJournal
+
+
+SCHEMA_VERSION = 2
+
+
+def quote(name):
+    """SQL identifier for a CSV column name"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ReviewDatabase:
+    """reports(row, <CSV columns>) and reviews(row, report_number, <Manual_* columns>)
+
+    The reports table is written once by import_csv and indexed on
+    Report_Number; the app only ever writes the reviews and leases tables.
+    Implements the writer interface SaveWorker expects (append_many,
+    pending, compact, close), so it can stand in for ReviewJournal.
+
+    Several reviewers can share one database: each review records who
+    saved it and a revision number, so others can pull it, and rows are
+    leased to one reviewer at a time while they are on screen.
+    """
+
+    name = 'database'
+
+    def __init__(self, path, reviewer=None, lease_seconds=900):
+        self.path = path
+        self.reviewer = reviewer
+        self.lease_seconds = lease_seconds
+        self.pending = 0
+        self._conn = None
+        # One connection shared by the Tk thread and the save worker
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            # Other reviewers may hold the write lock briefly; wait rather than fail
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            # WAL: readers never block the writer, and a commit is one append
+            # to the -wal file. NORMAL skips the fsync per commit; a crash of
+            # the app still loses nothing, only an OS crash can drop the
+            # last few commits.
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+        return self._conn
+
+    def exists(self):
+        return os.path.exists(self.path) and self._meta() is not None
+
+    def _meta(self):
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'header'").fetchone()
+        except sqlite3.DatabaseError:
+            return None
+        return json.loads(row[0]) if row else None
+
+    @property
+    def header(self):
+        """CSV column order the database was imported from"""
+        return self._meta()
+
+    def import_csv(self, csv_path, chunksize=20000):
+        """Create the database from a cohort CSV (and its journal, if any)"""
+        frame_columns = list(pd.read_csv(csv_path, nrows=0).columns)
+        header = frame_columns + [c for c in REVIEW_COLUMNS if c not in frame_columns]
+        report_columns = [c for c in frame_columns if c not in REVIEW_COLUMNS]
+
+        with self._lock, self.conn:
+            conn = self.conn
+            conn.execute('DROP TABLE IF EXISTS leases')
+            conn.execute('DROP TABLE IF EXISTS reviews')
+            conn.execute('DROP TABLE IF EXISTS reports')
+            conn.execute('DROP TABLE IF EXISTS meta')
+            conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+            conn.execute(f"CREATE TABLE reports (row INTEGER PRIMARY KEY, "
+                         f"{', '.join(quote(c) for c in report_columns)})")
+            conn.execute(f"CREATE TABLE reviews (row INTEGER PRIMARY KEY REFERENCES reports(row), "
+                         f"report_number TEXT NOT NULL, "
+                         f"{', '.join(quote(c) for c in REVIEW_COLUMNS)}, saved_at TEXT)")
+            self._create_shared_tables(conn)
+
+            for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+                chunk.index.name = 'row'
+                chunk[report_columns].to_sql('reports', conn, if_exists='append')
+                present = [c for c in REVIEW_COLUMNS if c in chunk.columns]
+                if 'Manual_PE_Present' in present:
+                    reviewed = chunk[~chunk['Manual_PE_Present'].isna()]
+                    self._upsert(conn, [
+                        (index, reviewed.at[index, 'Report_Number'],
+                         {c: reviewed.at[index, c] for c in present})
+                        for index in reviewed.index], saved_at=None)
+
+            if 'Report_Number' in report_columns:
+                conn.execute('CREATE INDEX reports_report_number ON reports("Report_Number")')
+            conn.executemany('INSERT INTO meta VALUES (?, ?)', [
+                ('version', str(SCHEMA_VERSION)),
+                ('header', json.dumps(header)),
+                ('source', os.path.abspath(csv_path)),
+            ])
+
+        # Reviews saved since the CSV was last compacted
+        journal = ReviewJournal(csv_path)
+        records = [(index, report, values) for index, report, values in journal.read()
+                   if self._matches(index, report)]
+        if records:
+            self.append_many(records)
+            print(f"Imported {len(records)} journaled reviews from {journal.path}")
+        self.pending = 0
+
+    @staticmethod
+    def _create_shared_tables(conn):
+        """Review authorship, the revision counter and row leases (schema version 2)"""
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(reviews)')]
+        if 'revision' not in columns:
+            conn.execute('ALTER TABLE reviews ADD COLUMN reviewer TEXT')
+            conn.execute('ALTER TABLE reviews ADD COLUMN revision INTEGER')
+        conn.execute('CREATE INDEX IF NOT EXISTS reviews_revision ON reviews(revision)')
+        conn.execute('CREATE TABLE IF NOT EXISTS leases (row INTEGER PRIMARY KEY, '
+                     'reviewer TEXT NOT NULL, expires_at REAL NOT NULL)')
+
+    def _matches(self, index, report_number):
+        row = self.conn.execute('SELECT "Report_Number" FROM reports WHERE row = ?',
+                                (int(index),)).fetchone()
+        return row is not None and str(row[0]) == str(report_number)
+
+    def load(self):
+        """The cohort as a CohortStore, with saved reviews merged in"""
+        header = self.header
+        with self._lock:
+            with self.conn:
+                # Databases imported before shared mode existed
+                self._create_shared_tables(self.conn)
+                self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)",
+                                  (str(SCHEMA_VERSION),))
+            frame = pd.read_sql_query('SELECT * FROM reports ORDER BY row', self.conn,
+                                      index_col='row')
+            reviews = pd.read_sql_query(
+                f"SELECT row, {', '.join(quote(c) for c in REVIEW_COLUMNS)} FROM reviews",
+                self.conn, index_col='row')
+
+        frame.index.name = None
+        for column in REVIEW_COLUMNS:
+            frame[column] = reviews[column].reindex(frame.index)
+        frame = frame.reset_index(drop=True)[header]
+        return CohortStore.from_frame(frame)
+
+    def append_many(self, records):
+        """Upsert several reviews in one transaction, releasing their leases"""
+        with self._lock, self.conn:
+            self._upsert(self.conn, records,
+                         saved_at=datetime.now().isoformat(timespec='seconds'),
+                         reviewer=self.reviewer)
+            self.conn.executemany('DELETE FROM leases WHERE row = ? AND reviewer IS ?',
+                                  [(int(index), self.reviewer) for index, _, _ in records])
+        self.pending += len(records)
+
+    def append(self, index, report_number, values):
+        self.append_many([(index, report_number, values)])
+
+    @staticmethod
+    def _upsert(conn, records, saved_at, reviewer=None):
+        columns = ['row', 'report_number'] + REVIEW_COLUMNS + ['saved_at', 'reviewer']
+        updates = ', '.join(f'{quote(c)} = excluded.{quote(c)}' for c in columns[1:] + ['revision'])
+        # Every write gets the next revision, so other reviewers can pull what changed
+        sql = (f"INSERT INTO reviews ({', '.join(quote(c) for c in columns)}, revision) "
+               f"VALUES ({', '.join('?' * len(columns))}, "
+               f"(SELECT COALESCE(MAX(revision), 0) + 1 FROM reviews)) "
+               f"ON CONFLICT(row) DO UPDATE SET {updates}")
+
+        rows = []
+        for index, report_number, values in records:
+            review = []
+            for column in REVIEW_COLUMNS:
+                value = values.get(column)
+                if is_missing(value):
+                    value = None
+                elif column == 'Manual_PE_Present':
+                    value = int(float(value))
+                else:
+                    value = str(value)
+                review.append(value)
+            rows.append([int(index), str(report_number)] + review + [saved_at, reviewer])
+        conn.executemany(sql, rows)
+
+    def latest_revision(self):
+        with self._lock:
+            return self.conn.execute('SELECT COALESCE(MAX(revision), 0) FROM reviews').fetchone()[0]
+
+    def changes_since(self, revision):
+        """Reviews saved by other reviewers after revision
+
+        Returns (latest revision, [(index, report_number, values), ...]).
+        """
+        sql = (f"SELECT row, report_number, revision, "
+               f"{', '.join(quote(c) for c in REVIEW_COLUMNS)} FROM reviews "
+               f"WHERE revision > ? AND reviewer IS NOT ? ORDER BY revision")
+        with self._lock:
+            # One read transaction, so both queries see the same snapshot: a
+            # commit landing between them would otherwise raise latest past
+            # rows that were never fetched
+            self.conn.execute('BEGIN')
+            try:
+                rows = self.conn.execute(sql, (revision, self.reviewer)).fetchall()
+                latest = self.conn.execute(
+                    'SELECT COALESCE(MAX(revision), 0) FROM reviews').fetchone()[0]
+            finally:
+                self.conn.commit()
+
+        records = []
+        for index, report_number, _, *values in rows:
+            records.append((index, report_number, dict(zip(REVIEW_COLUMNS, values))))
+        return max(latest, revision), records
+
+    def lease(self, index, keep=()):
+        """Claim an unreviewed row for this reviewer; False if someone else has it
+
+        Renews the lease if this reviewer already holds it, and gives up any
+        other row this reviewer was holding except those in keep (rows with
+        an unsaved draft).
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            conn = self.conn
+            reviewed = conn.execute('SELECT 1 FROM reviews WHERE row = ? '
+                                    'AND "Manual_PE_Present" IS NOT NULL', (int(index),)).fetchone()
+            if reviewed:
+                return False
+            claimed = conn.execute(
+                'INSERT INTO leases (row, reviewer, expires_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(row) DO UPDATE SET reviewer = excluded.reviewer, '
+                'expires_at = excluded.expires_at '
+                'WHERE leases.reviewer = excluded.reviewer OR leases.expires_at < ?',
+                (int(index), self.reviewer, now + self.lease_seconds, now)).rowcount == 1
+            if claimed:
+                held = [int(index)] + [int(row) for row in keep]
+                conn.execute(f"DELETE FROM leases WHERE reviewer = ? "
+                             f"AND row NOT IN ({', '.join('?' * len(held))})",
+                             [self.reviewer] + held)
+            return claimed
+
+    def lease_holder(self, index):
+        """Reviewer currently holding a row, or None"""
+        with self._lock:
+            row = self.conn.execute('SELECT reviewer FROM leases WHERE row = ? AND expires_at >= ?',
+                                    (int(index), time.time())).fetchone()
+        return row[0] if row else None
+
+    def leased_rows(self):
+        """Rows other reviewers currently hold"""
+        with self._lock:
+            rows = self.conn.execute('SELECT row FROM leases WHERE reviewer IS NOT ? '
+                                     'AND expires_at >= ?', (self.reviewer, time.time()))
+            return {row[0] for row in rows}
+
+    def release(self):
+        """Give up every row this reviewer holds"""
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM leases WHERE reviewer IS ?', (self.reviewer,))
+
+    def compact(self, df=None):
+        """Fold the WAL back into the database file"""
+        with self._lock:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        self.pending = 0
+
+    def export_csv(self, csv_path, chunksize=20000):
+        """Write reports and reviews back out in the original CSV layout"""
+        header = self.header
+        review_select = ', '.join(f'v.{quote(c)} AS {quote(c)}' for c in REVIEW_COLUMNS)
+        sql = (f"SELECT r.*, {review_select} FROM reports r "
+               f"LEFT JOIN reviews v ON v.row = r.row ORDER BY r.row")
+
+        tmp_path = csv_path + '.tmp'
+        with self._lock, open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            first = True
+            for chunk in pd.read_sql_query(sql, self.conn, chunksize=chunksize):
+                # Unreviewed rows come back from the LEFT JOIN as NULL, which makes the
+                # label column float; write 0/1 as the CSV backend does, not 0.0/1.0
+                chunk['Manual_PE_Present'] = chunk['Manual_PE_Present'].astype('Int64')
+                chunk[header].to_csv(f, index=False, header=first)
+                first = False
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, csv_path)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export the SQLite review database")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Create a database from a cohort CSV")
+    import_parser.add_argument('csv')
+    import_parser.add_argument('database')
+
+    export_parser = commands.add_parser('export', help="Write the database out as a cohort CSV")
+    export_parser.add_argument('database')
+    export_parser.add_argument('csv')
+
+    args = parser.parse_args()
+    db = ReviewDatabase(args.database)
+    try:
+        if args.command == 'import':
+            db.import_csv(args.csv)
+            print(f"Imported {args.csv} into {args.database}")
+        else:
+            if not db.exists():
+                parser.error(f"{args.database} is not a review database")
+            db.export_csv(args.csv)
+            print(f"Exported {args.database} to {args.csv}")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Review form fields
+Mapping between the Manual_* CSV columns and the review form
+"""
+
+import pandas as pd
+
+
+# Columns written by the review form, in CSV order
+REVIEW_COLUMNS = [
+    'Manual_PE_Present',
+    'Manual_PE_Location',
+    'Manual_PE_Acuity',
+    'Manual_PE_Laterality',
+    'Manual_PE_Clot_Burden',
+    'Reviewer_Confidence',
+    'Comments',
+]
+
+# Choices offered by the review form for each enumerated field
+FIELD_OPTIONS = {
+    'Manual_PE_Present': [("No PE", "0"), ("PE Present", "1")],
+    'Manual_PE_Location': ["", "Central", "Segmental", "Subsegmental", "Multiple", "Unknown"],
+    'Manual_PE_Acuity': ["", "Acute", "Chronic", "Acute-on-chronic", "Unknown"],
+    'Manual_PE_Laterality': ["", "Right", "Left", "Bilateral", "Unknown"],
+    'Manual_PE_Clot_Burden': ["", "High", "Low", "Unknown"],
+    'Reviewer_Confidence': [("High", "high"), ("Medium", "medium"), ("Low", "low")],
+}
+
+
+def option_values(field_name):
+    """Stored values for a field's options, without the empty choice"""
+    values = []
+    for option in FIELD_OPTIONS[field_name]:
+        value = option[1] if isinstance(option, tuple) else option
+        if value:
+            values.append(value)
+    return values
+
+
+def parse_review(row):
+    """Read a row's stored review as raw form field strings"""
+    fields = {}
+
+    # PE Present may come back from the CSV as 0/1 or 0.0/1.0
+    pe_present = str(row.get('Manual_PE_Present', ''))
+    if pe_present in ['0', '1', '0.0', '1.0']:
+        fields['Manual_PE_Present'] = str(int(float(pe_present)))
+    else:
+        fields['Manual_PE_Present'] = ''
+
+    for column in REVIEW_COLUMNS[1:]:
+        value = row.get(column)
+        fields[column] = '' if pd.isna(value) else str(value)
+
+    return fields
+
+
+def validate_review(fields):
+    """Missing required fields in raw form fields, as messages"""
+    errors = []
+
+    # Check PE Present
+    pe_present = fields['Manual_PE_Present']
+    if not pe_present:
+        errors.append("PE Present is required")
+
+    # Check confidence
+    confidence = fields['Reviewer_Confidence']
+    if not confidence:
+        errors.append("Reviewer Confidence is required")
+
+    # If PE present, check PE characteristics
+    if pe_present == "1":
+        if not fields['Manual_PE_Location']:
+            errors.append("PE Location is required when PE is present")
+        if not fields['Manual_PE_Acuity']:
+            errors.append("PE Acuity is required when PE is present")
+        if not fields['Manual_PE_Laterality']:
+            errors.append("PE Laterality is required when PE is present")
+        if not fields['Manual_PE_Clot_Burden']:
+            errors.append("PE Clot Burden is required when PE is present")
+
+    return errors
+
+
+def collect_review(fields):
+    """Convert validated raw form fields into a dict of review column values"""
+    pe_present = fields['Manual_PE_Present']
+    values = {'Manual_PE_Present': int(pe_present)}
+
+    if pe_present == "1":
+        values['Manual_PE_Location'] = fields['Manual_PE_Location']
+        values['Manual_PE_Acuity'] = fields['Manual_PE_Acuity']
+        values['Manual_PE_Laterality'] = fields['Manual_PE_Laterality']
+        values['Manual_PE_Clot_Burden'] = fields['Manual_PE_Clot_Burden']
+    else:
+        # Clear PE characteristics if no PE
+        values['Manual_PE_Location'] = ''
+        values['Manual_PE_Acuity'] = ''
+        values['Manual_PE_Laterality'] = ''
+        values['Manual_PE_Clot_Burden'] = ''
+
+    values['Reviewer_Confidence'] = fields['Reviewer_Confidence']
+    values['Comments'] = fields['Comments']
+    return values
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+"""
+Review-state indexes
+Small structures kept in step with save_current so navigation never rescans the cohort
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+import pandas as pd
+
+
+def unreviewed_mask(column):
+    """Vectorized test for empty Manual_PE_Present values"""
+    return (column.isna() | (column.astype(str).str.strip() == '')).to_numpy()
+
+
+def manual_label(value):
+    """Manual_PE_Present as 0/1, or None when unreviewed"""
+    if pd.isna(value) or str(value).strip() == '':
+        return None
+    return int(float(value))
+
+
+class PendingIndex:
+    """Sorted row positions that still need a review"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    @classmethod
+    def from_column(cls, column):
+        """Build from the Manual_PE_Present column in one vectorized pass"""
+        return cls(np.flatnonzero(unreviewed_mask(column)).tolist())
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, index):
+        i = bisect_left(self.rows, index)
+        return i < len(self.rows) and self.rows[i] == index
+
+    def first(self):
+        """First unreviewed row, or None when everything is reviewed"""
+        return self.rows[0] if self.rows else None
+
+    def next_after(self, index):
+        """Next unreviewed row after index, wrapping to the start; never index itself"""
+        i = bisect_right(self.rows, index)
+        if i < len(self.rows):
+            return self.rows[i]
+        if self.rows and self.rows[0] < index:
+            return self.rows[0]
+        return None
+
+    def discard(self, index):
+        """Mark a row as reviewed"""
+        i = bisect_left(self.rows, index)
+        if i < len(self.rows) and self.rows[i] == index:
+            del self.rows[i]
+
+    def add(self, index):
+        """Mark a row as needing review again"""
+        i = bisect_left(self.rows, index)
+        if i == len(self.rows) or self.rows[i] != index:
+            self.rows.insert(i, index)
+
+
+# AI prediction columns compared against the manual label
+MODEL_COLUMNS = {
+    'SVM': 'SVM_PE_Prediction',
+    'LLM': 'LLM_PE_Binary',
+    'Regex': 'Regex_PE_Prediction',
+}
+
+
+def model_predictions(df):
+    """(rows, models) float array of 0/1 predictions, NaN where missing"""
+    return np.column_stack([pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+                            for column in MODEL_COLUMNS.values() if column in df.columns])
+
+
+def model_agreement(df):
+    """Per row: 1 if all models give the same prediction, 0 if not, -1 if one is missing"""
+    predictions = model_predictions(df)
+    agreement = (predictions == predictions[:, :1]).all(axis=1).astype(np.int8)
+    agreement[np.isnan(predictions).any(axis=1)] = -1
+    return agreement
+
+
+class ReviewStats:
+    """Running review counters, initialized vectorized and updated by delta"""
+
+    def __init__(self, df):
+        self.total = len(df)
+        manual = pd.to_numeric(df['Manual_PE_Present'], errors='coerce')
+        reviewed = ~unreviewed_mask(df['Manual_PE_Present']) & manual.notna().to_numpy()
+
+        self.reviewed = int(reviewed.sum())
+        self.pe_counts = {0: int((manual[reviewed] == 0).sum()),
+                          1: int((manual[reviewed] == 1).sum())}
+        self.confidence_counts = (df['Reviewer_Confidence'][reviewed]
+                                  .astype(str).str.strip().value_counts().to_dict())
+        self.agreement = {}
+        for model, column in MODEL_COLUMNS.items():
+            if column in df.columns:
+                predictions = pd.to_numeric(df[column], errors='coerce')
+                self.agreement[model] = int((predictions[reviewed] == manual[reviewed]).sum())
+
+    @property
+    def remaining(self):
+        return self.total - self.reviewed
+
+    def remove_row(self, df, index):
+        """Take a row's current review out of the counters"""
+        self._apply(df, index, -1)
+
+    def add_row(self, df, index):
+        """Count a row's current review in the counters"""
+        self._apply(df, index, 1)
+
+    def _apply(self, df, index, sign):
+        manual = manual_label(df.at[index, 'Manual_PE_Present'])
+        if manual is None:
+            return
+
+        self.reviewed += sign
+        self.pe_counts[manual] = self.pe_counts.get(manual, 0) + sign
+
+        confidence = df.at[index, 'Reviewer_Confidence']
+        if not pd.isna(confidence):
+            confidence = str(confidence).strip()
+            self.confidence_counts[confidence] = self.confidence_counts.get(confidence, 0) + sign
+
+        for model in self.agreement:
+            prediction = df.at[index, MODEL_COLUMNS[model]]
+            if not pd.isna(prediction) and int(float(prediction)) == manual:
+                self.agreement[model] += sign
+
+    def agreement_rate(self, model):
+        """Fraction of reviewed rows where the model matches the manual label"""
+        return self.agreement[model] / self.reviewed if self.reviewed else 0.0
+
+
+# Terms of the review priority score, weighted by [QUEUE] in config.ini
+PRIORITY_TERMS = ['model_disagreement', 'svm_uncertainty', 'llm_low_confidence',
+                  'regex_conflict']
+
+
+def priority_scores(df, weights, hits=None):
+    """Vectorized review priority per row; higher is reviewed first
+
+    model_disagreement: SVM, LLM and Regex do not all give the same prediction
+    svm_uncertainty: 1 at SVM probability 0.5, falling to 0 at 0 and 1
+    llm_low_confidence: LLM_Confidence is "low"
+    regex_conflict: Regex_PE_Prediction disagrees with the keyword hits in
+        the text (needs the KeywordHits matrix)
+    """
+    scores = np.zeros(len(df))
+
+    if weights.get('model_disagreement'):
+        predictions = model_predictions(df)
+        # NaN never compares equal, so a missing prediction counts as disagreement
+        disagree = ~(predictions == predictions[:, :1]).all(axis=1)
+        scores += weights['model_disagreement'] * disagree
+
+    if weights.get('svm_uncertainty') and 'SVM_Probability' in df.columns:
+        probability = pd.to_numeric(df['SVM_Probability'], errors='coerce').to_numpy(dtype=float)
+        uncertainty = np.nan_to_num(1 - 2 * np.abs(probability - 0.5)).clip(0, 1)
+        scores += weights['svm_uncertainty'] * uncertainty
+
+    if weights.get('llm_low_confidence') and 'LLM_Confidence' in df.columns:
+        low = df['LLM_Confidence'].astype(str).str.strip().str.lower().eq('low').to_numpy()
+        scores += weights['llm_low_confidence'] * low
+
+    if (weights.get('regex_conflict') and hits is not None
+            and 'Regex_PE_Prediction' in df.columns):
+        regex = pd.to_numeric(df['Regex_PE_Prediction'], errors='coerce').to_numpy(dtype=float)
+        scores += weights['regex_conflict'] * hits.conflicts(regex)
+
+    return scores
+
+
+def load_queue_weights(config):
+    """Priority weights from [QUEUE] in config.ini"""
+    defaults = {'model_disagreement': 4.0, 'svm_uncertainty': 2.0, 'llm_low_confidence': 1.0,
+                'regex_conflict': 2.0}
+    return {term: config.getfloat('QUEUE', term, fallback=defaults[term]) for term in PRIORITY_TERMS}
+
+
+class ReviewQueue:
+    """Unreviewed rows in a heap ordered by priority, ties in row order
+
+    Reviewed rows are dropped lazily when they reach the top, so a save
+    costs O(1) and finding the next row O(log n) amortized.
+    """
+
+    def __init__(self, scores, rows):
+        self.scores = scores
+        self._queued = set(rows)
+        self._heap = [(-scores[i], i) for i in rows]
+        heapq.heapify(self._heap)
+
+    @classmethod
+    def from_pending(cls, df, pending, weights, hits=None):
+        return cls(priority_scores(df, weights, hits), pending.rows)
+
+    def __len__(self):
+        return len(self._queued)
+
+    def discard(self, index):
+        """Mark a row as reviewed"""
+        self._queued.discard(index)
+
+    def add(self, index):
+        """Mark a row as needing review again"""
+        if index not in self._queued:
+            self._queued.add(index)
+            heapq.heappush(self._heap, (-self.scores[index], index))
+
+    def peek(self, count, exclude=()):
+        """The next count rows next() would return as rows get reviewed, without removing them
+
+        Walks the heap best-first from the root, so it costs O(count log count)
+        plus the reviewed rows not yet dropped.
+        """
+        found = []
+        frontier = [(self._heap[0], 0)] if self._heap else []
+        while frontier and len(found) < count:
+            entry, position = heapq.heappop(frontier)
+            index = entry[1]
+            if index in self._queued and index not in exclude and index not in found:
+                found.append(index)
+            for child in (2 * position + 1, 2 * position + 2):
+                if child < len(self._heap):
+                    heapq.heappush(frontier, (self._heap[child], child))
+        return found
+
+    def next(self, exclude=()):
+        """Highest-priority unreviewed row not in exclude, or None"""
+        skipped = []
+        found = None
+        while self._heap:
+            entry = self._heap[0]
+            index = entry[1]
+            if index not in self._queued:
+                heapq.heappop(self._heap)
+            elif index in exclude:
+                skipped.append(heapq.heappop(self._heap))
+            else:
+                found = index
+                break
+
+        # Excluded rows stay queued; duplicates from a re-add are dropped here
+        for entry in set(skipped):
+            heapq.heappush(self._heap, entry)
+        return found
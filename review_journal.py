@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only review journal
+Write-ahead log of saved reviews, compacted back into the cohort CSV
+"""
+
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+from review_profile import Profiler
+
+
+class ReviewJournal:
+    """One fsync'd JSON line per saved review, next to the CSV it belongs to"""
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.path = csv_path + '.journal'
+        self.pending = 0
+        self._file = None
+
+    def append(self, index, report_number, values):
+        """Durably record a single review"""
+        self.append_many([(index, report_number, values)])
+
+    def append_many(self, records):
+        """Durably record several reviews with a single fsync"""
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+            # Terminate a torn line left by a crash so new records stay parseable
+            if self._file.tell() > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        self._file.write('\n')
+
+        saved_at = datetime.now().isoformat(timespec='seconds')
+        lines = []
+        for index, report_number, values in records:
+            lines.append(json.dumps({
+                'row': int(index),
+                'report': str(report_number),
+                'saved_at': saved_at,
+                'values': values,
+            }, ensure_ascii=False))
+
+        self._file.write('\n'.join(lines) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.pending += len(records)
+
+    def read(self):
+        """Yield (index, report_number, values) for every intact journal record"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-append
+                    continue
+                yield record['row'], record['report'], record['values']
+
+    def replay(self, df):
+        """Apply uncompacted reviews to a freshly loaded DataFrame
+
+        Returns the number of records applied. Records whose row no longer
+        holds the same Report_Number are skipped rather than misapplied.
+        """
+        applied = 0
+        for index, report_number, values in self.read():
+            if index >= len(df) or str(df.at[index, 'Report_Number']) != report_number:
+                print(f"Journal: skipping review for {report_number} (row {index} no longer matches)")
+                continue
+            for column, value in values.items():
+                df.at[index, column] = value
+            applied += 1
+
+        self.pending = applied
+        return applied
+
+    def compact(self, df):
+        """Rewrite the CSV from the cohort store and truncate the journal"""
+        tmp_path = self.csv_path + '.tmp'
+        df.to_csv(tmp_path, index=False)
+        with open(tmp_path, 'rb+') as f:
+            os.fsync(f.fileno())
+        df.replace_csv(tmp_path, self.csv_path)
+
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.pending = 0
+
+    def close(self):
+        """Close the journal file handle"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class SaveWorker(threading.Thread):
+    """Writer thread that takes journal appends and compactions off the Tk thread
+
+    Pending saves are keyed by row, so repeated saves of the same report
+    coalesce into one record, and everything queued while a write is in
+    progress goes out in a single batch with one fsync. Results are posted
+    to a queue for the Tk thread to pick up with after().
+    """
+
+    def __init__(self, journal, max_pending=1024, profiler=None):
+        super().__init__(name='SaveWorker', daemon=True)
+        self.journal = journal
+        self.profiler = profiler or Profiler()
+        self.max_pending = max_pending
+        self.results = queue.Queue()
+        self._cond = threading.Condition()
+        self._pending = {}
+        self._compact_df = None
+        self._busy = False
+        self._stopping = False
+        # Set when an append fails, so the next compaction still writes the CSV
+        self._unjournaled = False
+
+    def submit(self, index, report_number, values):
+        """Queue a review for the journal, blocking only if the queue is full"""
+        with self._cond:
+            while len(self._pending) >= self.max_pending and index not in self._pending:
+                self._cond.wait()
+            self._pending[index] = (report_number, values)
+            self._cond.notify_all()
+
+    def request_compact(self, df):
+        """Queue a compaction of the journal into the CSV"""
+        with self._cond:
+            self._compact_df = df
+            self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wait until every queued save and compaction has been written"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and self._compact_df is None and not self._busy,
+                timeout)
+
+    def stop(self, timeout=None):
+        """Flush outstanding work and end the thread"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self.join(timeout)
+
+    def run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._pending or self._compact_df is not None or self._stopping)
+                if self._stopping and not self._pending and self._compact_df is None:
+                    return
+                batch, self._pending = self._pending, {}
+                compact_df, self._compact_df = self._compact_df, None
+                self._busy = True
+                self._cond.notify_all()
+
+            if batch:
+                try:
+                    with self.profiler.span('save.write'):
+                        self.journal.append_many(
+                            [(index, report, values) for index, (report, values) in batch.items()])
+                    self.results.put(('saved', True, len(batch)))
+                except Exception as e:
+                    self._unjournaled = True
+                    self.results.put(('saved', False, str(e)))
+
+            if compact_df is not None and (self.journal.pending or self._unjournaled):
+                try:
+                    with self.profiler.span('save.compact'):
+                        self.journal.compact(compact_df)
+                    self._unjournaled = False
+                    self.results.put(('compacted', True, None))
+                except Exception as e:
+                    self.results.put(('compacted', False, str(e)))
+
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Latency instrumentation
+Timing spans around the navigation and save paths, with histograms and an optional JSONL trace
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+
+# Histogram buckets are quarter powers of two in microseconds (about 19% wide)
+BUCKETS_PER_OCTAVE = 4
+
+# Shared do-nothing span handed out while profiling is off
+NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Log-bucketed latency histogram: constant memory, percentiles to within a bucket"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = {}
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        micros = seconds * 1e6
+        bucket = int(math.log2(micros) * BUCKETS_PER_OCTAVE) if micros >= 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, fraction):
+        """Upper edge of the bucket holding the given fraction of samples, in seconds"""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(2 ** ((bucket + 1) / BUCKETS_PER_OCTAVE) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.mean * 1000, 3),
+            'p50_ms': round(self.percentile(0.5) * 1000, 3),
+            'p95_ms': round(self.percentile(0.95) * 1000, 3),
+            'p99_ms': round(self.percentile(0.99) * 1000, 3),
+            'max_ms': round(self.max * 1000, 3),
+        }
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, time.perf_counter() - self.started)
+
+
+class _Frame:
+    """Top-level span (one load_report or save_current) collecting its sub-spans"""
+
+    __slots__ = ('profiler', 'name', 'fields', 'spans', 'started', 'outer')
+
+    def __init__(self, profiler, name, fields):
+        self.profiler = profiler
+        self.name = name
+        self.fields = fields
+        self.spans = []
+
+    def __enter__(self):
+        # Frames may nest (Next saves, then loads); the inner one counts as a span of the outer
+        self.outer = getattr(self.profiler._local, 'frame', None)
+        self.profiler._local.frame = self
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        self.profiler._local.frame = self.outer
+        self.profiler.record(self.name, elapsed)
+        self.profiler.finish_frame(self, elapsed)
+
+
+class Profiler:
+    """Named timing spans feeding per-name histograms
+
+    Wrap a user action in frame() and its steps in span(). Spans timed on
+    other threads (the save worker, the read-ahead thread) go into the
+    histograms but not into the frame breakdown. While disabled, span()
+    and frame() return a shared no-op context manager, so instrumented
+    code costs one method call per span.
+    """
+
+    def __init__(self, enabled=False, trace_path=None):
+        self.enabled = enabled
+        self.histograms = {}
+        self.last_frame = None
+        self.trace_path = trace_path
+        self._trace = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+        if enabled and trace_path:
+            self._trace = open(trace_path, 'a', encoding='utf-8')
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return _Span(self, name)
+
+    def frame(self, name, **fields):
+        """Span for one user-visible action; extra fields go into the trace"""
+        if not self.enabled:
+            return NULL_SPAN
+        return _Frame(self, name, fields)
+
+    def record(self, name, seconds):
+        """Add a timing measured elsewhere"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.add(seconds)
+
+        frame = getattr(self._local, 'frame', None)
+        if frame is not None:
+            frame.spans.append((name, seconds))
+
+    def finish_frame(self, frame, elapsed):
+        self.last_frame = (frame.name, elapsed, frame.spans)
+        if self._trace is not None:
+            record = {
+                'time': round(time.time(), 3),
+                'frame': frame.name,
+                'ms': round(elapsed * 1000, 3),
+                'spans': {name: round(seconds * 1000, 3) for name, seconds in frame.spans},
+            }
+            record.update(frame.fields)
+            try:
+                self._trace.write(json.dumps(record) + '\n')
+            except (OSError, ValueError) as e:
+                print(f"Stopped writing profile trace: {e}")
+                self._trace = None
+
+    def describe_last_frame(self):
+        """Breakdown of the last frame, for the overlay"""
+        if self.last_frame is None:
+            return ""
+        name, elapsed, spans = self.last_frame
+        steps = " • ".join(f"{span.split('.')[-1]} {seconds * 1000:.1f}"
+                           for span, seconds in spans)
+        return f"{name} {elapsed * 1000:.1f} ms: {steps}"
+
+    def summary(self):
+        """Histogram table, one line per span name"""
+        if not self.histograms:
+            return "No timings recorded"
+        with self._lock:
+            stats = {name: h.to_dict() for name, h in sorted(self.histograms.items())}
+        width = max(len(name) for name in stats)
+        lines = [f"{'span':<{width}}  {'count':>7}  {'mean':>8}  {'p50':>8}  {'p95':>8}  "
+                 f"{'p99':>8}  {'max':>8}  (ms)"]
+        for name, s in stats.items():
+            lines.append(f"{name:<{width}}  {s['count']:>7}  {s['mean_ms']:>8.2f}  "
+                         f"{s['p50_ms']:>8.2f}  {s['p95_ms']:>8.2f}  {s['p99_ms']:>8.2f}  "
+                         f"{s['max_ms']:>8.2f}")
+        return "\n".join(lines)
+
+    def close(self):
+        """Write the final histograms into the trace and close it"""
+        if self._trace is not None:
+            with self._lock:
+                stats = {name: h.to_dict() for name, h in self.histograms.items()}
+            self._trace.write(json.dumps({'time': round(time.time(), 3),
+                                          'histograms': stats}) + '\n')
+            self._trace.close()
+            self._trace = None
+
+
+def load_profiler(config, base_dir=''):
+    """Profiler configured by [PROFILE] in config.ini (disabled by default)"""
+    enabled = config.getboolean('PROFILE', 'enabled', fallback=False)
+    trace_path = config.get('PROFILE', 'trace_file', fallback='').strip() or None
+    if trace_path and not os.path.isabs(trace_path):
+        trace_path = os.path.join(base_dir, trace_path)
+    try:
+        return Profiler(enabled=enabled, trace_path=trace_path)
+    except OSError as e:
+        print(f"Could not open profile trace {trace_path}: {e}")
+        return Profiler(enabled=enabled)
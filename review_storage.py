@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Review storage backends
+Where the cohort is loaded from and where saved reviews go
+
+A backend provides load() -> CohortStore plus the writer interface used by
+SaveWorker: append_many(records), pending, compact(df) and close(). Backends
+with shared = True also lease rows and report other reviewers' saves.
+"""
+
+import getpass
+import json
+import os
+import socket
+import time
+
+from cohort_cache import load_cohort
+from review_db import ReviewDatabase
+from review_fields import REVIEW_COLUMNS
+from review_journal import ReviewJournal
+
+
+class CsvStorage(ReviewJournal):
+    """The cohort CSV with its append-only journal, compacted into the CSV"""
+
+    name = 'CSV'
+    shared = False
+
+    def __init__(self, csv_path, lazy=False, sidecar=False, cache_rows=256, use_cache=True):
+        super().__init__(csv_path)
+        self.lazy = lazy
+        self.sidecar = sidecar
+        self.cache_rows = cache_rows
+        self.use_cache = use_cache
+
+    def load(self):
+        """Load the CSV and replay any uncompacted reviews"""
+        # Typed columnar store: categorical codes, int8 labels, packed report text.
+        # Lazy mode indexes record offsets and reads report bodies on demand;
+        # sidecar mode maps them from a <csv>.reports file instead. An unchanged
+        # CSV is loaded from its <csv>.cache.npz snapshot without parsing.
+        store = load_cohort(self.csv_path, lazy=self.lazy, sidecar=self.sidecar,
+                            ensure_columns=REVIEW_COLUMNS, cache_rows=self.cache_rows,
+                            use_cache=self.use_cache)
+
+        replayed = self.replay(store)
+        if replayed:
+            print(f"Recovered {replayed} reviews from {self.path}")
+        return store
+
+
+class SqliteStorage(ReviewDatabase):
+    """Reports and reviews in a SQLite database, imported from the CSV on first use"""
+
+    def __init__(self, db_path, csv_path, reviewer=None, shared=False, lease_seconds=900):
+        super().__init__(db_path, reviewer=reviewer, lease_seconds=lease_seconds)
+        self.csv_path = csv_path
+        self.shared = shared
+
+    def load(self):
+        if not self.exists():
+            print(f"Importing {self.csv_path} into {self.path}")
+            self.import_csv(self.csv_path)
+        return super().load()
+
+    def close(self):
+        if self.shared and self._conn is not None:
+            self.release()
+        super().close()
+
+
+class CohortInUse(RuntimeError):
+    """Another program is writing to the cohort"""
+
+
+class CohortLock:
+    """<csv>.lock: marks a cohort as open for writing by the app or review_batch.py
+
+    The CSV backend keeps the cohort in memory and rewrites the whole CSV
+    on compaction, so changes made by a second writer would be overwritten
+    (and its journal deleted under it). Shared SQLite databases are meant
+    for several writers and take no lock. A lock whose process is no longer
+    running on this machine (e.g. after a crash) is stale and taken over; one
+    held from another machine has to be deleted by hand, and the error
+    message says where it is.
+    """
+
+    def __init__(self, csv_path, holder):
+        self.path = csv_path + '.lock'
+        self.holder = holder
+        self.owner = None
+
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self):
+        """Create the lock file; raises CohortInUse if it already exists"""
+        try:
+            user = getpass.getuser()
+        except Exception:
+            user = '?'
+        owner = {
+            'holder': self.holder,
+            'user': user,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'since': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        for attempt in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                other = self.read() or {}
+                if attempt == 0 and self.is_stale(other):
+                    self.remove_stale(other)
+                    continue
+                raise CohortInUse(
+                    f"The cohort is open in {other.get('holder', 'another program')} "
+                    f"({other.get('user', '?')} on {other.get('host', '?')} since "
+                    f"{other.get('since', '?')}). Close it first, or if it is no longer "
+                    f"running, delete {self.path}") from None
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(owner, f)
+        self.owner = owner
+
+    @staticmethod
+    def is_stale(other):
+        """True when the lock was taken on this machine by a process that has exited"""
+        pid = other.get('pid')
+        if not isinstance(pid, int) or other.get('host') != socket.gethostname():
+            return False
+        return not process_alive(pid)
+
+    def remove_stale(self, other):
+        # Only delete the lock we judged stale, not one a live process has
+        # written since
+        if self.read() == other:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def release(self):
+        """Delete the lock file if it is still ours"""
+        if self.owner is not None and self.read() == self.owner:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        self.owner = None
+
+
+def process_alive(pid):
+    """Whether a process with this pid is running on this machine"""
+    if pid == os.getpid():
+        return True
+    if os.name == 'nt':
+        # os.kill would terminate the process on Windows
+        import ctypes
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # QUERY_LIMITED_INFORMATION
+        if not handle:
+            # Access denied: it exists but belongs to someone else
+            return ctypes.get_last_error() == 5
+        try:
+            code = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running under another user
+        return True
+    return True
+
+
+def reviewer_id(config):
+    """[REVIEW] reviewer_id, or the login name"""
+    reviewer = config.get('REVIEW', 'reviewer_id', fallback='').strip()
+    if not reviewer:
+        try:
+            reviewer = getpass.getuser()
+        except Exception:
+            reviewer = 'reviewer'
+    return reviewer
+
+
+def open_storage(config, csv_path):
+    """The backend selected by [DATA] backend in config.ini"""
+    backend = config.get('DATA', 'backend', fallback='csv').strip().lower()
+    shared = config.getboolean('DATA', 'shared', fallback=False)
+
+    if backend == 'sqlite':
+        db_path = config.get('DATA', 'database', fallback='').strip() or csv_path + '.sqlite'
+        if not os.path.isabs(db_path):
+            db_path = os.path.join(os.path.dirname(csv_path), db_path)
+        return SqliteStorage(
+            db_path, csv_path,
+            reviewer=reviewer_id(config),
+            shared=shared,
+            lease_seconds=config.getint('REVIEW', 'lease_minutes', fallback=15) * 60)
+
+    if backend != 'csv':
+        raise ValueError(f"Unknown storage backend '{backend}' (expected csv or sqlite)")
+    if shared:
+        raise ValueError("shared = true needs backend = sqlite: reviewers cannot share a CSV")
+
+    return CsvStorage(
+        csv_path,
+        lazy=config.getboolean('DATA', 'lazy_load', fallback=False),
+        sidecar=config.getboolean('DATA', 'report_sidecar', fallback=False),
+        cache_rows=config.getint('PERFORMANCE', 'lazy_cache_rows', fallback=256),
+        use_cache=config.getboolean('PERFORMANCE', 'cohort_cache', fallback=True))
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Filtered review views
+Named filters from config.ini compiled to boolean masks, for stepping through a subset
+"""
+
+import re
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+import pandas as pd
+
+from review_fields import REVIEW_COLUMNS
+from review_index import MODEL_COLUMNS, model_predictions, unreviewed_mask
+
+
+# Derived columns filters may use besides the CSV columns, and what they are computed from
+DERIVED_COLUMNS = {
+    'reviewed': ['Manual_PE_Present'],
+    'models_agree': list(MODEL_COLUMNS.values()),
+    'keyword_hits': [],
+    'negated_hits': [],
+    'pe_mentioned': [],
+    'pe_negated': [],
+    'regex_conflict': ['Regex_PE_Prediction'],
+}
+
+# Derived columns read from the keyword hit matrix (report_hits.py) rather than the CSV
+HIT_COLUMNS = {'keyword_hits', 'negated_hits', 'pe_mentioned', 'pe_negated', 'regex_conflict'}
+
+NAME_PATTERN = re.compile(r'`([^`]+)`|([A-Za-z_][A-Za-z0-9_]*)')
+
+
+def load_view_definitions(config):
+    """(name, expression) pairs from [VIEWS] filters, one "Name: expression" per line"""
+    raw = config.get('VIEWS', 'filters', fallback='')
+    definitions = []
+    for line in raw.splitlines():
+        name, sep, expression = line.partition(':')
+        if sep and name.strip() and expression.strip():
+            definitions.append((name.strip(), expression.strip()))
+    return definitions
+
+
+def uses_keyword_hits(definitions):
+    """True if any filter needs the keyword hit matrix"""
+    return any(bare in HIT_COLUMNS or quoted in HIT_COLUMNS
+               for _, expression in definitions
+               for quoted, bare in NAME_PATTERN.findall(expression))
+
+
+def _add_derived(frame, names, hits=None):
+    if 'reviewed' in names:
+        frame['reviewed'] = ~unreviewed_mask(frame['Manual_PE_Present'])
+    if 'models_agree' in names:
+        predictions = model_predictions(frame)
+        frame['models_agree'] = (predictions == predictions[:, :1]).all(axis=1)
+
+    if HIT_COLUMNS.intersection(names):
+        if hits is None:
+            raise ValueError("keyword hits are not available")
+        # The frame is indexed by cohort row, so it can select from the matrix
+        rows = frame.index.to_numpy()
+        if 'keyword_hits' in names or 'pe_mentioned' in names or 'pe_negated' in names:
+            total = hits.total(rows)
+            frame['keyword_hits'] = total
+            frame['pe_mentioned'] = total > 0
+        if 'negated_hits' in names or 'pe_negated' in names:
+            frame['negated_hits'] = hits.negated_total(rows)
+        if 'pe_negated' in names:
+            frame['pe_negated'] = frame['pe_mentioned'] & ~hits.affirmed(rows)
+        if 'regex_conflict' in names:
+            regex = pd.to_numeric(frame['Regex_PE_Prediction'], errors='coerce')
+            frame['regex_conflict'] = hits.conflicts(regex.to_numpy(dtype=float), rows)
+    return frame
+
+
+class FilterView:
+    """A named filter: its mask over the cohort and the sorted rows it selects"""
+
+    def __init__(self, name, expression, df, hits=None):
+        self.name = name
+        self.expression = expression
+        self.hits = hits
+
+        # Only the columns the expression mentions are materialized
+        mentioned = {quoted or bare for quoted, bare in NAME_PATTERN.findall(expression)}
+        self.derived = [derived for derived in DERIVED_COLUMNS if derived in mentioned]
+        self.columns = [column for column in df.columns if column in mentioned]
+        for derived in self.derived:
+            self.columns += [c for c in DERIVED_COLUMNS[derived] if c not in self.columns]
+        self.depends_on_reviews = any(column in REVIEW_COLUMNS for column in self.columns)
+
+        frame = pd.DataFrame({column: df[column] for column in self.columns},
+                             index=pd.RangeIndex(len(df)))
+        self.mask = self._evaluate(frame)
+        self.rows = np.flatnonzero(self.mask).tolist()
+
+    def _evaluate(self, frame):
+        result = _add_derived(frame, self.derived, self.hits).eval(self.expression)
+        if np.ndim(result) == 0:
+            raise ValueError(f"Filter '{self.name}' does not depend on any column")
+        return pd.Series(result).fillna(False).to_numpy(dtype=bool, copy=True)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, index):
+        return bool(self.mask[index])
+
+    def label(self):
+        return f"{self.name} ({len(self.rows)})"
+
+    def position(self, index):
+        """1-based position of a row within the view, or None"""
+        i = bisect_left(self.rows, index)
+        return i + 1 if i < len(self.rows) and self.rows[i] == index else None
+
+    def next_after(self, index):
+        """First row of the view after index, or None at the end"""
+        i = bisect_right(self.rows, index)
+        return self.rows[i] if i < len(self.rows) else None
+
+    def rows_after(self, index, count):
+        """The next count rows of the view after index"""
+        i = bisect_right(self.rows, index)
+        return self.rows[i:i + count]
+
+    def previous_before(self, index):
+        """Last row of the view before index, or None at the start"""
+        i = bisect_left(self.rows, index)
+        return self.rows[i - 1] if i > 0 else None
+
+    def refresh_row(self, df, index):
+        """Re-test one edited row; True if its membership changed"""
+        frame = pd.DataFrame({column: [df.at[index, column]] for column in self.columns},
+                             index=[index])
+        selected = bool(self._evaluate(frame)[0])
+        if selected == self.mask[index]:
+            return False
+
+        self.mask[index] = selected
+        if selected:
+            insort(self.rows, index)
+        else:
+            del self.rows[bisect_left(self.rows, index)]
+        return True
+
+
+def compile_views(definitions, df, hits=None):
+    """FilterViews for every valid definition, plus error messages for the rest"""
+    views, errors = {}, []
+    for name, expression in definitions:
+        try:
+            views[name] = FilterView(name, expression, df, hits)
+        except Exception as e:
+            errors.append(f"{name}: {e}")
+    return views, errors
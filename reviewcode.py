@@ -4,19 +4,31 @@ Professional Medical Report Review Application
 For manual verification of pulmonary embolism predictions
 """
 
+import time
+STARTED = time.perf_counter()  # reference point for the startup timings
+
 import tkinter as tk
 from tkinter import ttk, messagebox, font
-import pandas as pd
-import csv
-from datetime import datetime
 import configparser
 import os
+import queue
 import sys
+import threading
+
+# Only modules that import quickly are imported here. The pandas-based
+# ones (storage, indexes, views, search, the report list) are imported
+# by the loader thread or where they are first used, after the window is up.
+from review_journal import SaveWorker
+from report_text import (KeywordHighlighter, RenderCache, layout_sections, load_keywords,
+                         load_open_sections)
+from review_profile import load_profiler
 
 
 class MedicalReportReviewer(tk.Tk):
     """Elite medical report review interface"""
 
+    ALL_REPORTS = "All reports"
+
     def __init__(self):
         super().__init__()
 
@@ -30,12 +42,39 @@ class MedicalReportReviewer(tk.Tk):
         self.geometry(f"{window_width}x{window_height}")
         self.configure(bg="#f8f9fa")
 
+        # Timing spans for load_report and save_current ([PROFILE] in config.ini)
+        self.profiler = load_profiler(self.config, os.path.dirname(__file__))
+
         # Data
         self.csv_path = self.get_csv_path()
+        self.storage = None
+        self.cohort_lock = None
+        # Set by on_close; guards cohort_lock against the loader taking it afterwards
+        self.closing = False
+        self.cohort_guard = threading.Lock()
+        self.preprocessed = None
+        self.keyword_hits = None
+        self.hits_pending = False
+        self.deferred_views = []
         self.df = None
+        self.pending_rows = None
+        self.review_queue = None
+        self.history = []
+        self.views = {}
+        self.view_definitions = []
+        self.view_errors = []
+        self.active_view = None
+        self.review_stats = None
         self.current_index = 0
         self.unsaved_changes = False
 
+        # Autosave: edited rows are tracked here until persisted.
+        # Maps row index -> stashed form fields, or None for the row on screen.
+        self.autosave_interval = self.config.getint('REVIEW', 'auto_save_interval', fallback=0)
+        self.dirty_rows = {}
+        self._autosave_job = None
+        self._loading_review = False
+
         # Colors - Modern clean theme
         self.colors = {
             'bg_dark': '#f8f9fa',        # Very light gray background
@@ -57,12 +96,247 @@ class MedicalReportReviewer(tk.Tk):
         # Form variables
         self.form_vars = {}
 
-        # Load data and setup UI
-        self.load_data()
+        # Keyword highlighting (keyword list from config.ini)
+        self.highlighter = KeywordHighlighter(load_keywords(self.config))
+        cache_mb = self.config.getint('PERFORMANCE', 'render_cache_mb', fallback=64)
+        self.render_cache = RenderCache(self.highlighter, max_bytes=cache_mb * 1024 * 1024)
+
+        # Section view: reports are inserted section by section, the rest on demand
+        self.section_view = self.config.getboolean('DISPLAY', 'section_view', fallback=True)
+        self.open_sections = load_open_sections(self.config)
+        self.report_sections = []
+        self.section_states = []
+        self.follow_first_hit = False
+        self._expand_job = None
+
+        # Staged startup: paint a splash right away, then import pandas and load
+        # the cohort on a worker thread. The review UI is built once it is done.
+        self.ready = False
+        self.startup_times = {}
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
         self.setup_styles()
+        self.show_splash()
+        self.update()
+        self.startup_times['first_pixel'] = time.perf_counter() - STARTED
+
+        self.loader_messages = queue.Queue()
+        self.loader = threading.Thread(target=self.load_in_background, name='CohortLoader',
+                                       daemon=True)
+        self.loader.start()
+        self.after(50, self.poll_loader)
+
+    def show_splash(self):
+        """Progress screen shown while the cohort loads"""
+        self.splash = tk.Frame(self, bg=self.colors['bg_dark'])
+        self.splash.place(relx=0.5, rely=0.45, anchor=tk.CENTER)
+
+        ttk.Label(self.splash,
+                  text="Pulmonary Embolism Report Review",
+                  style='Title.TLabel').pack(pady=(0, 15))
+
+        self.splash_stage = tk.Label(self.splash,
+                                     text="Starting…",
+                                     font=('Segoe UI', 10),
+                                     bg=self.colors['bg_dark'],
+                                     fg=self.colors['text_secondary'])
+        self.splash_stage.pack(pady=(0, 8))
+
+        self.splash_progress = ttk.Progressbar(self.splash, length=360, maximum=1.0,
+                                               mode='determinate')
+        self.splash_progress.pack()
+
+    def report_loading(self, stage, fraction=None):
+        """Loader thread: queue a splash update; fraction None animates the bar instead"""
+        self.loader_messages.put(('progress', stage, fraction))
+
+    def load_in_background(self):
+        """Loader thread: heavy imports, the cohort and its indexes. Never touches Tk."""
+        try:
+            self.report_loading("Loading libraries…", 0.05)
+            from review_storage import CohortInUse, CohortLock, open_storage
+
+            try:
+                self.storage = open_storage(self.config, self.csv_path)
+            except ValueError as e:
+                self.loader_messages.put(('error', "Configuration Error", str(e)))
+                return
+
+            if not self.storage.shared:
+                # review_batch.py must not rewrite the cohort while it is open here
+                if self.closing:
+                    return
+                try:
+                    lock = CohortLock(self.csv_path, "the review window")
+                    lock.acquire()
+                except CohortInUse as e:
+                    self.loader_messages.put(('error', "Cohort In Use", str(e)))
+                    return
+                with self.cohort_guard:
+                    if self.closing:
+                        # The window closed while the lock was being taken
+                        lock.release()
+                        return
+                    self.cohort_lock = lock
+
+            self.report_loading(f"Reading {self.storage.name}…")
+            self.load_data()
+        except Exception as e:
+            self.release_cohort()
+            name = self.storage.name if self.storage is not None else self.csv_path
+            self.loader_messages.put(('error', "Error", f"Failed to load {name}: {str(e)}"))
+        else:
+            self.loader_messages.put(('done',))
+
+    def poll_loader(self):
+        """Show loader progress on the splash; build the review UI when the data is ready"""
+        try:
+            while True:
+                message = self.loader_messages.get_nowait()
+                if message[0] == 'progress':
+                    _, stage, fraction = message
+                    self.splash_stage.config(text=stage)
+                    if fraction is None:
+                        if self.splash_progress.cget('mode') != 'indeterminate':
+                            self.splash_progress.config(mode='indeterminate')
+                            self.splash_progress.start(15)
+                    else:
+                        self.splash_progress.stop()
+                        self.splash_progress.config(mode='determinate', value=fraction)
+                elif message[0] == 'error':
+                    _, title, text = message
+                    messagebox.showerror(title, text)
+                    self.destroy()
+                    return
+                else:
+                    self.finish_startup()
+                    return
+        except queue.Empty:
+            pass
+        self.after(50, self.poll_loader)
+
+    def finish_startup(self):
+        """Replace the splash with the review UI and show the first report"""
+        from report_prefetch import ReportPrefetcher
+        from report_search import ReportSearch
+
+        self.splash_progress.stop()
+        self.splash.destroy()
+
+        self.save_worker = SaveWorker(self.storage, profiler=self.profiler)
         self.create_layout()
         self.bind_shortcuts()
+
+        # Prepare upcoming reports in the background
+        self.prefetcher = ReportPrefetcher(
+            self.df.row,
+            len(self.df),
+            self.render_cache,
+            ahead=self.config.getint('PERFORMANCE', 'prefetch_ahead', fallback=10),
+            profiler=self.profiler)
+        self.prefetcher.start()
+
+        # Full-text search: the index is loaded or built in the background
+        self.search = ReportSearch(self.df, self.csv_path,
+                                   lambda index: self.df.at[index, 'Report_Text'])
+        self.search.start()
+        self.search_rows = []
+        self._search_job = None
+
         self.load_report(self.find_first_unreviewed())
+        self.update_idletasks()
+        self.startup_times['first_report'] = time.perf_counter() - STARTED
+        self.ready = True
+
+        print(f"Startup: first pixel {self.startup_times['first_pixel']:.2f} s, "
+              f"first report {self.startup_times['first_report']:.2f} s")
+        for name, seconds in self.startup_times.items():
+            self.profiler.record(f'startup.{name}', seconds)
+
+        # Journal writes happen on the save worker; poll it for results
+        self.save_worker.start()
+        self.after(100, self.poll_save_results)
+
+        # Compact the journal back into the CSV (or checkpoint the database)
+        # periodically and on exit
+        self.compact_interval = self.config.getint('REVIEW', 'journal_compact_interval', fallback=300)
+        if self.compact_interval > 0:
+            self.after(self.compact_interval * 1000, self.scheduled_compact)
+
+        # Shared mode: pull other reviewers' saves and keep our lease alive
+        if self.storage.shared:
+            self.sync_interval = self.config.getint('REVIEW', 'sync_interval', fallback=5)
+            self.after(self.sync_interval * 1000, self.sync_shared)
+
+        # Keyword counts not saved yet: scan now that the first report is on screen
+        if self.hits_pending:
+            self.hits_messages = queue.Queue()
+            threading.Thread(target=self.scan_keyword_hits, name='KeywordScan',
+                             daemon=True).start()
+            self.after(200, self.poll_keyword_hits)
+
+        if self.view_errors:
+            self.show_view_errors(self.view_errors)
+
+    def show_view_errors(self, errors):
+        messagebox.showwarning("Configuration Error",
+                               "Some filters in config.ini could not be used:\n\n" +
+                               "\n".join(errors))
+
+    def scan_keyword_hits(self):
+        """Keyword scan thread: builds and saves the hit matrix. Never touches Tk."""
+        from report_hits import load_keyword_hits
+
+        try:
+            hits = load_keyword_hits(
+                self.csv_path, self.df, self.highlighter.keywords,
+                progress=lambda done, total: self.hits_messages.put(('progress', done, total)))
+        except Exception as e:
+            self.hits_messages.put(('error', str(e)))
+        else:
+            self.hits_messages.put(('done', hits))
+
+    def poll_keyword_hits(self):
+        """Show scan progress; add the keyword filters and priorities when it is done"""
+        from review_index import ReviewQueue
+        from review_views import compile_views
+
+        message = None
+        try:
+            while True:
+                message = self.hits_messages.get_nowait()
+                if message[0] != 'progress':
+                    break
+        except queue.Empty:
+            pass
+
+        if message is None or message[0] == 'progress':
+            if message is not None:
+                _, done, total = message
+                # Not show_status: that clears itself before the scan is done
+                self.status_label.config(text=f"Scanning reports for keywords ({done}/{total})…",
+                                         fg=self.colors['text_secondary'])
+            self.after(200, self.poll_keyword_hits)
+            return
+
+        self.hits_pending = False
+        if message[0] == 'error':
+            self.show_status("✗ Keyword scan failed", self.colors['danger'])
+            self.show_view_errors([f"{name}: keyword scan failed: {message[1]}"
+                                   for name, _ in self.deferred_views])
+            return
+
+        self.keyword_hits = message[1]
+        # Compiled from the current reviews, so saves made during the scan count
+        views, errors = compile_views(self.deferred_views, self.df, self.keyword_hits)
+        views.update(self.views)
+        self.views = {name: views[name] for name, _ in self.view_definitions if name in views}
+        if self.review_queue is not None:
+            self.review_queue = ReviewQueue.from_pending(
+                self.df, self.pending_rows, self.queue_weights, self.keyword_hits)
+        self.update_view_choices()
+        self.show_status("✓ Keyword filters ready", self.colors['success'])
+        if errors:
+            self.show_view_errors(errors)
 
     def load_config(self):
         """Load configuration from config.ini"""
@@ -110,22 +384,60 @@ class MedicalReportReviewer(tk.Tk):
 
     def find_first_unreviewed(self):
         """Find the first report without manual review"""
-        for idx in range(len(self.df)):
-            pe_present = self.df.iloc[idx].get('Manual_PE_Present')
-            # If Manual_PE_Present is NaN, empty, or not filled, it's unreviewed
-            if pd.isna(pe_present) or str(pe_present).strip() == '':
-                return idx
+        if self.storage.shared:
+            first = self.next_claimable(-1)
+        else:
+            first = self.next_unreviewed(-1)
         # If all reviewed, start at beginning
-        return 0
+        return 0 if first is None else first
 
     def load_data(self):
-        """Load CSV data"""
-        try:
-            self.df = pd.read_csv(self.csv_path)
-            print(f"Loaded {len(self.df)} reports")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load CSV: {str(e)}")
-            self.destroy()
+        """Load the cohort and its saved reviews from the storage backend (loader thread)"""
+        from review_index import PendingIndex, ReviewQueue, ReviewStats, load_queue_weights
+        from review_views import compile_views, load_view_definitions, uses_keyword_hits
+        from report_hits import saved_keyword_hits
+        from report_preprocess import load_preprocessed
+
+        self.df = self.storage.load()
+
+        memory_mb = sum(self.df.memory_usage().values()) / (1024 * 1024)
+        print(f"Loaded {len(self.df)} reports ({memory_mb:.1f} MB in memory)")
+
+        self.report_loading("Indexing reviews…", 0.7)
+        self.pending_rows = PendingIndex.from_column(self.df['Manual_PE_Present'])
+        self.review_stats = ReviewStats(self.df)
+
+        # Keyword spans precomputed by report_preprocess.py, if it was run for these reports
+        self.preprocessed = load_preprocessed(self.config, self.csv_path, self.df)
+        if self.preprocessed is not None:
+            print(f"Using preprocessed reports from {self.csv_path}.preprocessed")
+            self.render_cache.precomputed = self.preprocessed
+
+        priority = self.config.get('QUEUE', 'order', fallback='row').strip().lower() == 'priority'
+        self.queue_weights = load_queue_weights(self.config)
+        definitions = self.view_definitions = load_view_definitions(self.config)
+
+        # Keyword and negation counts per report, for filters and the queue that use them.
+        # Saved counts load in milliseconds; a full scan would hold up the first
+        # report, so it runs after startup (scan_keyword_hits) and the filters
+        # that need it are added when it finishes.
+        if uses_keyword_hits(definitions) or (priority and self.queue_weights['regex_conflict']):
+            self.keyword_hits = saved_keyword_hits(self.csv_path, self.df,
+                                                   self.highlighter.keywords, self.preprocessed)
+            self.hits_pending = self.keyword_hits is None
+        if self.hits_pending:
+            self.deferred_views = [d for d in definitions if uses_keyword_hits([d])]
+            definitions = [d for d in definitions if d not in self.deferred_views]
+
+        # Priority order: Next and Skip go to the most useful unreviewed report
+        if priority:
+            self.review_queue = ReviewQueue.from_pending(
+                self.df, self.pending_rows, self.queue_weights, self.keyword_hits)
+
+        # Named filters from config.ini, each a precomputed mask and row list
+        self.report_loading("Preparing filters…", 0.9)
+        self.views, self.view_errors = compile_views(definitions, self.df, self.keyword_hits)
+        self.synced_revision = self.storage.latest_revision() if self.storage.shared else 0
 
     def setup_styles(self):
         """Configure ttk styles for professional appearance"""
@@ -187,6 +499,15 @@ class MedicalReportReviewer(tk.Tk):
         content_frame = ttk.Frame(main_frame, style='Dark.TFrame')
         content_frame.pack(fill=tk.BOTH, expand=True, pady=20)
 
+        # Sidebar: every report with its status, only the visible lines drawn
+        self.report_list = None
+        if self.config.getboolean('DISPLAY', 'report_list', fallback=True):
+            from report_list import ReportList
+            list_frame = ttk.Frame(content_frame, style='Medium.TFrame')
+            list_frame.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 10))
+            self.report_list = ReportList(list_frame, self.df, self.colors, self.load_report,
+                                          is_dirty=lambda index: index in self.dirty_rows)
+
         # Left column: Report display (60%)
         left_frame = ttk.Frame(content_frame, style='Medium.TFrame')
         left_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 10))
@@ -253,7 +574,7 @@ class MedicalReportReviewer(tk.Tk):
         shortcuts_frame = ttk.Frame(parent, style='Dark.TFrame')
         shortcuts_frame.pack(fill=tk.X, pady=(5, 0))
 
-        shortcuts_text = "⌨ Shortcuts: 0=No PE | 1=PE Present | ←/→=Previous/Next | Ctrl+S=Save | Ctrl+K=Skip to Unreviewed"
+        shortcuts_text = "⌨ Shortcuts: 0=No PE | 1=PE Present | ←/→=Previous/Next | Ctrl+S=Save | Ctrl+Shift+S=Write CSV | Ctrl+K=Skip to Unreviewed | Ctrl+F=Search | Ctrl+Shift+P=Read-ahead Stats | Ctrl+Shift+O=Timing Overlay"
         shortcuts_label = tk.Label(shortcuts_frame,
                                   text=shortcuts_text,
                                   font=('Segoe UI', 8),
@@ -261,6 +582,18 @@ class MedicalReportReviewer(tk.Tk):
                                   fg=self.colors['text_secondary'])
         shortcuts_label.pack(pady=2)
 
+        # Timing overlay: the last load_report/save_current broken into steps
+        self.profile_overlay = None
+        if self.profiler.enabled:
+            self.profile_overlay = tk.Label(shortcuts_frame,
+                                            text="",
+                                            anchor=tk.W,
+                                            font=('Consolas', 8),
+                                            bg=self.colors['bg_dark'],
+                                            fg=self.colors['text_secondary'])
+            if self.config.getboolean('PROFILE', 'overlay', fallback=False):
+                self.profile_overlay.pack(fill=tk.X)
+
     def create_report_display(self, parent):
         """Create the report text display area"""
         # Section header
@@ -276,6 +609,53 @@ class MedicalReportReviewer(tk.Tk):
                                     style='Small.TLabel')
         self.report_info.pack(anchor=tk.W, padx=10, pady=5)
 
+        # Search bar: words, "quoted phrases", or a Report_Number/EMPI
+        search_frame = ttk.Frame(parent, style='Medium.TFrame')
+        search_frame.pack(fill=tk.X, padx=10, pady=(5, 0))
+
+        search_label = ttk.Label(search_frame, text="Search:", style='Body.TLabel')
+        search_label.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame,
+                                     textvariable=self.search_var,
+                                     font=('Segoe UI', 10),
+                                     bg=self.colors['bg_medium'],
+                                     fg=self.colors['text_primary'],
+                                     insertbackground=self.colors['accent'],
+                                     relief=tk.SOLID,
+                                     borderwidth=1,
+                                     highlightthickness=0)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.search_var.trace_add('write', self.on_search_changed)
+        self.search_entry.bind('<Return>', lambda e: self.open_search_result(0))
+        self.search_entry.bind('<Down>', lambda e: self.focus_search_results())
+        self.search_entry.bind('<Escape>', lambda e: self.search_var.set(''))
+
+        self.search_status = ttk.Label(search_frame, text="", style='Small.TLabel')
+        self.search_status.pack(side=tk.LEFT, padx=(10, 0))
+
+        # Results list, shown while there is a query
+        self.search_results_frame = ttk.Frame(parent, style='Medium.TFrame')
+        results_scrollbar = tk.Scrollbar(self.search_results_frame)
+        results_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.search_results = tk.Listbox(self.search_results_frame,
+                                         height=6,
+                                         font=('Segoe UI', 9),
+                                         bg=self.colors['bg_medium'],
+                                         fg=self.colors['text_primary'],
+                                         selectbackground=self.colors['accent'],
+                                         relief=tk.SOLID,
+                                         borderwidth=1,
+                                         highlightthickness=0,
+                                         activestyle='none',
+                                         yscrollcommand=results_scrollbar.set)
+        self.search_results.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        results_scrollbar.config(command=self.search_results.yview)
+        self.search_results.bind('<Double-Button-1>', lambda e: self.open_search_result())
+        self.search_results.bind('<Return>', lambda e: self.open_search_result())
+        self.search_results.bind('<Escape>', lambda e: self.search_entry.focus_set())
+
         # Text widget with scrollbar
         text_frame = ttk.Frame(parent, style='Medium.TFrame')
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -296,9 +676,33 @@ class MedicalReportReviewer(tk.Tk):
                                   pady=20,
                                   spacing1=2,
                                   spacing3=2,
-                                  yscrollcommand=scrollbar.set)
+                                  yscrollcommand=self.on_report_scroll)
         self.report_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.report_text.yview)
+        scrollbar.config(command=self.on_report_scrollbar)
+        self.report_scrollbar = scrollbar
+        self.text_frame = text_frame
+
+        # Section headers toggle their section; the marker stands in for a hidden body
+        self.report_text.tag_configure('section_header', font=('Segoe UI', 11, 'bold'))
+        self.report_text.tag_configure('section_more', foreground=self.colors['text_secondary'])
+        for tag in ('section_header', 'section_more'):
+            self.report_text.tag_bind(tag, '<Button-1>', self.on_section_click)
+            self.report_text.tag_bind(tag, '<Enter>',
+                                      lambda e: self.report_text.config(cursor='hand2'))
+            self.report_text.tag_bind(tag, '<Leave>',
+                                      lambda e: self.report_text.config(cursor='xterm'))
+        # Once the reader scrolls, lazily inserted sections no longer pull the view back
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>', '<Key>'):
+            self.report_text.bind(sequence, self.stop_following, add='+')
+
+        # Configure highlight tag
+        self.report_text.tag_configure('highlight',
+                                      background=self.colors['highlight_bg'],
+                                      foreground=self.colors['highlight_text'],
+                                      font=('Consolas', 10, 'bold'))
+        self.report_text.tag_configure('search_match',
+                                      background=self.colors['accent'],
+                                      foreground='#ffffff')
 
         # Reference predictions panel
         ref_frame = ttk.Frame(parent, style='Light.TFrame')
@@ -324,6 +728,8 @@ class MedicalReportReviewer(tk.Tk):
 
     def create_review_form(self, parent):
         """Create the review form with all input fields"""
+        from review_fields import FIELD_OPTIONS
+
         # Scrollable form
         canvas = tk.Canvas(parent, bg=self.colors['bg_medium'],
                           highlightthickness=0)
@@ -350,7 +756,7 @@ class MedicalReportReviewer(tk.Tk):
             "1. PE Present *",
             "Manual_PE_Present",
             "radio",
-            options=[("No PE", "0"), ("PE Present", "1")],
+            options=FIELD_OPTIONS['Manual_PE_Present'],
             required=True
         )
 
@@ -360,7 +766,7 @@ class MedicalReportReviewer(tk.Tk):
             "2. PE Location",
             "Manual_PE_Location",
             "dropdown",
-            options=["", "Central", "Segmental", "Subsegmental", "Multiple", "Unknown"]
+            options=FIELD_OPTIONS['Manual_PE_Location']
         )
 
         # 3. PE Acuity (conditional)
@@ -369,7 +775,7 @@ class MedicalReportReviewer(tk.Tk):
             "3. PE Acuity",
             "Manual_PE_Acuity",
             "dropdown",
-            options=["", "Acute", "Chronic", "Acute-on-chronic", "Unknown"]
+            options=FIELD_OPTIONS['Manual_PE_Acuity']
         )
 
         # 4. PE Laterality (conditional)
@@ -378,7 +784,7 @@ class MedicalReportReviewer(tk.Tk):
             "4. PE Laterality",
             "Manual_PE_Laterality",
             "dropdown",
-            options=["", "Right", "Left", "Bilateral", "Unknown"]
+            options=FIELD_OPTIONS['Manual_PE_Laterality']
         )
 
         # 5. PE Clot Burden (conditional)
@@ -387,7 +793,7 @@ class MedicalReportReviewer(tk.Tk):
             "5. PE Clot Burden",
             "Manual_PE_Clot_Burden",
             "dropdown",
-            options=["", "High", "Low", "Unknown"]
+            options=FIELD_OPTIONS['Manual_PE_Clot_Burden']
         )
 
         # 6. Reviewer Confidence (Required)
@@ -396,7 +802,7 @@ class MedicalReportReviewer(tk.Tk):
             "6. Confidence *",
             "Reviewer_Confidence",
             "radio",
-            options=[("High", "high"), ("Medium", "medium"), ("Low", "low")],
+            options=FIELD_OPTIONS['Reviewer_Confidence'],
             required=True
         )
 
@@ -423,6 +829,7 @@ class MedicalReportReviewer(tk.Tk):
         if field_type == "radio":
             # Radio buttons
             var = tk.StringVar(value="")
+            var.trace_add('write', self.mark_dirty)
             self.form_vars[field_name] = var
 
             for option_text, option_value in options:
@@ -436,6 +843,7 @@ class MedicalReportReviewer(tk.Tk):
         elif field_type == "dropdown":
             # Combobox
             var = tk.StringVar(value="")
+            var.trace_add('write', self.mark_dirty)
             self.form_vars[field_name] = var
 
             combo = ttk.Combobox(section_frame,
@@ -469,6 +877,7 @@ class MedicalReportReviewer(tk.Tk):
                                     padx=12,
                                     pady=10)
         self.comments_text.pack(fill=tk.X, padx=20, pady=5)
+        self.comments_text.bind('<<Modified>>', self.on_comments_modified)
 
     def create_footer(self, parent):
         """Create navigation footer"""
@@ -509,6 +918,21 @@ class MedicalReportReviewer(tk.Tk):
                                      bg=self.colors['accent'])
         skip_btn.pack(side=tk.LEFT, padx=5)
 
+        # Filtered view: ←/→ step only through the reports a filter selects
+        if self.views or self.deferred_views:
+            view_label = ttk.Label(center_frame, text="View:", style='Body.TLabel')
+            view_label.pack(side=tk.LEFT, padx=(20, 5))
+
+            self.view_var = tk.StringVar(value=self.ALL_REPORTS)
+            self.view_combo = ttk.Combobox(center_frame,
+                                           textvariable=self.view_var,
+                                           state='readonly',
+                                           width=32,
+                                           font=('Segoe UI', 9))
+            self.view_combo.pack(side=tk.LEFT)
+            self.view_combo.bind('<<ComboboxSelected>>', lambda e: self.select_view())
+            self.update_view_choices()
+
         # Right side: Navigation buttons
         nav_frame = ttk.Frame(footer_frame, style='Dark.TFrame')
         nav_frame.pack(side=tk.RIGHT)
@@ -561,61 +985,155 @@ class MedicalReportReviewer(tk.Tk):
 
         return btn
 
-    def format_report_text(self, text):
-        """Format report text with paragraph breaks"""
-        import re
-
-        # Add double line break before ALL CAPS words followed by ":"
-        # Pattern: word boundary, 2+ uppercase letters, optional spaces, colon
-        formatted = re.sub(r'\b([A-Z]{2,}[A-Z\s]*?):', r'\n\n\1:', text)
-
-        # Clean up multiple consecutive line breaks (max 2)
-        formatted = re.sub(r'\n{3,}', '\n\n', formatted)
-
-        # Remove leading/trailing whitespace
-        formatted = formatted.strip()
-
-        return formatted
-
-    def highlight_keywords(self):
+    def highlight_keywords(self, text, spans=None):
         """Highlight PE-related keywords in report text"""
-        # Configure highlight tag
-        self.report_text.tag_configure('highlight',
-                                      background=self.colors['highlight_bg'],
-                                      foreground=self.colors['highlight_text'],
-                                      font=('Consolas', 10, 'bold'))
-
-        # Keywords to highlight (case-insensitive)
-        keywords = [
-            'pulmonary embolism',
-            'pulmonary emboli',
-            'embolism',
-            'emboli',
-            'embolus',
-            'thrombus',
-            'thrombi',
-            r'\bPE\b',  # Word boundary to avoid matching in other words
-        ]
-
-        # Get all text content
-        content = self.report_text.get('1.0', tk.END)
-
-        # Search and highlight each keyword
-        for keyword in keywords:
-            import re
-            # Use regex for case-insensitive search
-            pattern = re.compile(keyword, re.IGNORECASE)
-
-            for match in pattern.finditer(content):
-                start_idx = match.start()
-                end_idx = match.end()
-
-                # Convert string indices to Tkinter text indices
-                start_pos = f"1.0 + {start_idx} chars"
-                end_pos = f"1.0 + {end_idx} chars"
-
-                # Apply highlight tag
-                self.report_text.tag_add('highlight', start_pos, end_pos)
+        self.highlighter.apply(self.report_text, text, spans=spans)
+
+    def render_report(self, text, spans, sections):
+        """Show a formatted report and scroll to its first keyword
+
+        In the section view, sections named in open_sections and sections
+        with keyword hits are inserted now; the others show only their
+        header until clicked or scrolled into view, which saves inserting
+        and tagging most of a long report before it is on screen.
+        """
+        widget = self.report_text
+        widget.config(state=tk.NORMAL)
+        if self.report_sections:
+            widget.tag_delete(*self.section_tags())
+        self.report_sections = []
+        self.section_states = []
+        if not self.section_view or len(sections) < 2:
+            with self.profiler.span('load.text'):
+                widget.delete('1.0', tk.END)
+                widget.insert('1.0', text)
+            with self.profiler.span('load.highlight_keywords'):
+                self.highlight_keywords(text, spans)
+        else:
+            with self.profiler.span('load.text'):
+                widget.delete('1.0', tk.END)
+                self.report_sections = layout_sections(text, spans, sections, self.open_sections)
+                # One batched insert: text, tags, text, tags, ...
+                chunks = []
+                for i, section in enumerate(self.report_sections):
+                    if section.title:
+                        chunks += [section.title, ('section_header', f'header_{i}')]
+                    if section.open:
+                        chunks += [section.body, (f'body_{i}',)]
+                    if section.header:
+                        chunks += [' …', ('section_more', f'more_{i}')]
+                    chunks += [section.separator, ()]
+                    self.section_states.append('open' if section.open else 'pending')
+                widget.insert('1.0', *chunks)
+            with self.profiler.span('load.highlight_keywords'):
+                indices = []
+                for i, section in enumerate(self.report_sections):
+                    if section.header:
+                        widget.tag_configure(f'more_{i}', elide=section.open)
+                    indices += self.section_indices(i)
+                if indices:
+                    widget.tag_add('highlight', *indices)
+        widget.config(state=tk.DISABLED)
+
+        widget.mark_unset('first_hit')
+        first = widget.tag_nextrange('highlight', '1.0')
+        if first:
+            widget.mark_set('first_hit', first[0])
+            widget.see('first_hit')
+        else:
+            widget.yview_moveto(0)
+        self.follow_first_hit = bool(first)
+        if 'pending' in self.section_states:
+            self.schedule_section_expansion()
+
+    def section_tags(self):
+        """Per-section tags of the report on screen"""
+        return [f'{kind}_{i}' for i in range(len(self.report_sections))
+                for kind in ('header', 'body', 'more')]
+
+    def section_indices(self, i):
+        """Widget indices of the keyword hits in what is shown of section i"""
+        section = self.report_sections[i]
+        inserted = section.title + (section.body if self.section_states[i] != 'pending' else '')
+        spans = [span for span in section.spans if span[1] <= len(inserted)]
+        if not spans:
+            return []
+        start = self.report_text.index(f'header_{i}.first' if section.title else f'body_{i}.first')
+        line, column = map(int, start.split('.'))
+        return KeywordHighlighter.to_indices(inserted, spans, line, column)
+
+    def expand_section(self, i):
+        """Insert a section's body behind its header"""
+        widget = self.report_text
+        section = self.report_sections[i]
+        widget.config(state=tk.NORMAL)
+        widget.insert(f'more_{i}.first', section.body, (f'body_{i}',))
+        self.section_states[i] = 'open'
+        widget.tag_configure(f'more_{i}', elide=True)
+        indices = self.section_indices(i)
+        if indices:
+            # Hits in the title are tagged already; tagging them again is harmless
+            widget.tag_add('highlight', *indices)
+        widget.config(state=tk.DISABLED)
+
+    def toggle_section(self, i):
+        """Expand a collapsed or not yet inserted section, collapse an open one"""
+        state = self.section_states[i]
+        if state == 'pending':
+            self.expand_section(i)
+            return
+        collapse = state == 'open'
+        self.report_text.tag_configure(f'body_{i}', elide=collapse)
+        self.report_text.tag_configure(f'more_{i}', elide=not collapse)
+        self.section_states[i] = 'collapsed' if collapse else 'open'
+
+    def on_section_click(self, event):
+        """Click on a section header or its marker"""
+        self.stop_following()
+        for tag in self.report_text.tag_names(tk.CURRENT):
+            kind, _, number = tag.partition('_')
+            if kind in ('header', 'more') and number.isdigit():
+                self.toggle_section(int(number))
+                return 'break'
+
+    def show_all_sections(self):
+        """Insert every section not shown yet (before searching the text on screen)"""
+        for i, state in enumerate(self.section_states):
+            if state != 'open':
+                if state == 'pending':
+                    self.expand_section(i)
+                else:
+                    self.toggle_section(i)
+
+    def on_report_scroll(self, first, last):
+        """yscrollcommand: move the scrollbar, and fill in sections that came into view"""
+        self.report_scrollbar.set(first, last)
+        if 'pending' in self.section_states:
+            self.schedule_section_expansion()
+
+    def on_report_scrollbar(self, *args):
+        """Scrollbar dragged or clicked"""
+        self.stop_following()
+        self.report_text.yview(*args)
+
+    def stop_following(self, event=None):
+        self.follow_first_hit = False
+
+    def schedule_section_expansion(self):
+        if self._expand_job is None:
+            self._expand_job = self.after_idle(self.expand_visible_sections)
+
+    def expand_visible_sections(self):
+        """Insert the pending sections whose header is on screen"""
+        self._expand_job = None
+        widget = self.report_text
+        visible = [i for i, state in enumerate(self.section_states)
+                   if state == 'pending' and widget.bbox(f'more_{i}.first') is not None]
+        for i in visible:
+            self.expand_section(i)
+        if visible and self.follow_first_hit:
+            # Sections inserted above the first keyword push it down; keep it in view
+            widget.see('first_hit')
 
     def load_report(self, index):
         """Load report at given index"""
@@ -623,109 +1141,155 @@ class MedicalReportReviewer(tk.Tk):
             messagebox.showwarning("Warning", "Invalid report index")
             return
 
-        self.current_index = index
-        row = self.df.iloc[index]
-
-        # Clear status
-        self.status_label.config(text="")
-
-        # Update progress
-        progress_pct = ((index + 1) / len(self.df)) * 100
-        self.progress_bar['value'] = progress_pct
-        self.progress_label.config(text=f"Report {index + 1} of {len(self.df)}")
-
-        # Update report info
-        info_text = f"Report #{row['Report_Number']} | {row['Report_Description']}"
-        self.report_info.config(text=info_text)
-
-        # Update report text with formatting and highlighting
-        self.report_text.config(state=tk.NORMAL)
-        self.report_text.delete('1.0', tk.END)
-        formatted_text = self.format_report_text(str(row['Report_Text']))
-        self.report_text.insert('1.0', formatted_text)
-        self.highlight_keywords()
-        self.report_text.config(state=tk.DISABLED)
-
-        # Update reference predictions
-        ref_text = (
-            f"SVM: {row['SVM_PE_Prediction']} ({row['SVM_Probability']:.2f}) | "
-            f"LLM: {row['LLM_PE_Binary']} ({row['LLM_Confidence']}) | "
-            f"Regex: {row['Regex_PE_Prediction']}\n"
-            f"LLM Location: {row['PE_Location']} | "
-            f"Acuity: {row['PE_Acuity']} | "
-            f"Laterality: {row['PE_Laterality']} | "
-            f"Burden: {row['PE_Clot_Burden']}"
-        )
-        self.reference_text.config(state=tk.NORMAL)
-        self.reference_text.delete('1.0', tk.END)
-        self.reference_text.insert('1.0', ref_text)
-        self.reference_text.config(state=tk.DISABLED)
-
-        # Load existing manual review data
-        self.load_existing_review(row)
-
-        # Update statistics
-        self.update_statistics()
-
-        # Show AI agreement indicator
-        self.show_ai_agreement(row)
-
-        self.unsaved_changes = False
-
-    def load_existing_review(self, row):
-        """Load existing review data if present"""
-        # PE Present
-        pe_present = str(row.get('Manual_PE_Present', ''))
-        if pe_present in ['0', '1', '0.0', '1.0']:
-            self.form_vars['Manual_PE_Present'].set(str(int(float(pe_present))))
-        else:
-            self.form_vars['Manual_PE_Present'].set('')
-
-        # PE Location
-        pe_loc = str(row.get('Manual_PE_Location', ''))
-        self.form_vars['Manual_PE_Location'].set('' if pd.isna(row.get('Manual_PE_Location')) else pe_loc)
-
-        # PE Acuity
-        pe_acuity = str(row.get('Manual_PE_Acuity', ''))
-        self.form_vars['Manual_PE_Acuity'].set('' if pd.isna(row.get('Manual_PE_Acuity')) else pe_acuity)
+        # Save a finished review as the reviewer leaves it; incomplete edits
+        # stay as drafts until they are finished
+        if self.dirty_rows.get(self.current_index, False) is None:
+            fields = self.read_form()
+            if index != self.current_index and not self.validate_form(fields):
+                self.persist_review(self.current_index, fields)
+                del self.dirty_rows[self.current_index]
+            else:
+                self.dirty_rows[self.current_index] = fields
+
+        started = time.perf_counter()
+        with self.profiler.frame('load_report', row=index):
+            self.current_index = index
+            with self.profiler.span('load.fetch'):
+                prepared = self.prefetcher.take(index)
+            row = prepared['row']
+
+            # Clear status
+            self.status_label.config(text="")
+
+            if self.storage.shared:
+                self.claim_report(index)
+
+            with self.profiler.span('load.progress'):
+                # Update progress
+                progress_pct = ((index + 1) / len(self.df)) * 100
+                self.progress_bar['value'] = progress_pct
+                progress_text = f"Report {index + 1} of {len(self.df)}"
+                if self.active_view is not None:
+                    position = self.active_view.position(index)
+                    progress_text += (f" • {self.active_view.name} "
+                                      f"{position if position else '-'}/{len(self.active_view)}")
+                self.progress_label.config(text=progress_text)
+
+                if self.report_list is not None:
+                    self.report_list.show(index)
+
+                # Update report info
+                info_text = f"Report #{row['Report_Number']} | {row['Report_Description']}"
+                self.report_info.config(text=info_text)
+
+            # Update report text with formatting and highlighting
+            self.render_report(prepared['text'], prepared['spans'], prepared['sections'])
+
+            # Update reference predictions
+            self.reference_text.config(state=tk.NORMAL)
+            self.reference_text.delete('1.0', tk.END)
+            self.reference_text.insert('1.0', prepared['reference'])
+            self.reference_text.config(state=tk.DISABLED)
+
+            # Load existing manual review data, or the unsaved draft for this row
+            with self.profiler.span('load.load_existing_review'):
+                self._loading_review = True
+                if self.dirty_rows.get(index) is not None:
+                    self.fill_form(self.dirty_rows[index])
+                    self.dirty_rows[index] = None
+                else:
+                    self.fill_form(prepared['review'])
+                self.comments_text.edit_modified(False)
+                self._loading_review = False
+
+            # Update statistics
+            with self.profiler.span('load.update_statistics'):
+                self.update_statistics()
+
+            # Show AI agreement indicator
+            self.show_ai_agreement(row)
+
+            self.unsaved_changes = index in self.dirty_rows
+
+        self.prefetcher.record_render(time.perf_counter() - started)
+        self.prefetcher.request(index, self.upcoming_rows(index))
+        self.update_profile_overlay()
+
+    def fill_form(self, fields):
+        """Fill the form from raw fields (a stored review or an unsaved draft)"""
+        for field_name, var in self.form_vars.items():
+            var.set(fields.get(field_name, ''))
 
-        # PE Laterality
-        pe_lat = str(row.get('Manual_PE_Laterality', ''))
-        self.form_vars['Manual_PE_Laterality'].set('' if pd.isna(row.get('Manual_PE_Laterality')) else pe_lat)
+        self.comments_text.delete('1.0', tk.END)
+        self.comments_text.insert('1.0', fields.get('Comments', ''))
 
-        # PE Clot Burden
-        pe_burden = str(row.get('Manual_PE_Clot_Burden', ''))
-        self.form_vars['Manual_PE_Clot_Burden'].set('' if pd.isna(row.get('Manual_PE_Clot_Burden')) else pe_burden)
+    def read_form(self):
+        """Read the raw form fields, including comments"""
+        fields = {field_name: var.get() for field_name, var in self.form_vars.items()}
+        fields['Comments'] = self.comments_text.get('1.0', tk.END).strip()
+        return fields
 
-        # Confidence
-        conf = str(row.get('Reviewer_Confidence', ''))
-        self.form_vars['Reviewer_Confidence'].set('' if pd.isna(row.get('Reviewer_Confidence')) else conf)
+    def mark_dirty(self, *args):
+        """Trace callback: the review on screen has been edited"""
+        if self._loading_review:
+            return
 
-        # Comments
-        self.comments_text.delete('1.0', tk.END)
-        comments = row.get('Comments', '')
-        if not pd.isna(comments):
-            self.comments_text.insert('1.0', str(comments))
+        self.unsaved_changes = True
+        if self.current_index not in self.dirty_rows and self.report_list is not None:
+            self.report_list.refresh_row(self.current_index)
+        self.dirty_rows[self.current_index] = None
+
+        # Debounce: save once the reviewer has paused editing for the interval
+        if self.autosave_interval > 0:
+            if self._autosave_job is not None:
+                self.after_cancel(self._autosave_job)
+            self._autosave_job = self.after(self.autosave_interval * 1000, self.autosave)
+
+    def on_comments_modified(self, event=None):
+        """Text widgets have no variable trace; use the modified flag instead"""
+        if self.comments_text.edit_modified():
+            self.comments_text.edit_modified(False)
+            self.mark_dirty()
+
+    def autosave(self):
+        """Persist every dirty row whose review is complete"""
+        self._autosave_job = None
+
+        for index in list(self.dirty_rows):
+            fields = self.dirty_rows[index]
+            if fields is None:
+                fields = self.read_form()
+            if self.validate_form(fields):
+                # Incomplete reviews stay as drafts until finished
+                continue
+            self.persist_review(index, fields)
+            del self.dirty_rows[index]
+
+        self.unsaved_changes = self.current_index in self.dirty_rows
 
     def update_statistics(self):
-        """Update review statistics"""
-        total = len(self.df)
-        reviewed = self.df['Manual_PE_Present'].notna().sum()
-        remaining = total - reviewed
-        pct = (reviewed / total * 100) if total > 0 else 0
-
-        stats_text = f"Reviewed: {reviewed}/{total} ({pct:.1f}%) • Remaining: {remaining}"
+        """Update review statistics from the running counters"""
+        stats = self.review_stats
+        pct = (stats.reviewed / stats.total * 100) if stats.total > 0 else 0
+
+        stats_text = (f"Reviewed: {stats.reviewed}/{stats.total} ({pct:.1f}%) • "
+                      f"Remaining: {stats.remaining} • "
+                      f"PE: {stats.pe_counts.get(1, 0)} / No PE: {stats.pe_counts.get(0, 0)}")
+        if stats.reviewed and stats.agreement:
+            agreement = " ".join(f"{model} {stats.agreement_rate(model):.0%}"
+                                 for model in stats.agreement)
+            stats_text += f" • AI agreement: {agreement}"
         self.stats_label.config(text=stats_text)
 
     def show_ai_agreement(self, row):
         """Show if AI predictions agree with manual review"""
-        manual_pe = row.get('Manual_PE_Present')
+        from review_index import manual_label
 
         # Only show if manual review exists
-        if pd.isna(manual_pe):
+        manual_pe = manual_label(row.get('Manual_PE_Present'))
+        if manual_pe is None:
             return
 
-        manual_pe = int(float(manual_pe))
         llm_pe = int(row.get('LLM_PE_Binary', -1))
         svm_pe = int(row.get('SVM_PE_Prediction', -1))
 
@@ -750,103 +1314,323 @@ class MedicalReportReviewer(tk.Tk):
 
     def skip_to_unreviewed(self):
         """Skip to next unreviewed report"""
-        start_idx = self.current_index + 1
-        for idx in range(start_idx, len(self.df)):
-            pe_present = self.df.iloc[idx].get('Manual_PE_Present')
-            if pd.isna(pe_present) or str(pe_present).strip() == '':
-                self.load_report(idx)
-                return
-
-        # If no unreviewed found after current, search from beginning
-        for idx in range(0, self.current_index):
-            pe_present = self.df.iloc[idx].get('Manual_PE_Present')
-            if pd.isna(pe_present) or str(pe_present).strip() == '':
-                self.load_report(idx)
-                return
+        idx = self.next_to_review()
+        if idx is not None:
+            self.history.append(self.current_index)
+            self.load_report(idx)
+            return
 
-        messagebox.showinfo("Complete", "All reports have been reviewed!")
+        drafts = sum(1 for index in self.dirty_rows if index in self.pending_rows)
+        if len(self.pending_rows) > drafts:
+            messagebox.showinfo("Complete", "All remaining reports are being reviewed by others.")
+        elif len(self.pending_rows):
+            messagebox.showinfo("Complete", "Only reports with unfinished reviews are left.")
+        else:
+            messagebox.showinfo("Complete", "All reports have been reviewed!")
+
+    def upcoming_rows(self, index):
+        """Rows Next will open after index, for read-ahead; None means index+1 onwards"""
+        if self.active_view is not None:
+            return self.active_view.rows_after(index, self.prefetcher.ahead)
+        if self.review_queue is not None:
+            return self.review_queue.peek(self.prefetcher.ahead,
+                                          exclude=set(self.dirty_rows) | {index})
+        return None
+
+    def next_to_review(self):
+        """The unreviewed report Next/Skip should open, or None
+
+        Rows with an unsaved draft are skipped: they stay pending until
+        autosave persists them, and would otherwise come straight back.
+        """
+        drafts = set(self.dirty_rows)
+        if self.storage.shared:
+            return self.next_claimable(self.current_index, exclude=drafts)
+        return self.next_unreviewed(self.current_index, exclude=drafts)
+
+    def next_unreviewed(self, index, exclude=()):
+        """Next unreviewed report other than index: by priority, or by row with wrap-around"""
+        if self.review_queue is not None:
+            return self.review_queue.next(exclude=set(exclude) | {index})
+
+        candidate = index
+        for _ in range(len(self.pending_rows)):
+            candidate = self.pending_rows.next_after(candidate)
+            if candidate is None or candidate == index:
+                break
+            if candidate not in exclude:
+                return candidate
+        return None
+
+    def next_claimable(self, index, exclude=()):
+        """Shared mode: lease the next unreviewed report that nobody holds"""
+        unavailable = self.storage.leased_rows() | set(exclude)
+        for _ in range(len(self.pending_rows)):
+            candidate = self.next_unreviewed(index, exclude=unavailable)
+            if candidate is None:
+                break
+            # The lease also fails if someone saved the row since our last sync
+            # Drafts keep their lease until they are saved
+            if self.storage.lease(candidate, keep=self.dirty_rows):
+                return candidate
+            unavailable.add(candidate)
+        return None
+
+    def claim_report(self, index):
+        """Shared mode: lease an unreviewed report while it is on screen"""
+        if index not in self.pending_rows or self.storage.lease(index, keep=self.dirty_rows):
+            return
 
-    def validate_form(self):
-        """Validate form before saving"""
-        errors = []
+        holder = self.storage.lease_holder(index)
+        if holder is not None:
+            self.show_status(f"⚠ Being reviewed by {holder}", self.colors['warning'])
 
-        # Check PE Present
-        pe_present = self.form_vars['Manual_PE_Present'].get()
-        if not pe_present:
-            errors.append("PE Present is required")
+    def sync_shared(self):
+        """Shared mode: merge reviews saved by others and renew our lease"""
+        try:
+            self.synced_revision, records = self.storage.changes_since(self.synced_revision)
+            changed = set()
+            for index, report_number, values in records:
+                if index >= len(self.df) or str(self.df.at[index, 'Report_Number']) != report_number:
+                    continue
+                self.apply_review(index, values)
+                changed.add(index)
+
+            if changed:
+                self.update_statistics()
+                # Refresh the report on screen unless we are editing it
+                if self.current_index in changed and self.current_index not in self.dirty_rows:
+                    self.load_report(self.current_index)
+            if self.current_index in self.pending_rows:
+                self.storage.lease(self.current_index, keep=self.dirty_rows)
+        except Exception as e:
+            print(f"Shared sync failed: {e}")
+            self.show_status("✗ Sync failed", self.colors['danger'])
 
-        # Check confidence
-        confidence = self.form_vars['Reviewer_Confidence'].get()
-        if not confidence:
-            errors.append("Reviewer Confidence is required")
+        self.after(self.sync_interval * 1000, self.sync_shared)
 
-        # If PE present, check PE characteristics
-        if pe_present == "1":
-            if not self.form_vars['Manual_PE_Location'].get():
-                errors.append("PE Location is required when PE is present")
-            if not self.form_vars['Manual_PE_Acuity'].get():
-                errors.append("PE Acuity is required when PE is present")
-            if not self.form_vars['Manual_PE_Laterality'].get():
-                errors.append("PE Laterality is required when PE is present")
-            if not self.form_vars['Manual_PE_Clot_Burden'].get():
-                errors.append("PE Clot Burden is required when PE is present")
+    def validate_form(self, fields=None):
+        """Validate form (or stashed form fields) before saving"""
+        if fields is None:
+            fields = self.read_form()
+        from review_fields import validate_review
+        return validate_review(fields)
 
-        return errors
+    def show_validation_errors(self, errors):
+        """Tell the reviewer which required fields are missing"""
+        messagebox.showwarning("Validation Error",
+                              "Please complete required fields:\n\n" +
+                              "\n".join(f"- {e}" for e in errors))
 
     def save_current(self):
         """Save current review to DataFrame"""
-        errors = self.validate_form()
+        with self.profiler.frame('save_current', row=self.current_index):
+            with self.profiler.span('save.validate'):
+                fields = self.read_form()
+                errors = self.validate_form(fields)
+
+            if not errors:
+                self.persist_review(self.current_index, fields)
+                self.dirty_rows.pop(self.current_index, None)
+                self.unsaved_changes = False
 
+        self.update_profile_overlay()
         if errors:
-            messagebox.showwarning("Validation Error",
-                                  "Please complete required fields:\n\n" +
-                                  "\n".join(f"- {e}" for e in errors))
+            self.show_validation_errors(errors)
             return False
+        return True
+
+    def persist_review(self, index, fields):
+        """Write a validated review into the DataFrame and the storage backend"""
+        with self.profiler.span('save.serialize'):
+            values = self.collect_review(fields)
+        with self.profiler.span('save.apply'):
+            self.apply_review(index, values)
+            self.update_statistics()
+
+        # Hand the review to the save worker: a journal append (the CSV is
+        # rewritten on compaction) or a single-row database upsert. The write
+        # itself is timed on the worker as save.write.
+        with self.profiler.span('save.submit'):
+            self.save_worker.submit(index, self.df.at[index, 'Report_Number'], values)
+
+    def apply_review(self, index, values):
+        """Update DataFrame, keeping the running counters and indexes in step"""
+        from review_index import manual_label
+
+        self.review_stats.remove_row(self.df, index)
+        for column, value in values.items():
+            self.df.at[index, column] = value
+        self.review_stats.add_row(self.df, index)
+
+        if manual_label(self.df.at[index, 'Manual_PE_Present']) is None:
+            self.pending_rows.add(index)
+            if self.review_queue is not None:
+                self.review_queue.add(index)
+        else:
+            self.pending_rows.discard(index)
+            if self.review_queue is not None:
+                self.review_queue.discard(index)
+        self.prefetcher.invalidate(index)
+        if self.report_list is not None:
+            self.report_list.refresh_row(index)
+
+        # Only filters over the Manual_* columns can change when a review does
+        changed = [view for view in self.views.values()
+                   if view.depends_on_reviews and view.refresh_row(self.df, index)]
+        if changed:
+            self.update_view_choices()
+
+    def collect_review(self, fields):
+        """Convert raw form fields into a dict of review column values"""
+        from review_fields import collect_review
+        return collect_review(fields)
+
+    def compact_journal(self):
+        """Queue a write of all journaled reviews back into the CSV (database: a WAL checkpoint)"""
+        self.save_worker.request_compact(self.df)
+
+    def scheduled_compact(self):
+        """Timer callback for periodic journal compaction"""
+        self.compact_journal()
+        self.after(self.compact_interval * 1000, self.scheduled_compact)
+
+    def poll_save_results(self):
+        """Report save worker results on the status label"""
+        while not self.save_worker.results.empty():
+            kind, ok, detail = self.save_worker.results.get_nowait()
+            if kind == 'saved' and ok:
+                self.show_status("✓ Saved", self.colors['success'])
+            elif kind == 'compacted' and ok:
+                self.show_status(f"✓ {self.storage.name} updated", self.colors['success'])
+            elif kind == 'saved':
+                self.show_status("✗ Save failed", self.colors['danger'])
+                messagebox.showerror("Error", f"Failed to save: {detail}")
+            else:
+                self.show_status(f"✗ {self.storage.name} update failed", self.colors['danger'])
+                messagebox.showerror("Error", f"Failed to write {self.storage.name}: {detail}")
 
-        # Update DataFrame
-        self.df.at[self.current_index, 'Manual_PE_Present'] = int(self.form_vars['Manual_PE_Present'].get())
+        self.after(100, self.poll_save_results)
 
-        pe_present = self.form_vars['Manual_PE_Present'].get()
-        if pe_present == "1":
-            self.df.at[self.current_index, 'Manual_PE_Location'] = self.form_vars['Manual_PE_Location'].get()
-            self.df.at[self.current_index, 'Manual_PE_Acuity'] = self.form_vars['Manual_PE_Acuity'].get()
-            self.df.at[self.current_index, 'Manual_PE_Laterality'] = self.form_vars['Manual_PE_Laterality'].get()
-            self.df.at[self.current_index, 'Manual_PE_Clot_Burden'] = self.form_vars['Manual_PE_Clot_Burden'].get()
-        else:
-            # Clear PE characteristics if no PE
-            self.df.at[self.current_index, 'Manual_PE_Location'] = ''
-            self.df.at[self.current_index, 'Manual_PE_Acuity'] = ''
-            self.df.at[self.current_index, 'Manual_PE_Laterality'] = ''
-            self.df.at[self.current_index, 'Manual_PE_Clot_Burden'] = ''
+    def on_close(self):
+        """Wait for pending writes and compact the journal before closing"""
+        if not self.ready:
+            # Still loading: nothing has been edited, and the loader is a daemon thread
+            self.closing = True
+            self.release_cohort()
+            self.destroy()
+            return
 
-        self.df.at[self.current_index, 'Reviewer_Confidence'] = self.form_vars['Reviewer_Confidence'].get()
-        self.df.at[self.current_index, 'Comments'] = self.comments_text.get('1.0', tk.END).strip()
+        if self.autosave_interval > 0:
+            self.autosave()
 
-        # Save to CSV
-        try:
-            self.df.to_csv(self.csv_path, index=False)
-            self.unsaved_changes = False
-            self.show_status("✓ Saved", self.colors['success'])
-            return True
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to save: {str(e)}")
-            return False
+        if self.dirty_rows:
+            if not messagebox.askyesno(
+                    "Unsaved Changes",
+                    f"{len(self.dirty_rows)} report(s) have unsaved or incomplete reviews "
+                    f"that will be lost.\n\nClose anyway?"):
+                return
+
+        self.show_status("Saving...", self.colors['warning'])
+        self.update_idletasks()
+
+        self.compact_journal()
+        self.save_worker.stop()
+        self.storage.close()
+        self.closing = True
+        self.release_cohort()
+        if self.profiler.enabled:
+            print(self.prefetcher.summary())
+            print(self.profiler.summary())
+            self.profiler.close()
+        self.destroy()
+
+    def release_cohort(self):
+        """Let review_batch.py write to the cohort again"""
+        with self.cohort_guard:
+            if self.cohort_lock is not None:
+                self.cohort_lock.release()
+                self.cohort_lock = None
 
     def next_report(self):
         """Navigate to next report"""
-        if self.save_current():
-            if self.current_index < len(self.df) - 1:
-                self.load_report(self.current_index + 1)
+        if self.autosave_interval > 0:
+            # The finished review is saved by load_report as the report is left
+            errors = self.validate_form()
+            if errors:
+                self.show_validation_errors(errors)
+            proceed = not errors
+        else:
+            proceed = self.save_current()
+
+        if not proceed:
+            return
+
+        if self.active_view is not None:
+            idx = self.active_view.next_after(self.current_index)
+            if idx is not None:
+                self.load_report(idx)
             else:
-                messagebox.showinfo("Complete",
-                                   "You've reached the last report!\n\n" +
+                messagebox.showinfo("End of View",
+                                   f"You've reached the last report in \"{self.active_view.name}\".")
+        elif self.review_queue is not None:
+            # Priority order: go straight to the most useful unreviewed report
+            idx = self.next_to_review()
+            if idx is not None:
+                self.history.append(self.current_index)
+                self.load_report(idx)
+            else:
+                messagebox.showinfo("Complete", "All reports have been reviewed!\n\n" +
                                    "Great work completing the review!")
+        elif self.current_index < len(self.df) - 1:
+            self.load_report(self.current_index + 1)
+        else:
+            messagebox.showinfo("Complete",
+                               "You've reached the last report!\n\n" +
+                               "Great work completing the review!")
 
     def previous_report(self):
         """Navigate to previous report"""
-        if self.current_index > 0:
+        if self.active_view is not None:
+            idx = self.active_view.previous_before(self.current_index)
+            if idx is not None:
+                self.load_report(idx)
+        elif self.review_queue is not None:
+            # Priority order: retrace the reports visited
+            if self.history:
+                self.load_report(self.history.pop())
+        elif self.current_index > 0:
             self.load_report(self.current_index - 1)
 
+    def update_view_choices(self):
+        """Refresh the view chooser, whose entries show each view's size"""
+        if not hasattr(self, 'view_combo'):
+            return
+        self.view_combo['values'] = [self.ALL_REPORTS] + [v.label() for v in self.views.values()]
+        if self.active_view is not None:
+            self.view_var.set(self.active_view.label())
+
+    def select_view(self):
+        """Switch ←/→ to the chosen view, starting from the current report"""
+        choice = self.view_var.get()
+        view = next((v for v in self.views.values() if v.label() == choice), None)
+
+        if view is not None and not len(view):
+            messagebox.showinfo("Empty View", f"No reports match \"{view.name}\".")
+            view = None
+        self.active_view = view
+        self.update_view_choices()
+        if view is None:
+            self.view_var.set(self.ALL_REPORTS)
+            self.load_report(self.current_index)
+            return
+
+        if self.current_index in view:
+            self.load_report(self.current_index)
+        else:
+            idx = view.next_after(self.current_index)
+            self.load_report(idx if idx is not None else view.rows[0])
+
     def jump_to_report(self):
         """Jump to specific report number"""
         try:
@@ -860,6 +1644,108 @@ class MedicalReportReviewer(tk.Tk):
         except ValueError:
             messagebox.showwarning("Invalid", "Please enter a valid number")
 
+    def on_search_changed(self, *args):
+        """Re-run the search shortly after typing stops"""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(150, self.run_search)
+
+    def run_search(self):
+        """Fill the results list for the current query"""
+        self._search_job = None
+        query = self.search_var.get().strip()
+        self.search_results.delete(0, tk.END)
+        if not query:
+            self.search_rows = []
+            self.search_status.config(text="")
+            self.search_results_frame.pack_forget()
+            return
+
+        started = time.perf_counter()
+        self.search_rows, more = self.search.search(query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        numbers = self.df['Report_Number']
+        descriptions = self.df['Report_Description']
+        self.search_results.insert(tk.END, *[
+            f"Report #{numbers.iloc[index]} | {descriptions.iloc[index]}"
+            for index in self.search_rows])
+
+        count = f"{len(self.search_rows)}{'+' if more else ''}"
+        if self.search.ready:
+            self.search_status.config(text=f"{count} found ({elapsed_ms:.0f} ms)")
+        else:
+            # Only identifiers can match until the index is ready; try again shortly
+            self.search_status.config(
+                text=f"{count} found • indexing reports {self.search.progress:.0%}")
+            self._search_job = self.after(500, self.run_search)
+
+        if not self.search_results_frame.winfo_ismapped():
+            self.search_results_frame.pack(fill=tk.X, padx=10, pady=(5, 0),
+                                           before=self.text_frame)
+
+    def focus_search_results(self):
+        """Move from the search box into the results list"""
+        if self.search_rows:
+            self.search_results.focus_set()
+            self.search_results.selection_clear(0, tk.END)
+            self.search_results.selection_set(0)
+            self.search_results.activate(0)
+
+    def open_search_result(self, position=None):
+        """Load a search hit and highlight the matching text"""
+        if position is None:
+            selection = self.search_results.curselection()
+            if not selection:
+                return
+            position = selection[0]
+        if position >= len(self.search_rows):
+            return
+
+        self.load_report(self.search_rows[position])
+        self.highlight_search_matches(self.search_var.get())
+
+    def highlight_search_matches(self, query):
+        """Tag the query's terms in the displayed report and scroll to the first"""
+        from report_search import match_pattern
+
+        pattern = match_pattern(query)
+        if pattern is None:
+            return
+        self.show_all_sections()
+        text = self.report_text.get('1.0', 'end-1c')
+        indices = KeywordHighlighter.to_indices(
+            text, [match.span() for match in pattern.finditer(text)])
+        if indices:
+            self.report_text.tag_add('search_match', *indices)
+            self.report_text.see(indices[0])
+
+    def focus_search(self):
+        """Ctrl+F: put the cursor in the search box"""
+        self.search_entry.focus_set()
+        self.search_entry.select_range(0, tk.END)
+        return 'break'
+
+    def typing_in_entry(self):
+        """Whether keys are going to a text entry rather than the review shortcuts"""
+        return isinstance(self.focus_get(), tk.Entry)
+
+    def update_profile_overlay(self):
+        """Show the last load/save breakdown when the overlay is on"""
+        if self.profile_overlay is not None and self.profile_overlay.winfo_ismapped():
+            self.profile_overlay.config(text=self.profiler.describe_last_frame())
+
+    def toggle_profile_overlay(self):
+        """Ctrl+Shift+O: show or hide the timing overlay (profiling must be enabled)"""
+        if self.profile_overlay is None:
+            self.show_status("Set enabled = true in [PROFILE] to collect timings",
+                             self.colors['text_secondary'])
+        elif self.profile_overlay.winfo_ismapped():
+            self.profile_overlay.pack_forget()
+        else:
+            self.profile_overlay.pack(fill=tk.X)
+            self.update_profile_overlay()
+
     def show_status(self, message, color=None):
         """Show a temporary status message"""
         if color is None:
@@ -873,9 +1759,14 @@ class MedicalReportReviewer(tk.Tk):
         """Bind keyboard shortcuts"""
         # Navigation shortcuts
         self.bind('<Control-s>', lambda e: self.save_current())
-        self.bind('<Right>', lambda e: self.next_report())
-        self.bind('<Left>', lambda e: self.previous_report())
+        self.bind('<Right>', lambda e: self.typing_in_entry() or self.next_report())
+        self.bind('<Left>', lambda e: self.typing_in_entry() or self.previous_report())
         self.bind('<Control-k>', lambda e: self.skip_to_unreviewed())
+        self.bind('<Control-S>', lambda e: self.compact_journal())
+        self.bind('<Control-P>', lambda e: self.show_status(self.prefetcher.summary(),
+                                                            self.colors['text_secondary']))
+        self.bind('<Control-f>', lambda e: self.focus_search())
+        self.bind('<Control-O>', lambda e: self.toggle_profile_overlay())
 
         # Quick selection shortcuts
         # Press 0 for No PE, 1 for PE Present
@@ -884,6 +1775,8 @@ class MedicalReportReviewer(tk.Tk):
 
     def quick_select_pe(self, value):
         """Quick select PE present/absent"""
+        if self.typing_in_entry():
+            return
         if hasattr(self, 'form_vars') and 'Manual_PE_Present' in self.form_vars:
             self.form_vars['Manual_PE_Present'].set(value)
 